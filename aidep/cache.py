@@ -0,0 +1,154 @@
+"""
+Persistent parse cache.
+Stores parsed manifests under ~/.aidep/cache so unchanged files are never
+re-parsed. Entries are validated with a cheap stat check first and a
+content hash second, and evicted least-recently-used past a size bound.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from . import __version__
+
+# Bump when the cached payload shape or a parser's output changes; older
+# entries are ignored. Entries are also tied to the aidep release that
+# wrote them, so an upgrade never serves results from an older parser.
+CACHE_VERSION = 3
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# After eviction the cache is trimmed to this fraction of max_bytes
+EVICT_TARGET = 0.8
+
+
+def file_digest(file_path: Path) -> str:
+    """SHA-256 of a file's content."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """On-disk cache of parse results keyed by manifest path."""
+
+    def __init__(self, cache_dir: Optional[Path] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir) if cache_dir else Path.home() / ".aidep" / "cache"
+        self.max_bytes = max_bytes
+        self._usage: Optional[int] = None
+
+    def _entry_path(self, file_path: Path, namespace: str) -> Path:
+        key = f"{namespace}:{Path(file_path).resolve()}"
+        name = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return self.cache_dir / name[:2] / f"{name}.json"
+
+    def get(self, file_path: Path, namespace: str = "scan") -> Optional[Dict]:
+        """Return the cached payload for file_path, or None if missing or stale."""
+        entry_path = self._entry_path(file_path, namespace)
+        try:
+            with open(entry_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if entry.get('version') != CACHE_VERSION or entry.get('aidep') != __version__:
+            return None
+
+        refreshed = False
+        for path, (mtime_ns, size, sha) in entry['files'].items():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                return None
+
+            if stat.st_mtime_ns == mtime_ns and stat.st_size == size:
+                continue
+
+            # Touched but maybe not changed (checkout, copy): fall back to the hash
+            if stat.st_size != size or file_digest(Path(path)) != sha:
+                return None
+            entry['files'][path] = [stat.st_mtime_ns, stat.st_size, sha]
+            refreshed = True
+
+        if refreshed:
+            self._write(entry_path, entry)
+        else:
+            # Mark as recently used for LRU eviction
+            try:
+                os.utime(entry_path)
+            except OSError:
+                pass
+
+        return entry['payload']
+
+    def put(self, file_path: Path, files: Iterable[Path], payload: Dict, namespace: str = "scan"):
+        """Store a payload along with the stat/hash of every file it depends on."""
+        stamps = {}
+        try:
+            for path in files:
+                path = str(Path(path).resolve())
+                stat = os.stat(path)
+                stamps[path] = [stat.st_mtime_ns, stat.st_size, file_digest(Path(path))]
+        except OSError:
+            return
+
+        entry = {'version': CACHE_VERSION, 'aidep': __version__, 'files': stamps, 'payload': payload}
+        written = self._write(self._entry_path(file_path, namespace), entry)
+
+        if self._usage is None:
+            self._usage = self._disk_usage()
+        else:
+            self._usage += written
+        if self._usage > self.max_bytes:
+            self._evict()
+
+    def _write(self, entry_path: Path, entry: Dict) -> int:
+        """Atomically write an entry; returns bytes written (0 on failure)."""
+        data = json.dumps(entry, separators=(',', ':')).encode('utf-8')
+        tmp_path = entry_path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            entry_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, entry_path)
+        except OSError:
+            return 0
+        return len(data)
+
+    def _entries(self):
+        """Yield (path, stat) for every entry on disk."""
+        if not self.cache_dir.is_dir():
+            return
+        for bucket in os.scandir(self.cache_dir):
+            if not bucket.is_dir():
+                continue
+            for entry in os.scandir(bucket.path):
+                if entry.name.endswith('.json'):
+                    try:
+                        yield entry.path, entry.stat()
+                    except OSError:
+                        continue
+
+    def _disk_usage(self) -> int:
+        return sum(stat.st_size for _, stat in self._entries())
+
+    def _evict(self):
+        """Remove least-recently-used entries until under the target size."""
+        entries = sorted(self._entries(), key=lambda item: item[1].st_mtime)
+        usage = sum(stat.st_size for _, stat in entries)
+        target = self.max_bytes * EVICT_TARGET
+
+        for path, stat in entries:
+            if usage <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            usage -= stat.st_size
+
+        self._usage = usage
@@ -0,0 +1,118 @@
+"""
+Changed-files scan.
+Asks local git which paths changed since a revision and maps them to the
+projects that need a re-check, including projects whose -r / -c includes
+changed, without walking or parsing the rest of the tree.
+"""
+
+import os
+import subprocess
+from pathlib import Path
+from typing import Iterable, List, Set, Tuple
+
+from .discovery import MANIFEST_NAMES, MANIFEST_PATTERNS, PRUNED_DIRS, is_manifest
+from .project import Project, project_root
+from .scanner import DependencyScanner
+
+# Suffixes of files that can be the target of a -r / -c include
+INCLUDE_SUFFIXES = ('.txt', '.in')
+
+
+def run_git(cwd: Path, *args: str, ok_status: Tuple[int, ...] = (0,)) -> bytes:
+    """Run a git command and return its stdout; other exit statuses raise ValueError."""
+    try:
+        completed = subprocess.run(['git', '-C', str(cwd), *args], capture_output=True)
+    except FileNotFoundError:
+        raise ValueError("git is not installed") from None
+    if completed.returncode not in ok_status:
+        message = completed.stderr.decode('utf-8', errors='replace').strip()
+        raise ValueError(message or f"git {args[0]} failed")
+    return completed.stdout
+
+
+def _split_paths(top: Path, output: bytes) -> Set[Path]:
+    """NUL-separated, top-level-relative paths from a -z git command."""
+    return {top / os.fsdecode(name) for name in output.split(b'\0') if name}
+
+
+def git_toplevel(path) -> Path:
+    """Root of the work tree containing path."""
+    return Path(os.fsdecode(run_git(Path(path).resolve(), 'rev-parse', '--show-toplevel').strip())).resolve()
+
+
+def changed_files(path, rev: str) -> Set[Path]:
+    """
+    Files that differ between the merge base of rev and HEAD and the working
+    tree (committed, staged and unstaged), plus untracked files that are not
+    ignored. Renames count as a deletion and an addition.
+    """
+    top = git_toplevel(path)
+    base = run_git(top, 'merge-base', rev, 'HEAD').strip().decode()
+
+    changed = _split_paths(top, run_git(top, 'diff', '--name-only', '--no-renames', '-z', base, '--'))
+    changed |= _split_paths(top, run_git(top, 'ls-files', '--others', '--exclude-standard', '-z'))
+    return changed
+
+
+def manifest_pathspecs() -> List[str]:
+    """Git pathspecs for every manifest and possible -r / -c target, at any depth."""
+    patterns = sorted(MANIFEST_NAMES) + MANIFEST_PATTERNS + [f"*{suffix}" for suffix in INCLUDE_SUFFIXES]
+    return [f":(glob)**/{pattern}" for pattern in patterns]
+
+
+def _files_mentioning(top: Path, names: Iterable[str]) -> Set[Path]:
+    """Tracked and untracked candidate files whose text contains any of names."""
+    args = ['grep', '--untracked', '-l', '-z', '-F']
+    for name in sorted(names):
+        args += ['-e', name]
+    # git grep exits 1 when nothing matches; anything else is a real failure
+    output = run_git(top, *args, '--', *manifest_pathspecs(), ok_status=(0, 1))
+    return _split_paths(top, output)
+
+
+def _is_pruned(path: Path, root: Path) -> bool:
+    try:
+        parts = path.relative_to(root).parts
+    except ValueError:
+        return True
+    return any(part in PRUNED_DIRS for part in parts[:-1])
+
+
+def affected_manifests(scanner: DependencyScanner, changed: Set[Path]) -> List[Path]:
+    """
+    Manifests of every project below the scanner's path that a change touches,
+    grouped per project in a stable order.
+
+    A project is affected when one of its manifests changed, or when one of
+    them includes a changed file, however indirectly. Includers are found by
+    `git grep` for the changed file names, repeated for each newly found
+    file so chains of includes are followed; every candidate is then
+    confirmed by parsing it and comparing the files it actually read.
+    """
+    root = Path(scanner.project_path).resolve()
+    changed = {path.resolve() for path in changed}
+    manifests = {path for path in changed if is_manifest(path.name, path.parent.name)}
+
+    targets = {path for path in changed if path in manifests or path.name.endswith(INCLUDE_SUFFIXES)}
+    if targets:
+        top = git_toplevel(root)
+        searched: Set[str] = set()
+        candidates: Set[Path] = set()
+        frontier = targets
+        while frontier:
+            names = {path.name for path in frontier} - searched
+            if not names:
+                break
+            searched |= names
+            found = _files_mentioning(top, names) - candidates - changed
+            candidates |= found
+            frontier = found
+
+        for candidate in candidates:
+            if is_manifest(candidate.name, candidate.parent.name) and not _is_pruned(candidate, root):
+                read = {Path(path).resolve() for path in scanner.read_files(candidate)}
+                if read & changed:
+                    manifests.add(candidate)
+
+    roots = sorted({project_root(path) for path in manifests if not _is_pruned(path, root)})
+    return [source for project in roots for source in Project(project, scanner).sources]
@@ -3,31 +3,158 @@ Conflict detection module.
 Checks dependencies against known conflict database.
 """
 
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from packaging.version import parse as parse_version, Version
 from packaging.specifiers import SpecifierSet
 import re
 
 from .conflicts import CONFLICTS, COMPATIBILITY_MATRIX
+from .graph import DependencyGraph
+
+# Rules indexed by the packages they mention, so a change to one package
+# only re-evaluates the rules that can be affected by it
+CONFLICTS_BY_PACKAGE: Dict[str, List[Dict]] = {}
+for _conflict in CONFLICTS:
+    for _pkg in _conflict['packages']:
+        CONFLICTS_BY_PACKAGE.setdefault(_pkg.lower(), []).append(_conflict)
+
+# Upper bound on memoized rule evaluations kept by a warm checker
+EVALUATION_MEMO_SIZE = 65536
 
 
 class ConflictChecker:
     """Detects dependency conflicts in AI frameworks."""
     
-    def __init__(self, dependencies: Dict[str, str]):
+    def __init__(self, dependencies: Dict[str, str], constraints: Optional[Dict[str, str]] = None,
+                 graph: Optional[DependencyGraph] = None):
         self.dependencies = dependencies
+        self.constraints = constraints or {}
+        # Reverse-dependency graph used to report which requirement pulled a package in
+        self.graph = graph
         self.conflicts_found = []
+        self._evaluations: Dict[Tuple, Optional[Dict]] = {}
+        # Per-rule results of the last update(), for incremental re-checks
+        self._results: Optional[Dict[str, Optional[Dict]]] = None
         
     def check_all(self) -> List[Dict]:
         """Check all known conflicts."""
         for conflict in CONFLICTS:
-            if self._has_conflicting_packages(conflict):
-                conflict_result = self._evaluate_conflict(conflict)
-                if conflict_result:
-                    self.conflicts_found.append(conflict_result)
+            conflict_result = self._check_conflict(conflict)
+            if conflict_result:
+                self.conflicts_found.append(conflict_result)
         
         return self.conflicts_found
     
+    def check(self, dependencies: Dict[str, str], constraints: Optional[Dict[str, str]] = None) -> List[Dict]:
+        """
+        Check another dependency set, reusing this checker (batch mode).
+        
+        A rule's outcome only depends on the specs of the packages it
+        mentions, so evaluations are memoized on those; sets sharing pins
+        skip re-evaluating rules that were already decided.
+        """
+        self.dependencies = dependencies
+        self.constraints = constraints or {}
+        
+        if len(self._evaluations) > EVALUATION_MEMO_SIZE:
+            self._evaluations.clear()
+        
+        results = []
+        for conflict in CONFLICTS:
+            key = (conflict['id'],) + tuple(
+                (pkg.lower(), self._effective_spec(pkg.lower()))
+                for pkg in conflict['packages'] if pkg.lower() in dependencies
+            )
+            if key in self._evaluations:
+                result = self._evaluations[key]
+            else:
+                result = self._check_conflict(conflict)
+                self._evaluations[key] = result
+            if result:
+                results.append(result)
+        
+        return results
+    
+    def update(self, dependencies: Dict[str, str], constraints: Optional[Dict[str, str]] = None,
+               graph: Optional[DependencyGraph] = None) -> List[Dict]:
+        """
+        Re-check after the dependency set changed (watch mode).
+        
+        Only the rules that mention a package whose spec or constraint
+        differs from the previous update() are re-evaluated; every other
+        rule keeps its previous result, with only its introduced_by
+        refreshed when a new graph is passed. The first call evaluates
+        every rule.
+        """
+        constraints = constraints or {}
+        graph_changed = graph is not self.graph
+        if self._results is None:
+            affected = {c['id'] for c in CONFLICTS}
+        else:
+            changed = {name for name in self.dependencies.keys() | dependencies.keys()
+                       if self.dependencies.get(name) != dependencies.get(name)}
+            changed |= {name for name in self.constraints.keys() | constraints.keys()
+                        if self.constraints.get(name) != constraints.get(name)}
+            affected = {c['id'] for name in changed for c in CONFLICTS_BY_PACKAGE.get(name, [])}
+        
+        self.dependencies = dependencies
+        self.constraints = constraints
+        self.graph = graph
+        results = self._results or {}
+        for conflict in CONFLICTS:
+            result = results.get(conflict['id'])
+            if conflict['id'] in affected:
+                results[conflict['id']] = self._check_conflict(conflict)
+            elif result and graph_changed:
+                result = {key: value for key, value in result.items() if key != 'introduced_by'}
+                self._add_introduced_by(result)
+                results[conflict['id']] = result
+        self._results = results
+        
+        return [results[c['id']] for c in CONFLICTS if results[c['id']]]
+    
+    def _check_conflict(self, conflict: Dict) -> Optional[Dict]:
+        """Check a single conflict rule; returns the result or None."""
+        if self._has_conflicting_packages(conflict):
+            return self._evaluate_conflict(conflict)
+        return None
+    
+    @classmethod
+    def check_group_matrix(cls, base: Dict[str, str], groups: Dict[str, Dict[str, str]],
+                           combinations: List[Tuple[str, ...]],
+                           constraints: Optional[Dict[str, str]] = None) -> Dict[Tuple[str, ...], List[Dict]]:
+        """
+        Check each combination of installable groups on top of the base dependencies.
+        
+        Every rule is evaluated once for the base set. A combination only
+        re-evaluates the rules that mention a package its groups add or
+        change; every other rule reuses the base result.
+        """
+        base_checker = cls(base, constraints)
+        base_results = {c['id']: base_checker._check_conflict(c) for c in CONFLICTS}
+        matrix = {}
+        
+        for combination in combinations:
+            merged = dict(base)
+            for group in combination:
+                merged.update(groups.get(group, {}))
+            
+            changed = {name for name, spec in merged.items() if base.get(name, None) != spec}
+            affected = {c['id'] for name in changed for c in CONFLICTS_BY_PACKAGE.get(name, [])}
+            
+            checker = cls(merged, constraints)
+            results = []
+            for conflict in CONFLICTS:
+                if conflict['id'] in affected:
+                    result = checker._check_conflict(conflict)
+                else:
+                    result = base_results[conflict['id']]
+                if result:
+                    results.append(result)
+            matrix[tuple(combination)] = results
+        
+        return matrix
+    
     def _has_conflicting_packages(self, conflict: Dict) -> bool:
         """Check if project has the packages mentioned in conflict."""
         conflict_packages = set(pkg.lower() for pkg in conflict['packages'])
@@ -44,7 +171,7 @@ class ConflictChecker:
         for pkg_name in conflict['packages']:
             pkg_lower = pkg_name.lower()
             if pkg_lower in self.dependencies:
-                affected_packages[pkg_name] = self.dependencies[pkg_lower]
+                affected_packages[pkg_name] = self._effective_spec(pkg_lower)
 
         # Check if versions fall into conflict range
         is_conflicting = self._check_if_conflicting(
@@ -64,6 +191,8 @@ class ConflictChecker:
                 'fix': conflict['fix']
             }
 
+            self._add_introduced_by(result)
+
             # Add helpful context based on conflict type
             helpful_tip = self._get_helpful_tip(conflict['id'])
             if helpful_tip:
@@ -73,6 +202,26 @@ class ConflictChecker:
 
         return None
 
+    def _add_introduced_by(self, result: Dict):
+        """Record which top-level requirements pulled in each affected package."""
+        if self.graph is not None:
+            result['introduced_by'] = {
+                pkg: self.graph.introduced_by(pkg.lower()) for pkg in result['affected_packages']
+            }
+
+    def _effective_spec(self, package: str) -> str:
+        """
+        Combine a dependency's spec with any -c constraint on it.
+        The constraint goes first since it is usually the exact pin installed.
+        """
+        spec = self.dependencies[package] or ""
+        constraint = self.constraints.get(package)
+        if not constraint:
+            return spec
+        if not spec:
+            return constraint
+        return f"{constraint},{spec}"
+
     def _get_helpful_tip(self, conflict_id: str) -> str:
         """Get helpful tip based on conflict type."""
         if 'cuda' in conflict_id.lower() or 'torch' in conflict_id.lower():
@@ -1,6 +1,6 @@
 """
 CLI interface for aidep.
-Main commands: check, suggest, validate, doctor, explain, config
+Main commands: check, suggest, validate, batch, history, imports, doctor, explain, config
 """
 
 import sys
@@ -10,9 +10,24 @@ from rich.table import Table
 from rich.panel import Panel
 from rich.markdown import Markdown
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from packaging.utils import canonicalize_name
 
 from .scanner import DependencyScanner
+from .cache import ParseCache
+from .changes import affected_manifests, changed_files
 from .checker import ConflictChecker
+from .conda import read_conda_meta
+from .graph import DependencyGraph, graph_from_via
+from .history import HistoryAudit
+from .images import scan_image
+from .imports import audit_imports
+from .pipeline import parse_manifests, scan_wheelhouse
+from .pipreport import parse_pip_report, read_pip_report
+from .project import Project, group_projects
+from .requirement import parse_requirement
+from .watch import WatchSession, make_watcher
 from .conflicts import COMPATIBILITY_MATRIX, CONFLICTS
 
 console = Console()
@@ -29,33 +44,141 @@ def main():
     pass
 
 
-@main.command()
-@click.option('--path', default='.', help='Project path to scan')
-@click.option('--verbose', is_flag=True, help='Show detailed output')
-def check(path, verbose):
-    """
-    🔍 Scan your project for AI framework conflicts.
-    
-    Example: aidep check
-    """
-    console.print("\n[bold cyan]🔍 Scanning project for AI framework conflicts...[/bold cyan]\n")
-    
-    scanner = DependencyScanner(path)
-    
-    # Find and parse requirements
-    req_file = scanner.find_requirements_file()
-    
-    if not req_file:
-        console.print("[bold red]❌ No requirements file found![/bold red]")
-        console.print("\nLooking for: requirements.txt, pyproject.toml")
-        console.print("\nCreate a requirements.txt with your dependencies first.")
+def _display_path(file_path: Path, root: Path) -> str:
+    """Show a manifest path relative to the scan root when possible."""
+    try:
+        return str(file_path.relative_to(root))
+    except ValueError:
+        return str(file_path)
+
+
+def _make_scanner(path, no_cache: bool = False) -> DependencyScanner:
+    """Build a scanner, backed by the on-disk parse cache unless disabled."""
+    return DependencyScanner(path, cache=None if no_cache else ParseCache(), rules_only=True)
+
+
+def _warn_include_cycles(scanner: DependencyScanner):
+    """Point out -r / -c include cycles found while parsing."""
+    for cycle in scanner.resolver.cycles:
+        chain = " -> ".join(p.name for p in cycle)
+        console.print(f"[yellow]⚠️  Include cycle skipped: {chain}[/yellow]")
+
+
+def _conflict_to_json(conflict: dict) -> dict:
+    """Serialize a conflict for --json output."""
+    return {
+        "id": conflict['id'],
+        "severity": conflict['severity'],
+        "description": conflict['description'],
+        "affected_packages": conflict['affected_packages'],
+        "fix": conflict['fix'],
+        "helpful_tip": conflict.get('helpful_tip', ''),
+        **({"introduced_by": conflict['introduced_by']} if 'introduced_by' in conflict else {})
+    }
+
+
+def _check_projects(scanner: DependencyScanner, manifests, jobs: int = 1):
+    """Parse manifests, merge them per project and check each project's merged view."""
+    results = parse_manifests(manifests, jobs=jobs, scanner=scanner)
+    for project in group_projects(results, scanner):
+        ai_deps = scanner.filter_ai_frameworks(project.dependencies)
+        conflicts = ConflictChecker(ai_deps, project.constraints, graph=project.graph).check_all() if ai_deps else []
+        yield project, ai_deps, conflicts
+
+
+def _display_project(project: Project, root: Path) -> str:
+    """Project path relative to the scan root, plus its manifests."""
+    sources = ", ".join(_display_path(source, project.path) for source in project.sources)
+    return f"{_display_path(project.path, root) if project.path != root else '.'} ({sources})"
+
+
+def _check_recursive(scanner: DependencyScanner, verbose: bool, jobs: int = 1, manifests=None):
+    """Check every project below the project path (or those of the given manifests) in one process."""
+    scanned = 0
+    failing = 0
+    total_conflicts = 0
+    if manifests is None:
+        manifests = scanner.iter_requirements_files()
+
+    for project, ai_deps, conflicts in _check_projects(scanner, manifests, jobs):
+        scanned += 1
+        display = _display_project(project, scanner.project_path)
+
+        if conflicts:
+            failing += 1
+            total_conflicts += len(conflicts)
+            console.print(f"[red]❌ {display}[/red] - {len(conflicts)} conflict(s)")
+            for conflict in conflicts:
+                console.print(f"   • {conflict['id']} ({conflict['severity']}): {conflict['description']}")
+        elif verbose:
+            console.print(f"[green]✓[/green] {display} ({len(ai_deps)} AI framework dependencies)")
+
+    if not scanned:
+        console.print("[bold red]❌ No requirements files found![/bold red]")
         return
-    
-    console.print(f"[green]✓[/green] Found: {req_file.name}")
-    
-    # Scan dependencies
-    dependencies = scanner.scan_project()
-    
+
+    if total_conflicts:
+        console.print(Panel(
+            f"[bold red]⚠️  Found {total_conflicts} potential conflict(s) "
+            f"in {failing} of {scanned} project(s)[/bold red]",
+            title="Conflicts Detected",
+            border_style="red"
+        ))
+    else:
+        console.print(Panel(
+            f"[bold green]✅ No known conflicts detected in {scanned} project(s)![/bold green]",
+            title="Results",
+            border_style="green"
+        ))
+
+
+def _print_watch_status(session: WatchSession, elapsed: float, changed=()):
+    """One status block per re-check in watch mode."""
+    import time
+
+    stamp = time.strftime('%H:%M:%S')
+    names = ", ".join(sorted({path.name for path in changed}))
+    detail = f"{names}, {elapsed * 1000:.1f} ms" if names else f"{elapsed * 1000:.1f} ms"
+
+    if session.conflicts:
+        console.print(f"[red]❌ {stamp} {len(session.conflicts)} conflict(s)[/red] ({detail})")
+        for conflict in session.conflicts:
+            console.print(f"   • {conflict['id']} ({conflict['severity']}): {conflict['description']}")
+    else:
+        console.print(f"[green]✓ {stamp} No known conflicts[/green] "
+                      f"({len(session.ai_dependencies)} AI framework dependencies; {detail})")
+
+
+def _watch_project(scanner: DependencyScanner, path):
+    """Check a project, then re-check it on every change until interrupted."""
+    import time
+
+    session = WatchSession(path, scanner)
+    watcher = make_watcher()
+    start = time.perf_counter()
+    session.refresh()
+    _print_watch_status(session, time.perf_counter() - start)
+    console.print(f"[cyan]👀 Watching {len(session.sources)} manifest(s) with "
+                  f"{type(watcher).__name__} - Ctrl+C to stop[/cyan]\n")
+
+    try:
+        while True:
+            watcher.watch(session.watched_files(), session.watched_directories())
+            changed = watcher.wait()
+            start = time.perf_counter()
+            if session.refresh(changed):
+                _print_watch_status(session, time.perf_counter() - start, changed)
+    except KeyboardInterrupt:
+        console.print("\n[cyan]Stopped watching[/cyan]")
+    finally:
+        watcher.close()
+
+
+def _report_dependencies(scanner: DependencyScanner, dependencies: Dict[str, str],
+                         constraints: Optional[Dict[str, str]] = None,
+                         provenance: Optional[Dict[str, List[Tuple[Path, str]]]] = None,
+                         graph: Optional[DependencyGraph] = None):
+    """Show the AI framework table and any conflicts for a dependency map."""
     if not dependencies:
         console.print("[yellow]⚠️  No dependencies found in file[/yellow]")
         return
@@ -74,16 +197,21 @@ def check(path, verbose):
     table = Table(show_header=True, header_style="bold magenta")
     table.add_column("Package", style="cyan")
     table.add_column("Version Spec", style="green")
+    if provenance:
+        table.add_column("Source", style="white")
     
     for pkg, ver in ai_deps.items():
-        table.add_row(pkg, ver if ver else "*")
+        row = [pkg, ver if ver else "*"]
+        if provenance:
+            row.append(", ".join(source.name for source, _ in provenance.get(pkg, [])))
+        table.add_row(*row)
     
     console.print(table)
     
     # Check for conflicts
     console.print("\n[bold cyan]🔍 Checking for known conflicts...[/bold cyan]\n")
     
-    checker = ConflictChecker(ai_deps)
+    checker = ConflictChecker(ai_deps, constraints, graph=graph)
     conflicts = checker.check_all()
     
     if not conflicts:
@@ -110,7 +238,9 @@ def check(path, verbose):
             # Show affected packages
             console.print("[cyan]Affected packages in your project:[/cyan]")
             for pkg, ver in conflict['affected_packages'].items():
-                console.print(f"  • {pkg}: {ver}")
+                roots = [r for r in conflict.get('introduced_by', {}).get(pkg, []) if r != pkg.lower()]
+                via = f" [dim](via {', '.join(roots)})[/dim]" if roots else ""
+                console.print(f"  • {pkg}: {ver}{via}")
             
             # Show fix
             console.print(f"\n[bold green]💡 Suggested fix:[/bold green]")
@@ -129,6 +259,180 @@ def check(path, verbose):
         console.print("\n💡 Tip: Use 'aidep suggest <package>' for more options\n")
 
 
+def _group_combinations(groups: Dict[str, Dict[str, str]], requested) -> List[Tuple[str, ...]]:
+    """
+    Combinations to check: the ones requested with --groups, or by default
+    the base alone, base + each group and base + every group. Requested names
+    are matched to declared groups by canonical name and unknown ones are
+    kept as given.
+    """
+    if requested:
+        declared = {canonicalize_name(name): name for name in groups}
+        return [tuple(declared.get(canonicalize_name(g.strip()), g.strip()) for g in combo.split(',') if g.strip())
+                for combo in requested]
+
+    combinations = [()] + [(name,) for name in groups]
+    if len(groups) > 1:
+        combinations.append(tuple(groups))
+    return combinations
+
+
+def _check_group_matrix(scanner: DependencyScanner, project: Project, requested):
+    """Check every installed group combination declared by the project's manifests."""
+    groups = {}
+    for source in project.sources:
+        groups.update(scanner.parse_groups(source))
+
+    if not groups:
+        console.print("[yellow]⚠️  No optional-dependencies or dependency groups found[/yellow]")
+        return
+
+    combinations = _group_combinations(groups, requested)
+    unknown = sorted({g for combo in combinations for g in combo if g not in groups})
+    if unknown:
+        console.print(f"[bold red]❌ Unknown group(s): {', '.join(unknown)}[/bold red]")
+        console.print(f"\nAvailable: {', '.join(groups)}")
+        sys.exit(1)
+
+    base = scanner.filter_ai_frameworks(project.dependencies)
+    ai_groups = {name: scanner.filter_ai_frameworks(deps) for name, deps in groups.items()}
+    matrix = ConflictChecker.check_group_matrix(base, ai_groups, combinations, project.constraints)
+
+    table = Table(show_header=True, header_style="bold magenta")
+    table.add_column("Groups", style="cyan")
+    table.add_column("Conflicts", style="green")
+    table.add_column("Details", style="white")
+
+    for combination, conflicts in matrix.items():
+        label = "base + " + ", ".join(combination) if combination else "base"
+        status = f"[red]{len(conflicts)}[/red]" if conflicts else "[green]0[/green]"
+        table.add_row(label, status, ", ".join(c['id'] for c in conflicts))
+
+    console.print(table)
+    console.print("\n💡 Tip: Use 'aidep explain <conflict-id>' for details on any conflict\n")
+
+
+@main.command()
+@click.option('--path', default='.', help='Project path to scan')
+@click.option('--verbose', is_flag=True, help='Show detailed output')
+@click.option('--recursive', '-r', is_flag=True, help='Scan every manifest below PATH (monorepo mode)')
+@click.option('--jobs', '-j', default=1, show_default=True, help='Parallel parse workers for --recursive / --wheelhouse (0 = all cores)')
+@click.option('--no-cache', is_flag=True, help='Skip the on-disk parse cache (~/.aidep/cache)')
+@click.option('--matrix', is_flag=True, help='Check every extra / dependency group combination')
+@click.option('--groups', multiple=True, help='Group combination to check, e.g. gpu,train (repeatable)')
+@click.option('--conda-env', type=click.Path(exists=True, file_okay=False), help='Check an installed conda environment prefix instead')
+@click.option('--sbom', type=click.Path(exists=True, dir_okay=False), help='Check the PyPI packages of a CycloneDX / SPDX JSON SBOM instead')
+@click.option('--pip-report', type=click.Path(exists=True, dir_okay=False, allow_dash=True),
+              help='Check what pip would install, from `pip install --dry-run --report` JSON (- for stdin)')
+@click.option('--wheelhouse', type=click.Path(exists=True, file_okay=False),
+              help='Check every wheel and sdist in a wheelhouse directory (uses --jobs)')
+@click.option('--image-tar', type=click.Path(exists=True, dir_okay=False),
+              help='Check the packages installed in a `docker save` / OCI image tarball')
+@click.option('--changed-since', metavar='REV',
+              help='Only check projects whose manifests (or their -r / -c includes) changed since REV in git')
+@click.option('--watch', is_flag=True, help='Keep running and re-check on every manifest save')
+def check(path, verbose, recursive, jobs, no_cache, matrix, groups, conda_env, sbom, pip_report, wheelhouse,
+          image_tar, changed_since, watch):
+    """
+    🔍 Scan your project for AI framework conflicts.
+    
+    Example: aidep check
+    Example (monorepo): aidep check --recursive --jobs 0
+    Example (extras): aidep check --matrix
+    Example (conda): aidep check --conda-env ~/miniconda3/envs/train
+    Example (SBOM): aidep check --sbom image.cdx.json
+    Example (resolved): pip install --dry-run --quiet --report - -r requirements.txt | aidep check --pip-report -
+    Example (offline wheels): aidep check --wheelhouse ./wheels --jobs 0
+    Example (built image): docker save myimage -o image.tar && aidep check --image-tar image.tar
+    Example (PR pipeline): aidep check --changed-since origin/main
+    Example (while editing): aidep check --watch
+    """
+    console.print("\n[bold cyan]🔍 Scanning project for AI framework conflicts...[/bold cyan]\n")
+    
+    scanner = _make_scanner(path, no_cache)
+
+    if conda_env:
+        console.print(f"[green]✓[/green] Reading installed packages from: {conda_env}")
+        _report_dependencies(scanner, read_conda_meta(Path(conda_env)))
+        return
+
+    if sbom:
+        console.print(f"[green]✓[/green] Reading PyPI packages from SBOM: {sbom}")
+        _report_dependencies(scanner, scanner.parse_sbom(Path(sbom)))
+        return
+
+    if pip_report:
+        try:
+            report = read_pip_report(sys.stdin) if pip_report == '-' else parse_pip_report(Path(pip_report))
+        except ValueError as e:
+            console.print(f"[red]❌ Unreadable pip report: {e}[/red]")
+            sys.exit(1)
+        console.print(f"[green]✓[/green] Read {len(report.dependencies)} resolved distributions from pip report")
+        _report_dependencies(scanner, report.dependencies, graph=report.graph)
+        return
+
+    if wheelhouse:
+        dependencies, graph = scan_wheelhouse(wheelhouse, jobs=jobs)
+        console.print(f"[green]✓[/green] Read metadata of {len(dependencies)} distributions in {wheelhouse}")
+        _report_dependencies(scanner, dependencies, graph=graph)
+        return
+
+    if image_tar:
+        try:
+            dependencies, graph = scan_image(image_tar)
+        except ValueError as e:
+            console.print(f"[red]❌ {e}[/red]")
+            sys.exit(1)
+        console.print(f"[green]✓[/green] Found {len(dependencies)} installed distributions in image: {image_tar}")
+        _report_dependencies(scanner, dependencies, graph=graph)
+        return
+
+    if changed_since:
+        try:
+            changed = changed_files(scanner.project_path, changed_since)
+            manifests = affected_manifests(scanner, changed)
+        except ValueError as e:
+            console.print(f"[red]❌ {e}[/red]")
+            sys.exit(1)
+        if not manifests:
+            console.print(f"[green]✓ No dependency manifests changed since {changed_since}[/green]")
+            return
+        console.print(f"[green]✓[/green] {len(changed)} file(s) changed since {changed_since}")
+        _check_recursive(scanner, verbose, jobs, manifests)
+        return
+
+    if watch:
+        _watch_project(scanner, path)
+        return
+
+    if recursive:
+        _check_recursive(scanner, verbose, jobs)
+        return
+    
+    # Find and merge every manifest in the project
+    project = Project(path, scanner)
+    
+    if not project.sources:
+        console.print("[bold red]❌ No requirements file found![/bold red]")
+        console.print("\nLooking for: requirements.txt, pyproject.toml, setup.py, setup.cfg, poetry.lock, uv.lock, pdm.lock, Pipfile.lock, *.ipynb, Dockerfile, *.sh, environment.yml, *.cdx.json, *.spdx.json")
+        console.print("\nCreate a requirements.txt with your dependencies first.")
+        return
+    
+    console.print(f"[green]✓[/green] Found: {', '.join(_display_path(s, project.path) for s in project.sources)}")
+    
+    # Scan dependencies
+    dependencies = project.dependencies
+    _warn_include_cycles(scanner)
+
+    if matrix or groups:
+        _check_group_matrix(scanner, project, groups)
+        return
+    
+    # Show where each package came from when several manifests were merged
+    provenance = project.provenance if len(project.sources) > 1 else None
+    _report_dependencies(scanner, dependencies, project.constraints, provenance, project.graph)
+
+
 @main.command()
 @click.argument('package')
 def suggest(package):
@@ -187,25 +491,101 @@ def suggest(package):
     console.print("🚀 Faster with uv: Replace 'pip' with 'uv pip' for 10x speed!\n")
 
 
+def _validate_recursive(root: Path, output_json: bool, jobs: int = 1, no_cache: bool = False):
+    """Validate every project below root; exits 1 if any conflicts are found."""
+    scanner = _make_scanner(root, no_cache)
+    results = []
+    total_conflicts = 0
+    manifests = scanner.iter_requirements_files()
+
+    if not output_json:
+        console.print(f"\n[bold cyan]✅ Validating all manifests in: {root}[/bold cyan]\n")
+
+    for project, ai_deps, conflicts in _check_projects(scanner, manifests, jobs):
+        total_conflicts += len(conflicts)
+        display = _display_project(project, root)
+
+        if output_json:
+            results.append({
+                "project": _display_path(project.path, root) if project.path != root else ".",
+                "sources": [_display_path(source, root) for source in project.sources],
+                "valid": len(conflicts) == 0,
+                "conflicts_count": len(conflicts),
+                "conflicts": [_conflict_to_json(c) for c in conflicts]
+            })
+        elif conflicts:
+            console.print(f"[red]❌ {display}[/red] - {len(conflicts)} conflict(s)")
+            for conflict in conflicts:
+                console.print(f"   • {conflict['description']}")
+        else:
+            console.print(f"[green]✓[/green] {display}")
+
+    if output_json:
+        import json
+        print(json.dumps({
+            "valid": total_conflicts == 0,
+            "projects_scanned": len(results),
+            "conflicts_count": total_conflicts,
+            "projects": results
+        }, indent=2))
+    else:
+        console.print()
+
+    if total_conflicts:
+        sys.exit(1)
+
+
 @main.command()
-@click.argument('file', type=click.Path(exists=True))
+@click.argument('file', type=click.Path(exists=True, allow_dash=True))
 @click.option('--json', 'output_json', is_flag=True, help='Output as JSON for CI/CD integration')
-def validate(file, output_json):
+@click.option('--recursive', '-r', is_flag=True, help='Validate every manifest below FILE (a directory)')
+@click.option('--jobs', '-j', default=1, show_default=True, help='Parallel parse workers for --recursive (0 = all cores)')
+@click.option('--no-cache', is_flag=True, help='Skip the on-disk parse cache (~/.aidep/cache)')
+def validate(file, output_json, recursive, jobs, no_cache):
     """
-    ✅ Validate a requirements file for conflicts.
+    ✅ Validate a requirements file (or a project directory) for conflicts.
+
+    FILE may be - to read requirement lines (pip freeze output) from stdin.
 
     Example: aidep validate requirements.txt
+    Example (all manifests merged): aidep validate .
     Example (CI/CD): aidep validate requirements.txt --json
+    Example (monorepo): aidep validate . --recursive --json
+    Example (installed env): pip freeze | aidep validate -
     """
     file_path = Path(file)
-    scanner = DependencyScanner(file_path.parent)
 
-    if file_path.name.endswith('.toml'):
-        dependencies = scanner.parse_pyproject_toml(file_path)
+    if recursive:
+        if file == '-':
+            raise click.UsageError("--recursive needs a directory, not stdin")
+        _validate_recursive(file_path, output_json, jobs, no_cache)
+        return
+
+    # scan_lines keeps only AI frameworks, so count what was streamed to tell
+    # "empty input" from "no AI frameworks in it"
+    streamed_lines = 0
+
+    def counted(stream):
+        nonlocal streamed_lines
+        for line in stream:
+            if line.strip() and not line.lstrip().startswith('#'):
+                streamed_lines += 1
+            yield line
+
+    if file == '-':
+        # Streamed line by line: the input is never buffered
+        scanner = _make_scanner('.', no_cache)
+        result = scanner.scan_lines(counted(sys.stdin))
+    elif file_path.is_dir():
+        # A directory is validated as one project: all its manifests merged
+        scanner = _make_scanner(file_path, no_cache)
+        result = Project(file_path, scanner)
     else:
-        dependencies = scanner.parse_requirements_txt(file_path)
+        scanner = _make_scanner(file_path.parent, no_cache)
+        result = scanner.scan_file(file_path)
+    dependencies = result.dependencies
 
-    if not dependencies:
+    if not dependencies and not streamed_lines:
         if output_json:
             import json
             print(json.dumps({"valid": True, "conflicts": [], "message": "No dependencies found"}))
@@ -219,13 +599,17 @@ def validate(file, output_json):
     if not ai_deps:
         if output_json:
             import json
-            print(json.dumps({"valid": True, "conflicts": [], "message": "No AI frameworks"}))
+            print(json.dumps({"valid": True, "conflicts": [], "message": "No AI framework dependencies found"}))
         else:
             console.print(f"\n[bold cyan]✅ Validating: {file}[/bold cyan]\n")
-            console.print("[green]✓ No AI framework dependencies to validate[/green]")
+            console.print("[green]✓ No AI framework dependencies found[/green]")
         return
 
-    checker = ConflictChecker(ai_deps)
+    if isinstance(result, Project):
+        graph = result.graph
+    else:
+        graph = graph_from_via(dependencies, result.via) if result.via else None
+    checker = ConflictChecker(ai_deps, result.constraints, graph=graph)
     conflicts = checker.check_all()
 
     if output_json:
@@ -234,17 +618,7 @@ def validate(file, output_json):
             "valid": len(conflicts) == 0,
             "file": str(file),
             "conflicts_count": len(conflicts),
-            "conflicts": [
-                {
-                    "id": c['id'],
-                    "severity": c['severity'],
-                    "description": c['description'],
-                    "affected_packages": c['affected_packages'],
-                    "fix": c['fix'],
-                    "helpful_tip": c.get('helpful_tip', '')
-                }
-                for c in conflicts
-            ]
+            "conflicts": [_conflict_to_json(c) for c in conflicts]
         }
         print(json.dumps(result, indent=2))
     else:
@@ -268,6 +642,10 @@ def validate(file, output_json):
 
             for conflict in conflicts:
                 console.print(f"\n[red]• {conflict['description']}[/red]")
+                for pkg, roots in conflict.get('introduced_by', {}).items():
+                    roots = [r for r in roots if r != pkg.lower()]
+                    if roots:
+                        console.print(f"  [dim]{pkg} pulled in by: {', '.join(roots)}[/dim]")
                 if 'helpful_tip' in conflict:
                     console.print(f"  [cyan]{conflict['helpful_tip']}[/cyan]")
 
@@ -278,6 +656,187 @@ def validate(file, output_json):
         sys.exit(1)
 
 
+def _batch_dependencies(value) -> Dict[str, str]:
+    """A batch record's dependencies: a {name: spec} map or a list of requirement strings."""
+    if isinstance(value, dict):
+        dependencies = {}
+        for name, spec in value.items():
+            if spec is not None and not isinstance(spec, str):
+                raise ValueError(f"Spec for '{name}' must be a string, got {type(spec).__name__}")
+            dependencies[canonicalize_name(name)] = spec or ""
+        return dependencies
+    if isinstance(value, list):
+        dependencies = {}
+        for line in value:
+            req = parse_requirement(line) if isinstance(line, str) else None
+            if req:
+                dependencies[req.key] = req.specifier
+        return dependencies
+    raise ValueError("'dependencies' must be an object or a list of requirement strings")
+
+
+@main.command()
+@click.argument('file', default='-', type=click.Path(exists=True, allow_dash=True))
+def batch(file):
+    """
+    📦 Check many dependency sets from newline-delimited JSON.
+
+    Each input line is {"id": ..., "dependencies": {...}} (optionally with
+    "constraints"); one JSON result line is written per input line. Reads
+    stdin when FILE is - or omitted.
+
+    Example: aidep batch sets.ndjson
+    Example (service): collector | aidep batch - > results.ndjson
+    """
+    import json
+
+    scanner = DependencyScanner()
+    checker = ConflictChecker({})
+    any_conflicts = False
+
+    stream = sys.stdin if file == '-' else open(file, 'r', encoding='utf-8')
+    try:
+        for line_number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+
+            record_id = None
+            try:
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError("Expected a JSON object")
+                record_id = record.get('id')
+                dependencies = scanner.filter_ai_frameworks(_batch_dependencies(record.get('dependencies', {})))
+                constraints = _batch_dependencies(record.get('constraints') or {})
+            except ValueError as e:
+                print(json.dumps({"id": record_id, "line": line_number, "error": str(e)}), flush=True)
+                continue
+
+            conflicts = checker.check(dependencies, constraints)
+            any_conflicts = any_conflicts or bool(conflicts)
+            print(json.dumps({
+                "id": record_id,
+                "valid": not conflicts,
+                "conflicts_count": len(conflicts),
+                "conflicts": [_conflict_to_json(c) for c in conflicts],
+            }), flush=True)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+    if any_conflicts:
+        sys.exit(1)
+
+
+def _display_commit(commit) -> str:
+    """Short sha and UTC date of a history commit."""
+    import time
+
+    return f"{commit.sha[:10]} {time.strftime('%Y-%m-%d', time.gmtime(commit.timestamp))}"
+
+
+@main.command()
+@click.option('--path', default='.', help='Repository (or subdirectory) to audit')
+@click.option('--rev', default='HEAD', show_default=True, help='Audit the first-parent history leading to REV')
+@click.option('--json', 'output_json', is_flag=True, help='Output as JSON')
+def history(path, rev, output_json):
+    """
+    📜 Show when each known conflict entered (and left) each project in git history.
+
+    Replays every first-parent commit that touched a manifest, reading file
+    versions through one `git cat-file --batch` process; each distinct file
+    version is parsed once.
+
+    Example: aidep history --path services/
+    """
+    import json
+
+    try:
+        spans = HistoryAudit(path, rev).run()
+    except ValueError as e:
+        console.print(f"[red]❌ {e}[/red]")
+        sys.exit(1)
+
+    if output_json:
+        print(json.dumps([{
+            "project": span.project.as_posix(),
+            "conflict": _conflict_to_json(span.conflict),
+            "introduced": span.introduced._asdict(),
+            "fixed": span.fixed._asdict() if span.fixed else None,
+        } for span in spans], indent=2))
+        return
+
+    if not spans:
+        console.print(f"[green]✅ No known conflicts in the history of {rev}[/green]")
+        return
+
+    table = Table(show_header=True, header_style="bold magenta")
+    table.add_column("Project", style="cyan")
+    table.add_column("Conflict")
+    table.add_column("Introduced")
+    table.add_column("Fixed")
+    for span in spans:
+        fixed = _display_commit(span.fixed) if span.fixed else "[red]still present[/red]"
+        table.add_row(span.project.as_posix(), span.conflict['id'],
+                      f"{_display_commit(span.introduced)} {span.introduced.subject}", fixed)
+    console.print(table)
+
+    present = sum(1 for span in spans if span.fixed is None)
+    console.print(f"\n{len(spans)} conflict span(s), {present} still present at {rev}\n")
+
+
+@main.command()
+@click.option('--path', default='.', help='Source tree to scan')
+@click.option('--jobs', '-j', default=1, show_default=True, help='Parallel source readers (0 = all cores)')
+@click.option('--no-cache', is_flag=True, help='Skip the on-disk parse cache (~/.aidep/cache)')
+@click.option('--json', 'output_json', is_flag=True, help='Output as JSON')
+def imports(path, jobs, no_cache, output_json):
+    """
+    🔎 Find AI frameworks the code imports but no manifest declares.
+
+    Reads the import statements of every .py file below PATH (skipping the
+    rest of each file) on a process pool, maps import names to
+    distributions (sklearn -> scikit-learn) and compares them with the
+    dependencies of the project each file belongs to. Exits 1 if any are
+    undeclared.
+
+    Example: aidep imports --path services/ --jobs 0
+    """
+    import json
+
+    root = Path(path).resolve()
+    if not root.is_dir():
+        console.print(f"[red]❌ Not a directory: {path}[/red]")
+        sys.exit(1)
+
+    undeclared = audit_imports(root, _make_scanner(root, no_cache), jobs=jobs)
+
+    if output_json:
+        print(json.dumps([{
+            "project": _display_path(item.project, root),
+            "module": item.module,
+            "distribution": item.distribution,
+            "files": [_display_path(f, root) for f in item.files],
+        } for item in undeclared], indent=2))
+    elif not undeclared:
+        console.print("[green]✅ Every imported AI framework is declared[/green]")
+    else:
+        table = Table(show_header=True, header_style="bold magenta")
+        table.add_column("Project", style="cyan")
+        table.add_column("Import")
+        table.add_column("Declare", style="yellow")
+        table.add_column("Imported in")
+        for item in undeclared:
+            files = [_display_path(f, root) for f in item.files]
+            shown = ", ".join(files[:3]) + (f" (+{len(files) - 3} more)" if len(files) > 3 else "")
+            table.add_row(_display_path(item.project, root), item.module, item.distribution, shown)
+        console.print(table)
+        console.print(f"\n{len(undeclared)} undeclared AI framework import(s)\n")
+
+    if undeclared:
+        sys.exit(1)
+
+
 @main.command()
 def doctor():
     """
@@ -0,0 +1,266 @@
+"""
+Conda source.
+Reads conda package specs and the pip: subsection of environment.yml, and
+installed environments straight from their conda-meta records, without
+running conda.
+"""
+
+import fnmatch
+import os
+import re
+import shlex
+from pathlib import Path
+from typing import Dict, Iterator, NamedTuple, Optional, Tuple
+
+from packaging.utils import canonicalize_name
+
+from .pipcmd import PipInstall, parse_install_args
+
+ENVIRONMENT_PATTERNS = ["environment*.yml", "environment*.yaml"]
+
+# Conda package names that differ from the PyPI distribution
+CONDA_TO_PYPI = {
+    "pytorch": "torch",
+    "pytorch-cpu": "torch",
+    "pytorch-gpu": "torch",
+    "tensorflow-gpu": "tensorflow",
+}
+
+# Packages whose CUDA flavour pip spells as a +cuXYZ local version
+CUDA_PACKAGES = {"torch", "torchvision", "torchaudio"}
+
+# Conda-only packages that select a torch build variant; not installable frameworks
+TORCH_VARIANT_PACKAGES = {"pytorch-cuda", "pytorch-mutex"}
+
+_CUDA_BUILD_RE = re.compile(r'cu(?:da)?(\d+)\.?(\d+)')
+_SPEC_NAME_RE = re.compile(r'^([A-Za-z0-9_.\-]+)\s*(.*)$')
+_BRACKET_VERSION_RE = re.compile(r'version\s*=\s*["\']?([^"\',\]]+)')
+_OPERATOR_RE = re.compile(r'[<>=!~,|]')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+class CondaEnvironment(NamedTuple):
+    """What an environment.yml asks for."""
+
+    dependencies: Dict[str, str]
+    pip: PipInstall
+
+
+def is_environment_file(name: str) -> bool:
+    """Check if a file name looks like a conda environment file."""
+    return any(fnmatch.fnmatchcase(name, pattern) for pattern in ENVIRONMENT_PATTERNS)
+
+
+def _cuda_tag(build: str) -> str:
+    """py3.11_cuda12.1_cudnn8.9.2_0 -> +cu121, py311_cu118 -> +cu118"""
+    match = _CUDA_BUILD_RE.search(build)
+    return f"+cu{match.group(1)}{match.group(2)}" if match else ""
+
+
+def _with_cuda_tag(spec: str, tag: str) -> Optional[str]:
+    """
+    Add a +cuXYZ tag to a torch package pin, or None if it can't carry one.
+
+    A fuzzy ==X.Y.Z.* pin is treated as ==X.Y.Z (torch packages never
+    publish a fourth release component); shorter fuzzy pins stay untagged,
+    since a local version can't follow a wildcard.
+    """
+    if not tag or not spec.startswith('==') or '+' in spec:
+        return None
+    if spec.endswith('.*'):
+        version = spec[2:-2]
+        if version.count('.') != 2:
+            return None
+        spec = f"=={version}"
+    return spec + tag
+
+
+def pypi_name(conda_name: str) -> str:
+    """Map a conda package name to the canonical PyPI name."""
+    name = canonicalize_name(conda_name)
+    return CONDA_TO_PYPI.get(name, name)
+
+
+def parse_conda_spec(spec: str) -> Optional[Tuple[str, str]]:
+    """
+    Parse a conda match spec into (pypi name, pip-style spec).
+
+    Handles channel::name, name=1.2 (fuzzy: ==1.2.*), name=1.2=build and
+    name 1.2 build (exact), name>=1.2, name >=1.2, <2 and
+    name[version='>=1.2']. A CUDA build string on torch packages becomes a
+    +cuXYZ local version, as pip spells it.
+    """
+    spec = spec.strip().strip('"\'')
+    if '::' in spec:
+        spec = spec.split('::', 1)[1]
+
+    match = _SPEC_NAME_RE.match(spec)
+    if not match or not match.group(1):
+        return None
+
+    name = pypi_name(match.group(1))
+    rest = match.group(2).strip()
+    build = ''
+    fuzzy = False
+
+    if rest.startswith('['):
+        bracket = _BRACKET_VERSION_RE.search(rest)
+        version = bracket.group(1).strip() if bracket else ''
+    elif rest.startswith('=') and not rest.startswith('=='):
+        version, _, build = rest[1:].partition('=')
+        # A single = without a build is conda's fuzzy match: =1.2 means 1.2.*
+        fuzzy = not build
+    elif _OPERATOR_RE.search(rest):
+        # An operator means the rest is all version constraints, no build string
+        version = _WHITESPACE_RE.sub('', rest)
+    elif ' ' in rest:
+        version, _, build = rest.partition(' ')
+        build = build.strip()
+    else:
+        version = rest
+
+    if version.endswith('*') and not version.endswith('.*'):
+        version = version[:-1].rstrip('.') + '.*'
+    if version and version[0].isdigit():
+        if fuzzy and not version.endswith('*'):
+            version += '.*'
+        version = f"=={version}"
+
+    if build and version.startswith('==') and name in CUDA_PACKAGES and '+' not in version:
+        version += _cuda_tag(build)
+
+    return name, version
+
+
+def parse_environment_yml(file_path: Path) -> CondaEnvironment:
+    """
+    Read the dependencies list of an environment.yml.
+
+    A line scanner over the block-style YAML conda writes: no YAML library
+    is needed and nothing outside `dependencies:` is interpreted.
+    """
+    dependencies: Dict[str, str] = {}
+    pip = PipInstall([], [], [])
+    in_dependencies = False
+    pip_indent = None
+
+    with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            stripped = line.strip()
+            if not stripped or stripped.startswith('#'):
+                continue
+            if ' #' in stripped:
+                stripped = stripped.split(' #', 1)[0].rstrip()
+
+            indent = len(line) - len(line.lstrip())
+            if indent == 0 and not stripped.startswith('-'):
+                in_dependencies = stripped.startswith('dependencies:')
+                pip_indent = None
+                continue
+
+            if not in_dependencies or not stripped.startswith('-'):
+                continue
+
+            item = stripped[1:].strip().strip('"\'')
+            if pip_indent is not None and indent > pip_indent:
+                try:
+                    parse_install_args(shlex.split(item), pip)
+                except ValueError:
+                    continue
+                continue
+
+            pip_indent = None
+            if item == 'pip:':
+                pip_indent = indent
+                continue
+
+            parsed = parse_conda_spec(item)
+            if parsed and parsed[0] != 'python':
+                dependencies[parsed[0]] = parsed[1]
+
+    # pytorch-cuda=12.1 selects the CUDA flavour of the torch packages
+    cuda = dependencies.pop('pytorch-cuda', '')
+    dependencies.pop('pytorch-mutex', None)
+    if cuda.startswith('=='):
+        tag = _cuda_tag('cuda' + cuda[2:])
+        for name in CUDA_PACKAGES & dependencies.keys():
+            tagged = _with_cuda_tag(dependencies[name], tag)
+            if tagged:
+                dependencies[name] = tagged
+
+    return CondaEnvironment(dependencies, pip)
+
+
+def _split_record_name(file_name: str) -> Optional[Tuple[str, str, str]]:
+    """pytorch-2.1.0-py3.11_cuda12.1_cudnn8.9.2_0.json -> (pytorch, 2.1.0, build)"""
+    parts = file_name[:-len('.json')].rsplit('-', 2)
+    return tuple(parts) if len(parts) == 3 else None
+
+
+def _site_packages(prefix: Path) -> Iterator[Path]:
+    """Site-packages directories of an environment prefix (POSIX and Windows layouts)."""
+    lib = prefix / "lib"
+    try:
+        for entry in os.scandir(lib):
+            if entry.name.startswith('python') and entry.is_dir():
+                yield Path(entry.path) / "site-packages"
+    except OSError:
+        pass
+    yield prefix / "Lib" / "site-packages"
+
+
+def read_conda_meta(prefix: Path) -> Dict[str, str]:
+    """
+    Installed packages of a conda environment as {pypi name: "==version"}.
+
+    Versions come from the file names of conda-meta/*.json records and the
+    *.dist-info directories of pip-installed packages, so no JSON is parsed
+    and conda itself never runs. Conda records win over dist-info. The
+    pytorch-cuda / pytorch-mutex variant selectors are not reported.
+    """
+    prefix = Path(prefix)
+    dependencies: Dict[str, str] = {}
+
+    for site_packages in _site_packages(prefix):
+        try:
+            entries = list(os.scandir(site_packages))
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.name.endswith('.dist-info'):
+                name, _, version = entry.name[:-len('.dist-info')].partition('-')
+                if version:
+                    dependencies[canonicalize_name(name)] = f"=={version}"
+
+    try:
+        records = list(os.scandir(prefix / "conda-meta"))
+    except OSError:
+        records = []
+
+    cuda_tag = ''
+    untagged = []
+    for record in records:
+        if not record.name.endswith('.json'):
+            continue
+        parsed = _split_record_name(record.name)
+        if not parsed:
+            continue
+        name, version, build = parsed
+        if name in TORCH_VARIANT_PACKAGES:
+            if name == 'pytorch-cuda':
+                cuda_tag = _cuda_tag('cuda' + version)
+            continue
+        name = pypi_name(name)
+        spec = f"=={version}"
+        if name in CUDA_PACKAGES:
+            tag = _cuda_tag(build)
+            if not tag:
+                untagged.append(name)
+            spec += tag
+        dependencies[name] = spec
+
+    # A torch build string without a CUDA version takes pytorch-cuda's
+    for name in untagged:
+        dependencies[name] += cuda_tag
+
+    return dependencies
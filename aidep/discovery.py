@@ -0,0 +1,204 @@
+"""
+Manifest discovery module.
+Walks a project tree with os.scandir and yields dependency manifests (or
+any other files) lazily.
+"""
+
+import fnmatch
+import os
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Tuple
+
+# Directories that never contain manifests we care about
+PRUNED_DIRS = {
+    ".git",
+    ".hg",
+    ".svn",
+    "node_modules",
+    "__pycache__",
+    ".tox",
+    ".nox",
+    ".venv",
+    "venv",
+    ".eggs",
+    ".mypy_cache",
+    ".pytest_cache",
+    ".ruff_cache",
+    "site-packages",
+    ".ipynb_checkpoints",
+}
+
+# A directory holding one of these files is a virtualenv / interpreter prefix
+VENV_MARKERS = {"pyvenv.cfg"}
+
+MANIFEST_NAMES = {
+    "pyproject.toml",
+    "setup.py",
+    "setup.cfg",
+    "poetry.lock",
+    "uv.lock",
+    "pdm.lock",
+    "Pipfile.lock",
+}
+
+MANIFEST_PATTERNS = [
+    "requirements*.txt",
+    "*.ipynb",
+    "Dockerfile",
+    "Dockerfile.*",
+    "*.Dockerfile",
+    "*.dockerfile",
+    "Containerfile",
+    "Containerfile.*",
+    "*.sh",
+    "environment*.yml",
+    "environment*.yaml",
+    "*.cdx.json",
+    "*.spdx.json",
+]
+
+# Every *.txt inside one of these directories is a manifest (requirements/base.txt)
+MANIFEST_DIRS = {"requirements"}
+
+
+class GitignoreRules:
+    """Patterns from a single .gitignore file, matched relative to its directory."""
+
+    def __init__(self, base: str, patterns: List[Tuple[str, bool, bool, bool]]):
+        self.base = base
+        self.patterns = patterns
+
+    @classmethod
+    def from_file(cls, base: str, path: str) -> Optional["GitignoreRules"]:
+        """Load rules from a .gitignore file, or None if it is empty/unreadable."""
+        patterns = []
+        try:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                for line in f:
+                    line = line.rstrip('\n').rstrip()
+                    if not line or line.startswith('#'):
+                        continue
+
+                    negated = line.startswith('!')
+                    if negated:
+                        line = line[1:]
+
+                    dir_only = line.endswith('/')
+                    line = line.rstrip('/')
+
+                    # A slash anywhere but the end anchors the pattern to the base dir
+                    anchored = '/' in line
+                    line = line.lstrip('/')
+                    if line.startswith('**/'):
+                        line = line[3:]
+                        anchored = '/' in line
+
+                    if line:
+                        patterns.append((line, negated, dir_only, anchored))
+        except OSError:
+            return None
+
+        return cls(base, patterns) if patterns else None
+
+    def match(self, rel_path: str, name: str, is_dir: bool) -> Optional[bool]:
+        """Return True (ignored), False (re-included) or None (no rule matched)."""
+        result = None
+        for pattern, negated, dir_only, anchored in self.patterns:
+            if dir_only and not is_dir:
+                continue
+            target = rel_path if anchored else name
+            if fnmatch.fnmatchcase(target, pattern):
+                result = not negated
+        return result
+
+
+def is_manifest(name: str, parent_name: str = "") -> bool:
+    """Check if a file name looks like a dependency manifest."""
+    if name in MANIFEST_NAMES:
+        return True
+    if parent_name in MANIFEST_DIRS and name.endswith('.txt'):
+        return True
+    return any(fnmatch.fnmatchcase(name, pattern) for pattern in MANIFEST_PATTERNS)
+
+
+def is_requirements_file(name: str, parent_name: str = "") -> bool:
+    """Check if a manifest is a pip requirements file (requirements*.txt, requirements/*.txt)."""
+    if parent_name in MANIFEST_DIRS and name.endswith('.txt'):
+        return True
+    return fnmatch.fnmatchcase(name, "requirements*.txt")
+
+
+def _is_ignored(rules: List[GitignoreRules], path: str, name: str, is_dir: bool) -> bool:
+    """Apply stacked .gitignore rules, innermost file last (last match wins)."""
+    ignored = False
+    for rule_set in rules:
+        rel_path = os.path.relpath(path, rule_set.base).replace(os.sep, '/')
+        matched = rule_set.match(rel_path, name, is_dir)
+        if matched is not None:
+            ignored = matched
+    return ignored
+
+
+def iter_manifests(root, respect_gitignore: bool = True) -> Iterator[Path]:
+    """
+    Yield every dependency manifest below root, in a stable sorted order.
+
+    Directories in PRUNED_DIRS, virtualenvs and .gitignore'd trees are never
+    entered. Symlinked directories are not followed.
+    """
+    return iter_files(root, is_manifest, respect_gitignore)
+
+
+def iter_files(root, match: Callable[[str, str], bool], respect_gitignore: bool = True) -> Iterator[Path]:
+    """Yield every file below root for which match(name, parent_name) holds, pruned like iter_manifests."""
+    root = os.fspath(root)
+    if os.path.isfile(root):
+        yield Path(root)
+        return
+
+    stack = [(root, [])]
+
+    while stack:
+        directory, rules = stack.pop()
+
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+
+        names = {entry.name for entry in entries}
+        if directory != root and names & VENV_MARKERS:
+            continue
+
+        if respect_gitignore and '.gitignore' in names:
+            rule_set = GitignoreRules.from_file(directory, os.path.join(directory, '.gitignore'))
+            if rule_set:
+                rules = rules + [rule_set]
+
+        parent_name = os.path.basename(directory)
+        subdirs = []
+
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+
+            if is_dir and entry.name in PRUNED_DIRS:
+                continue
+            if rules and _is_ignored(rules, entry.path, entry.name, is_dir):
+                continue
+
+            if is_dir:
+                subdirs.append(entry.path)
+            elif match(entry.name, parent_name):
+                yield Path(entry.path)
+
+        # requirements/ belongs to this directory's project, so visit it first
+        # to keep each project's manifests contiguous
+        subdirs.sort(key=lambda path: os.path.basename(path) not in MANIFEST_DIRS)
+
+        # Reverse so the sorted order is preserved when popping
+        for subdir in reversed(subdirs):
+            stack.append((subdir, rules))
@@ -0,0 +1,257 @@
+"""
+Distribution archive source.
+Reads name, version and Requires-Dist from wheel METADATA through the zip
+central directory, and from sdist PKG-INFO / egg-info requires.txt while
+streaming the tarball, so no archive is extracted.
+"""
+
+import os
+import re
+import tarfile
+import zipfile
+from email.parser import HeaderParser
+from pathlib import Path
+from email.message import Message
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+from packaging.utils import canonicalize_name
+from packaging.version import InvalidVersion, Version
+
+from .graph import DependencyGraph
+from .requirement import parse_requirement
+
+SDIST_SUFFIXES = ('.tar.gz', '.zip')
+
+_EXTRA_MARKER_RE = re.compile(r'\bextra\s*==')
+
+
+class DistMetadata(NamedTuple):
+    """Core metadata of one distribution archive."""
+
+    name: str
+    version: str
+    requires_dist: List[str]
+
+
+def _parse_headers(text: str) -> Message:
+    return HeaderParser().parsestr(text, headersonly=True)
+
+
+def parse_metadata(text: str) -> Optional[DistMetadata]:
+    """Parse METADATA / PKG-INFO headers (the body is ignored)."""
+    return _metadata_from_headers(_parse_headers(text))
+
+
+def _metadata_from_headers(headers: Message) -> Optional[DistMetadata]:
+    name = headers.get('Name')
+    version = headers.get('Version')
+    if not name or not version:
+        return None
+    return DistMetadata(canonicalize_name(name.strip()), version.strip(),
+                        [req.strip() for req in headers.get_all('Requires-Dist') or []])
+
+
+def read_wheel_metadata(file_path: Path) -> Optional[DistMetadata]:
+    """
+    Read a wheel's METADATA.
+
+    zipfile only parses the central directory at the end of the archive
+    and then seeks straight to the one member, so the I/O is proportional
+    to the metadata, not the wheel size.
+    """
+    try:
+        with zipfile.ZipFile(file_path) as archive:
+            for name in archive.namelist():
+                parts = name.split('/')
+                if len(parts) == 2 and parts[0].endswith('.dist-info') and parts[1] == 'METADATA':
+                    return parse_metadata(archive.read(name).decode('utf-8', errors='replace'))
+    except (OSError, zipfile.BadZipFile):
+        return None
+    return None
+
+
+def parse_requires_txt(text: str) -> List[str]:
+    """
+    Convert an egg-info requires.txt to Requires-Dist strings.
+    [extra], [:marker] and [extra:marker] sections become environment markers.
+    """
+    requires = []
+    marker = ''
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        if line.startswith('[') and line.endswith(']'):
+            extra, _, condition = line[1:-1].partition(':')
+            parts = [f'extra == "{extra.strip()}"'] if extra.strip() else []
+            if condition.strip():
+                parts.append(f"({condition.strip()})" if parts else condition.strip())
+            marker = ' and '.join(parts)
+            continue
+        requires.append(f"{line}; {marker}" if marker else line)
+    return requires
+
+
+def _requires_are_final(headers: Message) -> bool:
+    """
+    Whether PKG-INFO alone gives the requirements: it lists Requires-Dist,
+    or it is metadata 2.2+ (PEP 643) and Requires-Dist is not Dynamic.
+    """
+    if headers.get_all('Requires-Dist'):
+        return True
+    try:
+        version = Version(headers.get('Metadata-Version', '0'))
+    except InvalidVersion:
+        return False
+    dynamic = {field.strip().lower() for field in headers.get_all('Dynamic') or []}
+    return version >= Version('2.2') and 'requires-dist' not in dynamic
+
+
+def _sdist_member_kind(name: str) -> Optional[str]:
+    """Classify an sdist member: 'pkg-info' (top level), 'egg-pkg-info', 'requires' or None."""
+    parts = name.strip('/').split('/')
+    if len(parts) == 2 and parts[1] == 'PKG-INFO':
+        return 'pkg-info'
+    if 3 <= len(parts) <= 4 and parts[-2].endswith('.egg-info'):
+        if parts[-1] == 'PKG-INFO':
+            return 'egg-pkg-info'
+        if parts[-1] == 'requires.txt':
+            return 'requires'
+    return None
+
+
+class _SdistReader:
+    """Collects metadata members as they stream past; done() says when to stop."""
+
+    def __init__(self):
+        self.headers: Optional[Message] = None
+        self.egg_headers: Optional[Message] = None
+        self.requires: Optional[List[str]] = None
+
+    def feed(self, kind: str, data: bytes):
+        text = data.decode('utf-8', errors='replace')
+        if kind == 'pkg-info':
+            self.headers = _parse_headers(text)
+        elif kind == 'egg-pkg-info':
+            self.egg_headers = _parse_headers(text)
+        else:
+            self.requires = parse_requires_txt(text)
+
+    def done(self) -> bool:
+        return self.headers is not None and (self.requires is not None or _requires_are_final(self.headers))
+
+    def metadata(self) -> Optional[DistMetadata]:
+        headers = self.headers if self.headers is not None else self.egg_headers
+        if headers is None:
+            return None
+        meta = _metadata_from_headers(headers)
+        if meta and not meta.requires_dist and self.requires:
+            meta = meta._replace(requires_dist=self.requires)
+        return meta
+
+
+def read_sdist_metadata(file_path: Path) -> Optional[DistMetadata]:
+    """
+    Read an sdist's PKG-INFO (and egg-info requires.txt when PKG-INFO has no
+    Requires-Dist).
+
+    A .tar.gz is read as a forward-only stream and abandoned as soon as the
+    metadata is complete, so the rest of the tarball is never decompressed.
+    A .zip sdist only reads its central directory and the metadata members.
+    """
+    reader = _SdistReader()
+    try:
+        if file_path.name.endswith('.zip'):
+            with zipfile.ZipFile(file_path) as archive:
+                for name in archive.namelist():
+                    kind = _sdist_member_kind(name)
+                    if kind:
+                        reader.feed(kind, archive.read(name))
+                        if reader.done():
+                            break
+        else:
+            with tarfile.open(file_path, mode='r|gz') as archive:
+                for member in archive:
+                    kind = _sdist_member_kind(member.name) if member.isfile() else None
+                    if kind:
+                        reader.feed(kind, archive.extractfile(member).read())
+                        if reader.done():
+                            break
+    except (OSError, EOFError, tarfile.TarError, zipfile.BadZipFile):
+        return None
+    return reader.metadata()
+
+
+def read_distribution(file_path: Path) -> Optional[DistMetadata]:
+    """Read the metadata of any supported distribution archive."""
+    file_path = Path(file_path)
+    if file_path.name.endswith('.whl'):
+        return read_wheel_metadata(file_path)
+    return read_sdist_metadata(file_path)
+
+
+def is_distribution(name: str) -> bool:
+    """Check if a file name is a supported distribution archive (wheel or sdist)."""
+    return name.endswith('.whl') or name.endswith(SDIST_SUFFIXES)
+
+
+def install_requires(dist: DistMetadata) -> List[str]:
+    """Requires-Dist entries that are not behind an extra."""
+    return [req for req in dist.requires_dist if not _EXTRA_MARKER_RE.search(req.partition(';')[2])]
+
+
+def iter_wheelhouse(directory) -> Iterator[Path]:
+    """Yield every distribution archive in a wheelhouse directory tree, sorted."""
+    stack = [os.fspath(directory)]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+        subdirs = []
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+            elif is_distribution(entry.name):
+                yield Path(entry.path)
+        stack.extend(reversed(subdirs))
+
+
+def _newer(version: str, than: str) -> bool:
+    try:
+        return Version(version) > Version(than)
+    except InvalidVersion:
+        return version > than
+
+
+def inventory(distributions: Iterable[Optional[DistMetadata]]):
+    """
+    Turn distribution metadata into ({name: "==version"}, graph).
+
+    When several versions of a package are present the newest wins.
+    Requires-Dist edges (extras excluded) only point at packages that are
+    present, and a package nothing else requires is a top-level root.
+    """
+    newest: Dict[str, DistMetadata] = {}
+    for dist in distributions:
+        if dist is None:
+            continue
+        current = newest.get(dist.name)
+        if current is None or _newer(dist.version, current.version):
+            newest[dist.name] = dist
+
+    graph = DependencyGraph()
+    for dist in newest.values():
+        for line in install_requires(dist):
+            req = parse_requirement(line)
+            if req and req.key in newest:
+                graph.add_edge(dist.name, req.key)
+    for name in newest:
+        if not graph.parents(name):
+            graph.add_root(name)
+
+    dependencies = {name: f"=={dist.version}" for name, dist in newest.items()}
+    return dependencies, graph
+
@@ -0,0 +1,119 @@
+"""
+Dockerfile and shell script source.
+Pulls the pip install commands out of RUN instructions and bootstrap
+scripts without building anything.
+"""
+
+import fnmatch
+import json
+import re
+import shlex
+from pathlib import Path
+from typing import Iterator, List
+
+from .pipcmd import PipInstall, join_continuations, parse_pip_commands
+
+DOCKERFILE_PATTERNS = [
+    "Dockerfile",
+    "Dockerfile.*",
+    "*.Dockerfile",
+    "*.dockerfile",
+    "Containerfile",
+    "Containerfile.*",
+]
+
+SHELL_SCRIPT_PATTERNS = ["*.sh"]
+
+# Parser directive at the top of a Dockerfile: # escape=`
+_ESCAPE_DIRECTIVE_RE = re.compile(r'^#\s*escape\s*=\s*(\S)\s*$', re.IGNORECASE)
+_HEREDOC_RE = re.compile(r'<<-?\s*["\']?(\w+)["\']?')
+
+
+def is_dockerfile(name: str) -> bool:
+    """Check if a file name looks like a Dockerfile / Containerfile."""
+    return any(fnmatch.fnmatchcase(name, pattern) for pattern in DOCKERFILE_PATTERNS)
+
+
+def is_shell_script(name: str) -> bool:
+    """Check if a file name looks like a shell script."""
+    return any(fnmatch.fnmatchcase(name, pattern) for pattern in SHELL_SCRIPT_PATTERNS)
+
+
+def _exec_form(arguments: str) -> str:
+    """Turn RUN ["cmd", "arg"] into a shell line (unwrapping sh -c "...")."""
+    try:
+        argv = json.loads(arguments)
+    except ValueError:
+        return arguments
+    if not isinstance(argv, list) or not all(isinstance(arg, str) for arg in argv):
+        return arguments
+    if len(argv) >= 3 and argv[1] == '-c':
+        return argv[2]
+    return shlex.join(argv)
+
+
+def iter_run_commands(text: str) -> Iterator[str]:
+    """Yield the shell lines run by each RUN instruction, heredoc bodies included."""
+    lines = text.splitlines()
+    escape = '\\'
+
+    # Parser directives are only honoured before any other line
+    for line in lines:
+        match = _ESCAPE_DIRECTIVE_RE.match(line.strip())
+        if match:
+            escape = match.group(1)
+        elif not line.strip().startswith('#'):
+            break
+
+    i = 0
+    while i < len(lines):
+        stripped = lines[i].strip()
+        i += 1
+        if not stripped or stripped.startswith('#'):
+            continue
+
+        parts = stripped.split(None, 1)
+        instruction = parts[0].upper()
+        arguments = parts[1] if len(parts) > 1 else ''
+
+        while arguments.endswith(escape) and i < len(lines):
+            arguments = arguments[:-1].rstrip()
+            # Comment and blank lines inside a continued instruction are skipped
+            while i < len(lines) and (not lines[i].strip() or lines[i].strip().startswith('#')):
+                i += 1
+            if i < len(lines):
+                arguments += ' ' + lines[i].strip()
+                i += 1
+
+        if instruction != 'RUN':
+            continue
+
+        # Strip RUN flags (--mount=..., --network=...)
+        while arguments.startswith('--'):
+            arguments = arguments.split(None, 1)[1] if ' ' in arguments else ''
+
+        if arguments.startswith('['):
+            yield _exec_form(arguments)
+            continue
+
+        yield arguments
+        for delimiter in _HEREDOC_RE.findall(arguments):
+            body = []
+            while i < len(lines) and lines[i].strip() != delimiter:
+                body.append(lines[i])
+                i += 1
+            i += 1
+            yield from join_continuations(body)
+
+
+def parse_dockerfile(file_path: Path) -> PipInstall:
+    """Collect every pip install run by a Dockerfile."""
+    with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+        return parse_pip_commands(iter_run_commands(f.read()))
+
+
+def parse_shell_script(file_path: Path) -> PipInstall:
+    """Collect every pip install run by a shell script."""
+    with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+        lines: List[str] = join_continuations(f)
+    return parse_pip_commands(lines)
@@ -0,0 +1,97 @@
+"""
+Dependency graph.
+Keeps reverse edges (package -> the packages that require it) so a
+conflicting package can be traced back to the top-level requirements
+that pulled it in.
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Set
+
+from packaging.utils import canonicalize_name
+
+
+class DependencyGraph:
+    """Reverse-dependency graph over canonical package names."""
+
+    def __init__(self):
+        self._parents: Dict[str, Set[str]] = {}
+        self.roots: Set[str] = set()
+        self._introduced_by: Dict[str, List[str]] = {}
+
+    def add_root(self, name: str):
+        """Mark a package as a top-level (directly requested) requirement."""
+        self.roots.add(name)
+        self._introduced_by.clear()
+
+    def add_edge(self, parent: str, child: str):
+        """Record that parent requires child."""
+        if parent == child:
+            return
+        self._parents.setdefault(child, set()).add(parent)
+        self._introduced_by.clear()
+
+    def parents(self, name: str) -> Set[str]:
+        """Packages that directly require name."""
+        return self._parents.get(name, set())
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.roots or name in self._parents
+
+    def introduced_by(self, name: str) -> List[str]:
+        """
+        Top-level requirements that (transitively) pull in name.
+        A root introduces itself; packages no root reaches give [].
+        """
+        cached = self._introduced_by.get(name)
+        if cached is not None:
+            return cached
+
+        found = set()
+        seen = {name}
+        stack = [name]
+        while stack:
+            current = stack.pop()
+            if current in self.roots:
+                found.add(current)
+            for parent in self._parents.get(current, ()):
+                if parent not in seen:
+                    seen.add(parent)
+                    stack.append(parent)
+
+        result = sorted(found)
+        self._introduced_by[name] = result
+        return result
+
+    def merge(self, other: Optional["DependencyGraph"]):
+        """Add every root and edge of another graph."""
+        if other is None:
+            return
+        self.roots |= other.roots
+        for child, parents in other._parents.items():
+            self._parents.setdefault(child, set()).update(parents)
+        self._introduced_by.clear()
+
+
+def _is_top_level(entry: str) -> bool:
+    """'-r requirements.in' and 'myapp (pyproject.toml)' mean a package was asked for directly."""
+    return entry.startswith(('-r ', '--requirement ')) or entry.endswith(')')
+
+
+def graph_from_via(packages: Iterable[str], via: Dict[str, Sequence[str]]) -> DependencyGraph:
+    """
+    Build a graph from pip-compile "# via" annotations.
+    Packages without an annotation, or annotated with a -r input file or
+    the project itself, are roots; -c entries aren't edges.
+    """
+    graph = DependencyGraph()
+    for package in packages:
+        entries = via.get(package)
+        if not entries:
+            graph.add_root(package)
+            continue
+        for entry in entries:
+            if _is_top_level(entry):
+                graph.add_root(package)
+            elif not entry.startswith(('-c ', '--constraint ')):
+                graph.add_edge(canonicalize_name(entry), package)
+    return graph
@@ -0,0 +1,272 @@
+"""
+Git history audit.
+Replays the first-parent history of a repository's dependency manifests and
+records when each known conflict entered (and left) each project. File
+contents stream through one long-lived `git cat-file --batch` process, and
+every distinct file version is parsed once.
+"""
+
+import os
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from .changes import git_toplevel, manifest_pathspecs
+from .checker import ConflictChecker
+from .discovery import PRUNED_DIRS, is_manifest, is_requirements_file
+from .includes import IncludeResolver, RequirementsFile
+from .project import Project, project_root, source_rank
+from .scanner import DependencyScanner, ScanResult
+
+# All-zero object id git uses for "no blob" (added / deleted files)
+NULL_SHA = "0" * 40
+
+_COMMIT_MARKER = b'\x01'
+
+
+class Commit(NamedTuple):
+    """A commit on the audited history."""
+
+    sha: str
+    timestamp: int
+    subject: str
+
+
+class ConflictSpan(NamedTuple):
+    """One stretch of history during which a project had a conflict."""
+
+    project: Path
+    conflict: Dict
+    introduced: Commit
+    # None while the conflict is still present at the audited revision
+    fixed: Optional[Commit]
+
+
+class BlobReader:
+    """Reads blobs by object id through one `git cat-file --batch` process."""
+
+    def __init__(self, repo: Path):
+        self._process = subprocess.Popen(['git', '-C', str(repo), 'cat-file', '--batch'],
+                                         stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+
+    def read(self, sha: str) -> bytes:
+        """Contents of a blob (b'' if it is missing)."""
+        self._process.stdin.write(sha.encode() + b'\n')
+        self._process.stdin.flush()
+        header = self._process.stdout.readline().split()
+        if len(header) < 3 or header[1] == b'missing':
+            return b''
+        data = self._process.stdout.read(int(header[2]))
+        self._process.stdout.read(1)  # trailing newline
+        return data
+
+    def close(self):
+        self._process.stdin.close()
+        self._process.stdout.close()
+        self._process.wait()
+
+    def __enter__(self) -> "BlobReader":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _iter_tokens(stream) -> Iterator[bytes]:
+    """NUL-separated tokens of a stream, read in chunks."""
+    pending = b''
+    for chunk in iter(lambda: stream.read(64 * 1024), b''):
+        parts = (pending + chunk).split(b'\0')
+        pending = parts.pop()
+        yield from parts
+    if pending:
+        yield pending
+
+
+def iter_manifest_commits(top: Path, rev: str = "HEAD") -> Iterator[Tuple[Commit, List[Tuple[str, str]]]]:
+    """
+    Yield (commit, [(path, blob sha)]) oldest first, for the first-parent
+    commits leading to rev that touch a manifest. A deleted file has the
+    all-zero sha. Commits that touch no manifest never leave git.
+    """
+    command = ['git', '-C', str(top), 'log', '--reverse', '--first-parent', '-m', '--no-renames',
+               '--raw', '--no-abbrev', '-z', '--format=%x01%H %ct %s', rev, '--', *manifest_pathspecs()]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    commit = None
+    changes: List[Tuple[str, str]] = []
+    tokens = _iter_tokens(process.stdout)
+    for token in tokens:
+        token = token.lstrip(b'\n')
+        if token.startswith(_COMMIT_MARKER):
+            if commit:
+                yield commit, changes
+            sha, timestamp, subject = (token[1:].decode('utf-8', errors='replace').split(' ', 2) + [''])[:3]
+            commit = Commit(sha, int(timestamp), subject)
+            changes = []
+        elif token.startswith(b':'):
+            # :old_mode new_mode old_sha new_sha status, then the path token
+            new_sha = token.split()[3].decode()
+            changes.append((os.fsdecode(next(tokens)), new_sha))
+    if commit:
+        yield commit, changes
+
+    stderr = process.stderr.read()
+    if process.wait() != 0:
+        raise ValueError(stderr.decode('utf-8', errors='replace').strip() or "git log failed")
+
+
+class _BlobResolver(IncludeResolver):
+    """An IncludeResolver that reads files from the replayed tree instead of the disk."""
+
+    def __init__(self, audit: "HistoryAudit"):
+        super().__init__()
+        self._audit = audit
+        self._versions: Dict[Tuple[Path, Optional[str]], RequirementsFile] = {}
+
+    def load(self, file_path: Path) -> RequirementsFile:
+        file_path = Path(os.path.normpath(file_path))
+        sha = self._audit.tree.get(self._audit.relative(file_path))
+        key = (file_path, sha)
+        parsed = self._versions.get(key)
+        if parsed is None:
+            text = self._audit.blobs.read(sha).decode('utf-8', errors='replace') if sha else ""
+            parsed = self.parse(file_path, text)
+            self._versions[key] = parsed
+        return parsed
+
+    def exists(self, file_path: Path) -> bool:
+        return self._audit.relative(Path(os.path.normpath(file_path))) in self._audit.tree
+
+
+class HistoryAudit:
+    """
+    Replays manifest history commit by commit.
+
+    Only projects a commit touches (directly or through a -r / -c include)
+    are re-checked, and a project's check is memoized on the blob shas of
+    every file it read, so reverting to an earlier version costs nothing.
+    """
+
+    def __init__(self, path, rev: str = "HEAD"):
+        self.top = git_toplevel(path)
+        self.rev = rev
+        prefix = Path(path).resolve().relative_to(self.top).as_posix()
+        self.prefix = '' if prefix == '.' else prefix
+        # Replayed tree: top-relative posix path -> blob sha
+        self.tree: Dict[str, str] = {}
+        self.blobs: Optional[BlobReader] = None
+        self.scanner = DependencyScanner(str(self.top), resolver=_BlobResolver(self), rules_only=True)
+        self.checker = ConflictChecker({})
+        self._projects: Dict[str, Set[str]] = {}
+        self._readers: Dict[str, Set[str]] = {}
+        self._resolved: Dict[str, Tuple[ScanResult, Set[str], List[Tuple[str, Optional[str]]]]] = {}
+        self._checks: Dict[Tuple, List[Dict]] = {}
+        self._scratch: Optional[Path] = None
+
+    def relative(self, file_path: Path) -> str:
+        """Top-relative posix path of an absolute path ('' outside the repository)."""
+        try:
+            return file_path.relative_to(self.top).as_posix()
+        except ValueError:
+            return ''
+
+    def _in_scope(self, root: str) -> bool:
+        if any(part in PRUNED_DIRS for part in root.split('/')):
+            return False
+        return not self.prefix or root == self.prefix or root.startswith(self.prefix + '/')
+
+    def _scan(self, rel: str) -> Tuple[ScanResult, Set[str]]:
+        """Parse one manifest version; returns the files it read."""
+        path = self.top / rel
+        # Reuse the last parse while every file it read is unchanged
+        cached = self._resolved.get(rel)
+        if cached and all(self.tree.get(f) == sha for f, sha in cached[2]):
+            return cached[0], cached[1]
+
+        if is_requirements_file(path.name, path.parent.name):
+            resolved = self.scanner.resolver.resolve(path)
+            via = {name: list(parents) for name, parents in resolved.via.items()}
+            result = ScanResult(path, resolved.dependencies, resolved.constraints, via or None)
+            files = resolved.files
+        else:
+            # Other formats are parsed from a scratch copy named like the
+            # original; pip install -r / -c targets still resolve next to
+            # the original, through the replayed tree
+            scratch = self._scratch / path.name
+            scratch.write_bytes(self.blobs.read(self.tree[rel]))
+            result, files = self.scanner.parse_manifest(scratch, origin=path)
+            result = result._replace(path=path)
+            files = [f for f in files if Path(f) != scratch]
+
+        read = {self.relative(Path(f)) for f in files} - {''} | {rel}
+        self._resolved[rel] = (result, read, [(f, self.tree.get(f)) for f in read])
+        return result, read
+
+    def _check(self, root: str) -> List[Dict]:
+        """Conflicts of a project in the replayed tree."""
+        results = []
+        read: Set[str] = set()
+        for rel in sorted(self._projects.get(root, ()), key=lambda r: (source_rank(Path(r)), r)):
+            result, files = self._scan(rel)
+            results.append(result)
+            read |= files
+        for rel in read:
+            self._readers.setdefault(rel, set()).add(root)
+
+        key = tuple(sorted((rel, self.tree.get(rel)) for rel in read))
+        conflicts = self._checks.get(key)
+        if conflicts is None:
+            project = Project.from_results(self.top / root, results, self.scanner)
+            ai_deps = self.scanner.filter_ai_frameworks(project.dependencies)
+            conflicts = self.checker.check(ai_deps, project.constraints) if ai_deps else []
+            self._checks[key] = conflicts
+        return conflicts
+
+    def _apply(self, changes: List[Tuple[str, str]]) -> Set[str]:
+        """Update the replayed tree; returns the project roots to re-check."""
+        touched: Set[str] = set()
+        for rel, sha in changes:
+            if sha == NULL_SHA:
+                self.tree.pop(rel, None)
+            else:
+                self.tree[rel] = sha
+            touched |= self._readers.get(rel, set())
+
+            path = Path(rel)
+            if is_manifest(path.name, path.parent.name):
+                root = project_root(path).as_posix()
+                root = '' if root == '.' else root
+                if not self._in_scope(root):
+                    continue
+                sources = self._projects.setdefault(root, set())
+                if sha == NULL_SHA:
+                    sources.discard(rel)
+                else:
+                    sources.add(rel)
+                touched.add(root)
+        return touched
+
+    def run(self) -> List[ConflictSpan]:
+        """Replay the history and return every conflict span, in order of introduction."""
+        spans: List[ConflictSpan] = []
+        open_spans: Dict[Tuple[str, str], int] = {}
+
+        with BlobReader(self.top) as blobs, tempfile.TemporaryDirectory(prefix="aidep-history-") as scratch:
+            self.blobs = blobs
+            self._scratch = Path(scratch)
+            for commit, changes in iter_manifest_commits(self.top, self.rev):
+                for root in sorted(self._apply(changes)):
+                    current = {conflict['id']: conflict for conflict in self._check(root)}
+                    for (span_root, conflict_id), index in list(open_spans.items()):
+                        if span_root == root and conflict_id not in current:
+                            spans[index] = spans[index]._replace(fixed=commit)
+                            del open_spans[(span_root, conflict_id)]
+                    for conflict_id, conflict in current.items():
+                        if (root, conflict_id) not in open_spans:
+                            open_spans[(root, conflict_id)] = len(spans)
+                            spans.append(ConflictSpan(Path(root or '.'), conflict, commit, None))
+            self.blobs = None
+
+        return spans
@@ -0,0 +1,138 @@
+"""
+Container image source.
+Inventories the Python distributions installed in a `docker save` or OCI
+layout tarball by streaming each layer once, applying whiteouts as the
+layers stack up. Nothing is unpacked and no Docker daemon is needed.
+"""
+
+import json
+import posixpath
+import tarfile
+from typing import IO, Dict, List, Optional
+
+from .distributions import DistMetadata, inventory, parse_metadata
+
+# Larger than tarfile's 10 KiB default so skipping big members costs few reads
+LAYER_BUFFER_SIZE = 1024 * 1024
+
+SITE_DIRS = ("site-packages", "dist-packages")
+
+WHITEOUT_PREFIX = ".wh."
+OPAQUE_WHITEOUT = ".wh..wh..opq"
+
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def _normalize(name: str) -> str:
+    """./usr/lib/x -> usr/lib/x"""
+    return posixpath.normpath('/' + name).lstrip('/')
+
+
+def is_metadata_path(path: str) -> bool:
+    """Check for a .../site-packages/<name>.dist-info/METADATA path."""
+    parts = path.rsplit('/', 3)
+    return (len(parts) == 4 and parts[3] == 'METADATA'
+            and parts[2].endswith('.dist-info') and parts[1] in SITE_DIRS)
+
+
+def _layer_paths(image: tarfile.TarFile) -> List[str]:
+    """Layer member names, bottom layer first, from manifest.json or an OCI index.json."""
+    names = set(image.getnames())
+
+    def load(name: str):
+        return json.load(image.extractfile(name))
+
+    if 'manifest.json' in names:
+        manifests = load('manifest.json')
+        if not manifests:
+            raise ValueError("manifest.json lists no images")
+        return [_normalize(layer) for layer in manifests[0].get('Layers', [])]
+
+    if 'index.json' in names:
+        index = load('index.json')
+        descriptor = index['manifests'][0]
+        # An index may point at a nested index (multi-platform images)
+        while True:
+            blob = 'blobs/' + descriptor['digest'].replace(':', '/', 1)
+            document = load(blob)
+            if 'layers' in document:
+                return ['blobs/' + layer['digest'].replace(':', '/', 1) for layer in document['layers']]
+            descriptor = document['manifests'][0]
+
+    raise ValueError("Not a docker save / OCI image tarball (no manifest.json or index.json)")
+
+
+def _open_layer(fileobj: IO[bytes]) -> tarfile.TarFile:
+    """Open a layer blob as a forward-only tar stream (plain, gzip or zstd)."""
+    magic = fileobj.read(4)
+    fileobj.seek(0)
+    if magic == _ZSTD_MAGIC:
+        try:
+            from compression import zstd
+            fileobj = zstd.ZstdFile(fileobj)
+        except ImportError:
+            try:
+                import zstandard
+            except ImportError:
+                raise ValueError("zstd-compressed layers need the zstandard package") from None
+            fileobj = zstandard.ZstdDecompressor().stream_reader(fileobj)
+    return tarfile.open(fileobj=fileobj, mode='r|*', bufsize=LAYER_BUFFER_SIZE)
+
+
+def _remove_tree(installed: Dict[str, DistMetadata], path: str):
+    """Drop every entry at or below path."""
+    prefix = path + '/'
+    for key in [key for key in installed if key == path or key.startswith(prefix)]:
+        del installed[key]
+
+
+def _apply_layer(layer: tarfile.TarFile, installed: Dict[str, DistMetadata]):
+    """
+    Stack one layer onto installed ({METADATA path: metadata}).
+
+    Whiteouts only hide what lower layers provided, so they are applied to
+    the state before this layer's own files are added.
+    """
+    added: Dict[str, Optional[DistMetadata]] = {}
+    for member in layer:
+        path = _normalize(member.name)
+        directory, _, base = path.rpartition('/')
+
+        if base == OPAQUE_WHITEOUT:
+            _remove_tree(installed, directory)
+        elif base.startswith(WHITEOUT_PREFIX):
+            _remove_tree(installed, posixpath.join(directory, base[len(WHITEOUT_PREFIX):]))
+        elif is_metadata_path(path):
+            if member.isfile():
+                data = layer.extractfile(member).read()
+                added[path] = parse_metadata(data.decode('utf-8', errors='replace'))
+            elif member.islnk():
+                # Hard links always point at an earlier member of the same layer
+                added[path] = added.get(_normalize(member.linkname))
+            else:
+                # Symlinks cannot be followed in a stream
+                added[path] = None
+
+    for path, meta in added.items():
+        if meta is None:
+            installed.pop(path, None)
+        else:
+            installed[path] = meta
+
+
+def read_image_distributions(file_path) -> List[DistMetadata]:
+    """Metadata of every distribution left installed in the image's final filesystem."""
+    installed: Dict[str, DistMetadata] = {}
+    try:
+        with tarfile.open(file_path) as image:
+            for layer_path in _layer_paths(image):
+                with _open_layer(image.extractfile(layer_path)) as layer:
+                    _apply_layer(layer, installed)
+    except (KeyError, IndexError, TypeError, tarfile.TarError, json.JSONDecodeError) as e:
+        raise ValueError(f"Unreadable image tarball: {e}") from e
+    return list(installed.values())
+
+
+def scan_image(file_path):
+    """Inventory an image tarball as ({name: "==version"}, graph)."""
+    return inventory(read_image_distributions(file_path))
@@ -0,0 +1,254 @@
+"""
+Source import scanner.
+Finds the top-level modules a Python file imports, maps them to the
+distributions that provide them, and reports AI frameworks a project
+imports without declaring them.
+"""
+
+import io
+import itertools
+import re
+import tokenize
+from functools import partial
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from packaging.utils import canonicalize_name
+
+from .discovery import is_manifest, iter_files
+from .project import Project, project_root
+from .scanner import DependencyScanner
+
+# Import names that differ from the distribution providing them; the first
+# distribution is the one to suggest, any of them counts as declared
+IMPORT_TO_DISTRIBUTIONS: Dict[str, Tuple[str, ...]] = {
+    "sklearn": ("scikit-learn",),
+    "cv2": ("opencv-python", "opencv-python-headless", "opencv-contrib-python"),
+    "PIL": ("pillow",),
+    "yaml": ("pyyaml",),
+    "bs4": ("beautifulsoup4",),
+    "faiss": ("faiss-cpu", "faiss-gpu"),
+    "llama_index": ("llama-index", "llama-index-core"),
+    "llama_cpp": ("llama-cpp-python",),
+    "autogen": ("pyautogen", "autogen", "autogen-agentchat"),
+    "haystack": ("farm-haystack", "haystack-ai"),
+    "pinecone": ("pinecone-client", "pinecone"),
+    "weaviate": ("weaviate-client",),
+    "google.generativeai": ("google-generativeai",),
+    "vertexai": ("google-cloud-aiplatform",),
+    "tf_keras": ("tf-keras",),
+}
+
+# Namespace packages whose second component names the distribution
+NAMESPACE_PACKAGES = {"google", "azure"}
+
+# A quoted string, a comment, or an import / from statement starting a line
+# or following ':' / ';' (try: import x). Strings and comments are matched
+# only so their contents are skipped; every alternative starts with one of
+# "'#\n:; so the regex engine can skip ahead. The keywords can't follow
+# ':' or ';' anywhere else in valid Python.
+_SCAN_RE = re.compile(
+    r"""
+    \"\"\"[\s\S]*?\"\"\"|'''[\s\S]*?'''|"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*'
+  | \#[^\n]*
+  | [\n:;][ \t]*(?P<statement>import|from)\b
+    """,
+    re.VERBOSE,
+)
+
+
+def _module_name(dotted: List[str]) -> str:
+    """Top-level module of a dotted import (two components for namespace packages)."""
+    if len(dotted) > 1 and dotted[0] in NAMESPACE_PACKAGES:
+        return f"{dotted[0]}.{dotted[1]}"
+    return dotted[0]
+
+
+def _statement_modules(tokens) -> Iterable[str]:
+    """Absolute modules named by the import statement(s) tokens starts with, up to NEWLINE."""
+    keyword = None
+    dotted: List[str] = []
+    skip_name = False
+
+    for tok in tokens:
+        if tok.type in (tokenize.NEWLINE, tokenize.ENDMARKER):
+            break
+        if tok.type in (tokenize.INDENT, tokenize.DEDENT, tokenize.NL, tokenize.COMMENT):
+            continue
+
+        if keyword is None:
+            if tok.string not in ('import', 'from'):
+                return
+            keyword = tok.string
+            continue
+
+        if tok.type == tokenize.NAME and tok.string == 'as':
+            skip_name = True
+        elif tok.type == tokenize.NAME and keyword in ('import', 'from') and not skip_name:
+            if keyword == 'from' and tok.string == 'import':
+                if dotted and dotted[0] != '__future__':
+                    yield _module_name(dotted)
+                keyword = 'names'
+            else:
+                dotted.append(tok.string)
+        elif tok.type == tokenize.NAME:
+            skip_name = False
+        elif tok.string in ('.', '...'):
+            if keyword == 'from' and not dotted:
+                # Relative import: the project's own code
+                keyword = 'names'
+        elif tok.string == ',' and keyword == 'import':
+            if dotted:
+                yield _module_name(dotted)
+            dotted = []
+            skip_name = False
+        elif tok.string == ';':
+            if keyword == 'import' and dotted:
+                yield _module_name(dotted)
+            keyword = None
+            dotted = []
+            skip_name = False
+
+    if keyword == 'import' and dotted:
+        yield _module_name(dotted)
+
+
+def extract_imports(text: str) -> Set[str]:
+    """
+    Top-level modules imported anywhere in a Python source.
+
+    One regex pass finds where import statements start (at a line start or
+    after ':' / ';') while stepping over strings and comments; only those
+    statements are then tokenized, so the rest of the file never goes
+    through tokenize. Relative and __future__ imports are left out.
+    """
+    modules: Set[str] = set()
+    if 'import' not in text:
+        return modules
+
+    lines: Optional[List[str]] = None
+    # The leading newline lets a statement on the first line match too
+    text = '\n' + text
+    newlines = 0
+    position = 0
+
+    for match in _SCAN_RE.finditer(text):
+        start = match.start('statement')
+        if start < 0:
+            continue
+        if lines is None:
+            # Split on \n only, to agree with the count below (splitlines also splits on \f)
+            lines = io.StringIO(text, newline='\n').readlines()
+        newlines += text.count('\n', position, start)
+        position = start
+
+        # Tokenize from the keyword on, so a "try:" before it is left out
+        column = start - text.rfind('\n', 0, start) - 1
+        remaining = itertools.chain([lines[newlines][column:]], itertools.islice(lines, newlines + 1, None))
+        readline = partial(next, remaining, '')
+        try:
+            modules.update(_statement_modules(tokenize.generate_tokens(readline)))
+        except (tokenize.TokenError, SyntaxError):
+            continue
+
+    return modules
+
+
+def read_imports(file_path) -> FrozenSet[str]:
+    """Modules imported by one file (empty if it can't be read)."""
+    try:
+        with open(file_path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return frozenset()
+    return frozenset(extract_imports(data.decode('utf-8', errors='replace')))
+
+
+def distributions_for(module: str) -> Tuple[str, ...]:
+    """Distributions that provide an import name, most likely first."""
+    known = IMPORT_TO_DISTRIBUTIONS.get(module)
+    if known:
+        return known
+    return (canonicalize_name(module.split('.')[0]),)
+
+
+class UndeclaredImport(NamedTuple):
+    """An AI framework a project imports but none of its manifests declare."""
+
+    project: Path
+    module: str
+    distribution: str
+    files: List[Path]
+
+
+def find_undeclared(project: Path, dependencies: Dict[str, str], imported: Dict[str, List[Path]],
+                    is_ai_framework) -> List[UndeclaredImport]:
+    """Compare one project's imports ({module: files}) with its declared dependencies."""
+    undeclared = []
+    for module in sorted(imported):
+        candidates = distributions_for(module)
+        if not is_ai_framework(candidates[0]):
+            continue
+        if any(name in dependencies for name in candidates):
+            continue
+        undeclared.append(UndeclaredImport(project, module, candidates[0], sorted(imported[module])))
+    return undeclared
+
+
+def _is_source_or_manifest(name: str, parent_name: str) -> bool:
+    return name.endswith('.py') or is_manifest(name, parent_name)
+
+
+def _top_level_name(relative: Path) -> str:
+    """Module or package a project-relative source provides at top level (src/ layout aware)."""
+    parts = relative.parts
+    if len(parts) > 1 and parts[0] == 'src':
+        parts = parts[1:]
+    return Path(parts[0]).stem if len(parts) == 1 else parts[0]
+
+
+def audit_imports(root, scanner: Optional[DependencyScanner] = None, jobs: int = 1) -> List[UndeclaredImport]:
+    """
+    AI frameworks imported by the Python sources below root that the
+    sources' project does not declare, ordered by project and module.
+
+    A source belongs to the nearest enclosing directory with a manifest (or
+    to root). Modules and packages directly under a project (or its src/)
+    are first-party and never reported. Sources are read on jobs processes.
+    """
+    from .pipeline import read_sources  # pipeline imports this module
+
+    root = Path(root).resolve()
+    scanner = scanner or DependencyScanner(str(root))
+
+    sources: List[Path] = []
+    projects: Set[Path] = {root}
+    for path in iter_files(root, _is_source_or_manifest):
+        if is_manifest(path.name, path.parent.name):
+            projects.add(project_root(path))
+        else:
+            sources.append(path)
+
+    first_party: Dict[Path, Set[str]] = {}
+    owners: Dict[Path, Path] = {}
+    imported: Dict[Path, Dict[str, List[Path]]] = {}
+    for path, modules in zip(sources, read_sources(sources, jobs=jobs)):
+        owner = owners.get(path.parent)
+        if owner is None:
+            owner = path.parent
+            while owner not in projects and owner != root and owner != owner.parent:
+                owner = owner.parent
+            owners[path.parent] = owner
+        first_party.setdefault(owner, set()).add(_top_level_name(path.relative_to(owner)))
+        for module in modules:
+            imported.setdefault(owner, {}).setdefault(module, []).append(path)
+
+    undeclared: List[UndeclaredImport] = []
+    for project in sorted(imported):
+        modules = {module: files for module, files in imported[project].items()
+                   if module.split('.')[0] not in first_party[project]}
+        if not any(scanner.is_ai_framework(distributions_for(module)[0]) for module in modules):
+            continue
+        dependencies = Project(project, scanner).dependencies
+        undeclared += find_undeclared(project, dependencies, modules, scanner.is_ai_framework)
+    return undeclared
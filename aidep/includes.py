@@ -0,0 +1,191 @@
+"""
+Requirements include-graph resolution.
+Follows -r / -c references between requirements files, parsing each
+physical file once per run.
+"""
+
+import re
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Set, Tuple
+
+from .requirement import parse_requirement, strip_comment
+
+# -r base.txt, -rbase.txt, --requirement base.txt, --requirement=base.txt
+_OPTION_RE = re.compile(
+    r'^(?P<option>-r|--requirement|-c|--constraint)(?:\s*=\s*|\s*)(?P<target>\S+)'
+)
+
+_CONSTRAINT_OPTIONS = {'-c', '--constraint'}
+
+# pip-compile / uv pip compile annotations: "# via x, y" or "# via" + "#   x" lines
+_VIA_RE = re.compile(r'#\s*via\b\s*(?P<rest>.*)$')
+_VIA_ITEM_RE = re.compile(r'^#\s{2,}(?P<item>\S.*)$')
+
+
+class RequirementsFile(NamedTuple):
+    """One parsed requirements file, before following its includes."""
+
+    path: Path
+    requirements: Dict[str, str]
+    includes: Tuple[Path, ...] = ()
+    constraints: Tuple[Path, ...] = ()
+    # pip-compile "# via" annotations: package -> what pulled it in
+    via: Dict[str, Tuple[str, ...]] = {}
+
+
+class ResolvedRequirements(NamedTuple):
+    """A requirements file with its whole include graph merged in."""
+
+    dependencies: Dict[str, str]
+    constraints: Dict[str, str]
+    files: Tuple[Path, ...]
+    via: Dict[str, Tuple[str, ...]] = {}
+
+
+def _via_items(text: str) -> List[str]:
+    """Split "a, b" (line annotation style) into its entries."""
+    return [item.strip() for item in text.split(',') if item.strip()]
+
+
+def _logical_lines(text: str):
+    """Yield lines with trailing-backslash continuations joined, as pip does."""
+    pending = ""
+    for line in text.splitlines():
+        if line.endswith('\\'):
+            pending += line[:-1] + " "
+            continue
+        yield pending + line
+        pending = ""
+    if pending:
+        yield pending
+
+
+class IncludeResolver:
+    """
+    Resolves -r / -c include graphs across requirements files.
+
+    Each physical file is read and parsed once per resolver (keyed by its
+    resolved path), so a base file included by thousands of services is
+    only parsed once. Cycles are recorded in `cycles` and the back-edge is
+    skipped.
+    """
+
+    def __init__(self):
+        self._files: Dict[Path, RequirementsFile] = {}
+        self.cycles: List[Tuple[Path, ...]] = []
+
+    def load(self, file_path: Path) -> RequirementsFile:
+        """Parse a single file (memoized), without following includes."""
+        file_path = Path(file_path).resolve()
+        cached = self._files.get(file_path)
+        if cached is not None:
+            return cached
+
+        try:
+            with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+                text = f.read()
+        except OSError:
+            text = ""
+
+        parsed = self.parse(file_path, text)
+        self._files[file_path] = parsed
+        return parsed
+
+    def exists(self, file_path: Path) -> bool:
+        """Check if an include target exists where load() reads from."""
+        return Path(file_path).exists()
+
+    def forget(self, file_path: Path):
+        """Drop a file's memoized parse so it is re-read (it changed on disk)."""
+        self._files.pop(Path(file_path).resolve(), None)
+
+    def parse(self, file_path: Path, text: str) -> RequirementsFile:
+        """Parse requirements text as the contents of file_path (includes are relative to it)."""
+        requirements = {}
+        includes = []
+        constraints = []
+        via: Dict[str, List[str]] = {}
+        # Package the next "#   parent" comment lines annotate
+        annotating = None
+
+        for line in _logical_lines(text):
+            line = line.strip()
+            if not line:
+                continue
+
+            if line.startswith('#'):
+                if annotating is None:
+                    continue
+                via_match = _VIA_RE.match(line)
+                item_match = _VIA_ITEM_RE.match(line)
+                if via_match:
+                    via.setdefault(annotating, []).extend(_via_items(via_match.group('rest')))
+                elif item_match and annotating in via:
+                    via[annotating].append(item_match.group('item').strip())
+                else:
+                    annotating = None
+                continue
+
+            if line.startswith('-'):
+                option = _OPTION_RE.match(line)
+                if option:
+                    target = option.group('target')
+                    if '://' not in target:
+                        target_path = (file_path.parent / target).resolve()
+                        if option.group('option') in _CONSTRAINT_OPTIONS:
+                            constraints.append(target_path)
+                        else:
+                            includes.append(target_path)
+                # Other pip options (-e, --index-url, ...) carry no requirement
+                continue
+
+            req = parse_requirement(line)
+            annotating = req.key if req else None
+            if req:
+                requirements[req.key] = req.specifier
+                inline = _VIA_RE.search(line[len(strip_comment(line)):])
+                if inline:
+                    via.setdefault(req.key, []).extend(_via_items(inline.group('rest')))
+
+        return RequirementsFile(file_path, requirements, tuple(includes), tuple(constraints),
+                                {name: tuple(parents) for name, parents in via.items()})
+
+    def resolve(self, file_path: Path) -> ResolvedRequirements:
+        """Merge a file with everything it includes (-r) and constrains (-c)."""
+        dependencies: Dict[str, str] = {}
+        constraints: Dict[str, str] = {}
+        seen: Set[Path] = set()
+
+        root = Path(file_path).resolve()
+        self._walk(root, [], dependencies, constraints, seen, False)
+
+        # As with pins, the file's own annotations win over included ones
+        via: Dict[str, Tuple[str, ...]] = {}
+        for path in sorted(seen - {root}):
+            via.update(self.load(path).via)
+        via.update(self.load(root).via)
+
+        return ResolvedRequirements(dependencies, constraints, tuple(sorted(seen)), via)
+
+    def _walk(self, file_path: Path, stack: List[Path], dependencies: Dict[str, str],
+              constraints: Dict[str, str], seen: Set[Path], as_constraint: bool):
+        if file_path in stack:
+            cycle = tuple(stack[stack.index(file_path):] + [file_path])
+            if cycle not in self.cycles:
+                self.cycles.append(cycle)
+            return
+
+        seen.add(file_path)
+        parsed = self.load(file_path)
+        stack.append(file_path)
+
+        # Included files come first so the including file's own pins win
+        for include in parsed.includes:
+            self._walk(include, stack, dependencies, constraints, seen, as_constraint)
+        for constraint in parsed.constraints:
+            self._walk(constraint, stack, dependencies, constraints, seen, True)
+
+        target = constraints if as_constraint else dependencies
+        target.update(parsed.requirements)
+
+        stack.pop()
@@ -0,0 +1,216 @@
+"""
+Streaming JSON reader.
+Walks a JSON document from a file in fixed-size chunks so callers can pick
+out a few fields and skip everything else (huge strings included) without
+ever holding it in memory.
+"""
+
+import json
+import re
+from typing import IO, Iterator, List, Optional
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+_WS_RE = re.compile(r'[ \t\r\n]*')
+_STRING_RUN_RE = re.compile(r'[^"\\]*')
+# Scalars, punctuation and complete strings: everything but container brackets
+_SKIP_RUN_RE = re.compile(r'(?:[^"\[\]{}]+|"[^"\\]*(?:\\.[^"\\]*)*")*')
+_SCALAR_RE = re.compile(r'[^,:\]}\s]*')
+
+
+class JSONStream:
+    """
+    Pull-style reader over a text file containing JSON.
+
+    iter_object() / iter_array() position the stream on each member; the
+    caller must then consume that member with read_value(), skip_value()
+    or a nested iter_object() / iter_array().
+    """
+
+    def __init__(self, f: IO[str], chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self._file = f
+        self._chunk_size = chunk_size
+        self._buf = ''
+        self._pos = 0
+        # Set by read_raw: text consumed so far is kept instead of dropped
+        self._capture: Optional[List[str]] = None
+        self._capture_start = 0
+
+    def _fill(self) -> bool:
+        """Append the next chunk, dropping what was already consumed."""
+        data = self._file.read(self._chunk_size)
+        if not data:
+            return False
+        if self._capture is not None:
+            self._capture.append(self._buf[self._capture_start:self._pos])
+            self._capture_start = 0
+        self._buf = self._buf[self._pos:] + data
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it ('' at EOF)."""
+        while True:
+            self._pos = _WS_RE.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ''
+
+    def _next(self) -> str:
+        ch = self.peek()
+        if not ch:
+            raise ValueError("Unexpected end of JSON")
+        self._pos += 1
+        return ch
+
+    def _expect(self, expected: str):
+        ch = self._next()
+        if ch != expected:
+            raise ValueError(f"Expected {expected!r}, found {ch!r}")
+
+    def _scan_string(self, keep: bool) -> Optional[str]:
+        """Consume a string; decode it only when keep is set."""
+        self._expect('"')
+        parts = []
+        escaped = False
+
+        while True:
+            match = _STRING_RUN_RE.match(self._buf, self._pos)
+            if keep:
+                parts.append(match.group())
+            self._pos = match.end()
+
+            if self._pos >= len(self._buf):
+                if not self._fill():
+                    raise ValueError("Unterminated JSON string")
+                continue
+
+            if self._buf[self._pos] == '"':
+                self._pos += 1
+                break
+
+            # Backslash escape: at most 6 characters (\uXXXX)
+            while len(self._buf) - self._pos < 6 and self._fill():
+                pass
+            width = 6 if self._buf[self._pos + 1:self._pos + 2] == 'u' else 2
+            escaped = True
+            if keep:
+                parts.append(self._buf[self._pos:self._pos + width])
+            self._pos += width
+
+        if not keep:
+            return None
+        if not escaped:
+            return ''.join(parts)
+        return json.loads('"' + ''.join(parts) + '"', strict=False)
+
+    def _read_scalar(self) -> str:
+        """Consume a number / true / false / null token."""
+        self.peek()
+        while True:
+            match = _SCALAR_RE.match(self._buf, self._pos)
+            if match.end() < len(self._buf) or not self._fill():
+                break
+        self._pos = match.end()
+        if not match.group():
+            raise ValueError("Expected a JSON value")
+        return match.group()
+
+    def read_string(self) -> str:
+        """Read and decode a string value."""
+        return self._scan_string(keep=True)
+
+    def read_value(self):
+        """Read the next value fully into Python objects."""
+        ch = self.peek()
+        if ch == '{':
+            result = {}
+            for key in self.iter_object():
+                result[key] = self.read_value()
+            return result
+        if ch == '[':
+            return [self.read_value() for _ in self.iter_array()]
+        if ch == '"':
+            return self.read_string()
+        return json.loads(self._read_scalar())
+
+    def skip_value(self):
+        """Consume the next value without building it."""
+        ch = self.peek()
+        if ch == '"':
+            self._scan_string(keep=False)
+            return
+        if ch not in ('{', '['):
+            self._read_scalar()
+            return
+
+        depth = 0
+        while True:
+            self._pos = _SKIP_RUN_RE.match(self._buf, self._pos).end()
+            if self._pos >= len(self._buf):
+                if not self._fill():
+                    raise ValueError("Unexpected end of JSON")
+                continue
+
+            ch = self._buf[self._pos]
+            if ch == '"':
+                # A string cut off by the end of the buffer
+                self._scan_string(keep=False)
+                continue
+
+            self._pos += 1
+            if ch in '{[':
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return
+
+    def read_raw(self) -> str:
+        """Consume the next value and return its JSON text, undecoded."""
+        self.peek()
+        self._capture = []
+        self._capture_start = self._pos
+        try:
+            self.skip_value()
+            self._capture.append(self._buf[self._capture_start:self._pos])
+            return ''.join(self._capture)
+        finally:
+            self._capture = None
+
+    def iter_object(self) -> Iterator[str]:
+        """Yield each key of the next object; the caller consumes each value."""
+        self._expect('{')
+        if self.peek() == '}':
+            self._pos += 1
+            return
+
+        while True:
+            key = self.read_string()
+            self._expect(':')
+            yield key
+
+            ch = self._next()
+            if ch == '}':
+                return
+            if ch != ',':
+                raise ValueError(f"Expected ',' or '}}', found {ch!r}")
+
+    def iter_array(self) -> Iterator[int]:
+        """Yield the index of each element of the next array; the caller consumes each element."""
+        self._expect('[')
+        if self.peek() == ']':
+            self._pos += 1
+            return
+
+        index = 0
+        while True:
+            yield index
+            index += 1
+
+            ch = self._next()
+            if ch == ']':
+                return
+            if ch != ',':
+                raise ValueError(f"Expected ',' or ']', found {ch!r}")
@@ -0,0 +1,166 @@
+"""
+Lockfile ingestion module.
+Reads exact pinned versions from poetry.lock, uv.lock, pdm.lock and Pipfile.lock.
+"""
+
+import json
+import mmap
+import re
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from packaging.utils import canonicalize_name
+
+# TOML lockfiles that use [[package]] tables with name/version keys
+TOML_LOCKFILES = {"poetry.lock", "uv.lock", "pdm.lock"}
+
+LOCKFILE_NAMES = TOML_LOCKFILES | {"Pipfile.lock"}
+
+# Only top-level keys of a [[package]] table start at column 0
+_KEY_RE = re.compile(r'^(name|version)\s*=\s*"([^"]*)"')
+
+# Column-0 name lines; the literal prefix lets the regex engine skip ahead fast
+_TOML_NAME_RE = re.compile(rb'\nname\s*=\s*"([^"\n]*)"')
+
+
+def is_lockfile(file_path: Path) -> bool:
+    """Check if a path is a supported lockfile."""
+    return Path(file_path).name in LOCKFILE_NAMES
+
+
+def parse_toml_lockfile(file_path: Path) -> Dict[str, str]:
+    """
+    Parse a [[package]]-style TOML lockfile line by line.
+
+    Only each package's top-level name and version are read, so there is no
+    full TOML document built for lockfiles with hundreds of packages.
+    """
+    dependencies = {}
+    name = version = None
+    in_package = False
+
+    with open(file_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.startswith('['):
+                if name and version:
+                    dependencies[canonicalize_name(name)] = f"=={version}"
+                name = version = None
+                # Sub-tables like [package.dependencies] end the top-level keys
+                in_package = line.strip() == '[[package]]'
+                continue
+
+            if not in_package or line[:1] not in ('n', 'v'):
+                continue
+
+            match = _KEY_RE.match(line)
+            if match:
+                if match.group(1) == 'name':
+                    name = match.group(2)
+                else:
+                    version = match.group(2)
+
+    if name and version:
+        dependencies[canonicalize_name(name)] = f"=={version}"
+
+    return dependencies
+
+
+def parse_pipfile_lock(file_path: Path) -> Dict[str, str]:
+    """Parse Pipfile.lock (develop first, so default pins win)."""
+    dependencies = {}
+
+    with open(file_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    for section in ('develop', 'default'):
+        for name, info in (data.get(section) or {}).items():
+            if not isinstance(info, dict):
+                continue
+            version = info.get('version', '')
+            dependencies[canonicalize_name(name)] = version
+
+    return dependencies
+
+
+def _names_pattern(packages: Iterable[str]) -> bytes:
+    """Alternation matching any package name, treating - _ . as equivalent."""
+    terms = sorted({canonicalize_name(p) for p in packages}, key=len, reverse=True)
+    return b'|'.join(
+        b'[-_.]'.join(re.escape(part.encode('utf-8')) for part in term.split('-'))
+        for term in terms
+    )
+
+
+def _toml_version(data, name_end: int) -> Optional[str]:
+    """Return the version key of the [[package]] table containing a name line."""
+    header = data.rfind(b'\n[', 0, name_end) + 1
+    if data[header:header + 11] != b'[[package]]':
+        return None
+
+    block_end = data.find(b'\n[', name_end)
+    block = data[header + 11:len(data) if block_end == -1 else block_end]
+    for line in block.decode('utf-8', errors='replace').splitlines():
+        match = _KEY_RE.match(line)
+        if match and match.group(1) == 'version':
+            return f"=={match.group(2)}"
+    return None
+
+
+def scan_lockfile(file_path: Path, packages: Iterable[str]) -> Dict[str, str]:
+    """
+    Fast path: read only the lockfile entries whose name contains one of packages.
+
+    A TOML lockfile is memory-mapped and scanned for package name lines as
+    bytes; only the [[package]] table around a wanted name is decoded.
+    Pipfile.lock is small and free-form JSON (compact or minified, with
+    develop / default precedence), so it is parsed in full and filtered.
+    Names containing a package are kept, matching
+    DependencyScanner.filter_ai_frameworks' substring rule.
+    """
+    file_path = Path(file_path)
+    names = _names_pattern(packages)
+    if not names:
+        return {}
+    wanted = re.compile(names, re.IGNORECASE)
+
+    if file_path.name not in TOML_LOCKFILES:
+        return {name: version for name, version in parse_pipfile_lock(file_path).items()
+                if wanted.search(name.encode('utf-8'))}
+
+    dependencies = {}
+
+    with open(file_path, 'rb') as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can't be mapped
+            return {}
+
+        with data:
+            for match in _TOML_NAME_RE.finditer(data):
+                name = match.group(1)
+                if not wanted.search(name):
+                    continue
+                version = _toml_version(data, match.end())
+                if version:
+                    dependencies[canonicalize_name(name.decode('utf-8'))] = version
+
+    return dependencies
+
+
+def parse_lockfile(file_path: Path, packages: Optional[Iterable[str]] = None) -> Dict[str, str]:
+    """
+    Parse any supported lockfile into {name: "==version"}.
+
+    With packages, only entries whose name contains one of them are read
+    (see scan_lockfile).
+    """
+    file_path = Path(file_path)
+    try:
+        if packages is not None:
+            return scan_lockfile(file_path, packages)
+        if file_path.name in TOML_LOCKFILES:
+            return parse_toml_lockfile(file_path)
+        return parse_pipfile_lock(file_path)
+    except (OSError, ValueError):
+        return {}
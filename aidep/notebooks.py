@@ -0,0 +1,55 @@
+"""
+Jupyter notebook source.
+Streams an .ipynb file and pulls the pip install commands out of its code
+cells; outputs (embedded images, large logs) are skipped, never loaded.
+"""
+
+from pathlib import Path
+from typing import Iterator, List
+
+from .jsonstream import JSONStream
+from .pipcmd import PipInstall, join_continuations, parse_pip_commands
+
+# Cell magics whose whole body is shell
+SHELL_CELL_MAGICS = ('%%bash', '%%sh', '%%script bash', '%%script sh')
+
+
+def iter_code_cells(file_path: Path) -> Iterator[str]:
+    """Yield the source of each code cell (nbformat 4)."""
+    with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+        stream = JSONStream(f)
+        for key in stream.iter_object():
+            if key != 'cells':
+                stream.skip_value()
+                continue
+
+            for _ in stream.iter_array():
+                cell_type = None
+                source = None
+                for cell_key in stream.iter_object():
+                    # Only decode source once the cell is known (or may be) code
+                    if cell_key == 'cell_type':
+                        cell_type = stream.read_value()
+                    elif cell_key == 'source' and cell_type in (None, 'code'):
+                        source = stream.read_value()
+                    else:
+                        stream.skip_value()
+
+                if cell_type == 'code' and source:
+                    yield ''.join(source) if isinstance(source, list) else str(source)
+
+
+def shell_lines(cell_source: str) -> List[str]:
+    """The lines of a code cell that run in a shell (!cmd, %pip, %%bash cells)."""
+    lines = join_continuations(cell_source.splitlines())
+    if lines and lines[0].strip().startswith(SHELL_CELL_MAGICS):
+        return lines[1:]
+    return [line.strip() for line in lines if line.lstrip().startswith(('!', '%'))]
+
+
+def parse_notebook(file_path: Path) -> PipInstall:
+    """Collect every pip install in a notebook's code cells."""
+    lines = []
+    for cell in iter_code_cells(file_path):
+        lines.extend(shell_lines(cell))
+    return parse_pip_commands(lines)
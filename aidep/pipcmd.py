@@ -0,0 +1,149 @@
+"""
+pip install command extraction.
+Finds what a shell command line passes to pip install (python -m pip,
+uv pip, notebook %pip / !pip magics) without running anything.
+"""
+
+import os
+import re
+import shlex
+from typing import Iterable, Iterator, List, NamedTuple, Optional
+
+# pip, pip3, pip3.11
+_PIP_PROGRAM_RE = re.compile(r'^pip[0-9.]*$')
+
+COMMAND_SEPARATORS = {'&&', '||', ';', '|', '&'}
+
+# pip install / uv pip install options that take the following token as their value
+OPTIONS_WITH_VALUE = {
+    '-e', '--editable',
+    '-i', '--index-url', '--extra-index-url', '--default-index', '--index',
+    '-f', '--find-links',
+    '-t', '--target', '--prefix', '--root', '--src',
+    '--python', '-p',
+    '--platform', '--python-version', '--implementation', '--abi',
+    '--only-binary', '--no-binary', '--upgrade-strategy', '--progress-bar',
+    '--trusted-host', '--cache-dir', '--log', '--proxy', '--retries', '--timeout',
+    '-C', '--config-settings', '--global-option', '--report',
+    '--index-strategy', '--keyring-provider', '--resolution', '--prerelease',
+}
+
+# Archives and local paths aren't named requirements
+_NOT_A_REQUIREMENT = ('.whl', '.tar.gz', '.zip', '.tgz')
+
+
+class PipInstall(NamedTuple):
+    """Everything named by the pip install commands of one file."""
+
+    requirements: List[str]
+    requirement_files: List[str]
+    constraint_files: List[str]
+
+
+def join_continuations(lines: Iterable[str]) -> List[str]:
+    """Join lines ending in a backslash with the line that follows."""
+    joined = []
+    continued = False
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if continued:
+            joined[-1] = joined[-1] + ' ' + line.strip()
+        else:
+            joined.append(line)
+        continued = joined[-1].endswith('\\')
+        if continued:
+            joined[-1] = joined[-1][:-1].rstrip()
+    return joined
+
+
+def split_commands(line: str) -> List[List[str]]:
+    """Split a shell line into the token lists of its &&, ||, ; and | separated commands."""
+    lexer = shlex.shlex(line, posix=True, punctuation_chars=';&|')
+    lexer.whitespace_split = True
+    lexer.commenters = ''
+
+    commands = [[]]
+    try:
+        for token in lexer:
+            if token.startswith('#'):
+                break
+            if token in COMMAND_SEPARATORS:
+                commands.append([])
+            else:
+                commands[-1].append(token)
+    except ValueError:
+        # Unbalanced quotes: keep what was tokenized so far
+        pass
+
+    return [command for command in commands if command]
+
+
+def _install_args(tokens: List[str]) -> Optional[List[str]]:
+    """Return the arguments after 'install' if tokens run pip install, else None."""
+    for i, token in enumerate(tokens):
+        token = token.lstrip('%!')
+        pip_at = None
+        if _PIP_PROGRAM_RE.match(os.path.basename(token)):
+            pip_at = i
+        elif token in ('-m', 'uv') and tokens[i + 1:i + 2] == ['pip']:
+            pip_at = i + 1
+
+        if pip_at is None:
+            continue
+
+        # Skip global options such as pip -q install / uv pip --quiet install
+        for j in range(pip_at + 1, len(tokens)):
+            if tokens[j].startswith('-'):
+                continue
+            if tokens[j] == 'install':
+                return tokens[j + 1:]
+            break
+        return None
+
+    return None
+
+
+def _is_named_requirement(token: str) -> bool:
+    if '://' in token or '$' in token or token.startswith(('.', '/', '~')):
+        return False
+    return not token.endswith(_NOT_A_REQUIREMENT)
+
+
+def parse_install_args(args: List[str], install: PipInstall):
+    """Sort pip install arguments into requirements, -r files and -c files."""
+    it = iter(args)
+    for token in it:
+        if not token.startswith('-'):
+            if _is_named_requirement(token):
+                install.requirements.append(token)
+            continue
+
+        option, has_value, value = token.partition('=')
+        if option in ('-r', '--requirement', '-c', '--constraint'):
+            value = value if has_value else next(it, '')
+            target = install.requirement_files if option in ('-r', '--requirement') else install.constraint_files
+            if value:
+                target.append(value)
+        elif token[:2] in ('-r', '-c') and len(token) > 2 and not token.startswith('--'):
+            # Glued short form: -rrequirements.txt
+            target = install.requirement_files if token[1] == 'r' else install.constraint_files
+            target.append(token[2:])
+        elif option in OPTIONS_WITH_VALUE and not has_value:
+            next(it, None)
+
+
+def iter_install_args(lines: Iterable[str]) -> Iterator[List[str]]:
+    """Yield the arguments of every pip install command in shell lines."""
+    for line in lines:
+        for command in split_commands(line):
+            args = _install_args(command)
+            if args is not None:
+                yield args
+
+
+def parse_pip_commands(lines: Iterable[str]) -> PipInstall:
+    """Collect every pip install in shell command lines."""
+    install = PipInstall([], [], [])
+    for args in iter_install_args(lines):
+        parse_install_args(args, install)
+    return install
@@ -0,0 +1,111 @@
+"""
+Parallel scan pipeline.
+Fans manifest parsing (and distribution metadata reads and source import
+scans) out over a process pool and merges results in input order.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import FrozenSet, Iterable, Iterator, List, Optional
+
+from .cache import ParseCache
+from .distributions import DistMetadata, inventory, iter_wheelhouse, read_distribution
+from .imports import read_imports
+from .scanner import DependencyScanner, ScanResult
+
+# Upper bound on files per work unit, so slow files don't starve other workers
+MAX_CHUNK_SIZE = 64
+
+
+def resolve_jobs(jobs: int) -> int:
+    """Translate a --jobs value into a worker count (0 means all cores)."""
+    if jobs <= 0:
+        return os.cpu_count() or 1
+    return jobs
+
+
+# One scanner per worker process, so shared -r base files are parsed once
+# per worker rather than once per chunk
+_worker_scanner: Optional[DependencyScanner] = None
+
+
+def _parse_chunk(paths: List[str], cache_dir: Optional[str] = None,
+                 rules_only: bool = False) -> List[ScanResult]:
+    """Parse one work unit inside a worker process."""
+    global _worker_scanner
+    if _worker_scanner is None:
+        cache = ParseCache(cache_dir) if cache_dir else None
+        _worker_scanner = DependencyScanner(cache=cache, rules_only=rules_only)
+    return [_worker_scanner.scan_file(Path(path)) for path in paths]
+
+
+def _chunked(items: List, size: int) -> List[List]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def parse_manifests(paths: Iterable[Path], jobs: int = 1, chunk_size: Optional[int] = None,
+                    scanner: Optional[DependencyScanner] = None) -> Iterator[ScanResult]:
+    """
+    Parse manifests, yielding a ScanResult per path in the same order as paths.
+
+    With jobs > 1 the paths are split into chunks and parsed on a
+    ProcessPoolExecutor; results are merged back in input order so the
+    output is identical to a serial run.
+    """
+    jobs = resolve_jobs(jobs)
+
+    if jobs == 1:
+        scanner = scanner or DependencyScanner()
+        for path in paths:
+            yield scanner.scan_file(path)
+        return
+
+    paths = list(paths)
+    if len(paths) < 2:
+        yield from parse_manifests(paths, jobs=1, scanner=scanner)
+        return
+
+    if not chunk_size:
+        # Aim for ~4 chunks per worker to balance uneven file sizes
+        chunk_size = max(1, min(MAX_CHUNK_SIZE, len(paths) // (jobs * 4)))
+
+    chunks = _chunked(paths, chunk_size)
+    work = [[str(path) for path in chunk] for chunk in chunks]
+    cache_dir = str(scanner.cache.cache_dir) if scanner and scanner.cache else None
+    rules_only = bool(scanner and scanner.rules_only)
+
+    with ProcessPoolExecutor(max_workers=min(jobs, len(chunks))) as pool:
+        options = ([cache_dir] * len(work), [rules_only] * len(work))
+        for results in pool.map(_parse_chunk, work, *options):
+            yield from results
+
+
+def read_distributions(paths: Iterable[Path], jobs: int = 1) -> List[Optional[DistMetadata]]:
+    """Read the metadata of many distribution archives, in input order."""
+    paths = list(paths)
+    jobs = resolve_jobs(jobs)
+    if jobs == 1 or len(paths) < 2:
+        return [read_distribution(path) for path in paths]
+
+    # Archives are read whole per task; chunking only amortizes IPC
+    chunk_size = max(1, min(MAX_CHUNK_SIZE, len(paths) // (jobs * 4)))
+    with ProcessPoolExecutor(max_workers=min(jobs, len(paths))) as pool:
+        return list(pool.map(read_distribution, paths, chunksize=chunk_size))
+
+
+def scan_wheelhouse(directory, jobs: int = 1):
+    """Inventory every wheel and sdist below a directory as ({name: "==version"}, graph)."""
+    return inventory(read_distributions(iter_wheelhouse(directory), jobs=jobs))
+
+
+def read_sources(paths: Iterable[Path], jobs: int = 1) -> List[FrozenSet[str]]:
+    """Modules imported by many Python files, in input order."""
+    paths = list(paths)
+    jobs = resolve_jobs(jobs)
+    if jobs == 1 or len(paths) < 2:
+        return [read_imports(path) for path in paths]
+
+    chunk_size = max(1, min(MAX_CHUNK_SIZE, len(paths) // (jobs * 4)))
+    with ProcessPoolExecutor(max_workers=min(jobs, len(paths))) as pool:
+        return list(pool.map(read_imports, paths, chunksize=chunk_size))
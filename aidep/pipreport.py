@@ -0,0 +1,85 @@
+"""
+pip installation report source.
+Reads the JSON written by `pip install --dry-run --report FILE`: the exact
+versions pip resolved, plus requires_dist edges for the dependency graph.
+"""
+
+from pathlib import Path
+from typing import IO, Dict, List, NamedTuple
+
+from packaging.utils import canonicalize_name
+
+from .graph import DependencyGraph
+from .jsonstream import JSONStream
+from .requirement import parse_requirement
+
+
+class PipReport(NamedTuple):
+    """The resolved install set of a pip report."""
+
+    dependencies: Dict[str, str]
+    graph: DependencyGraph
+
+
+def _read_metadata(stream: JSONStream):
+    """Read name, version and requires_dist; long fields like description are skipped."""
+    name = version = None
+    requires: List[str] = []
+    for key in stream.iter_object():
+        if key == 'name':
+            name = stream.read_value()
+        elif key == 'version':
+            version = stream.read_value()
+        elif key == 'requires_dist':
+            requires = stream.read_value() or []
+        else:
+            stream.skip_value()
+    return name, version, requires
+
+
+def read_pip_report(f: IO[str]) -> PipReport:
+    """Stream the install array of a pip report from an open file."""
+    dependencies: Dict[str, str] = {}
+    requires: Dict[str, List[str]] = {}
+    graph = DependencyGraph()
+
+    stream = JSONStream(f)
+    for key in stream.iter_object():
+        if key != 'install':
+            stream.skip_value()
+            continue
+
+        for _ in stream.iter_array():
+            name = version = None
+            requested = False
+            requires_dist: List[str] = []
+            for item_key in stream.iter_object():
+                if item_key == 'metadata':
+                    name, version, requires_dist = _read_metadata(stream)
+                elif item_key == 'requested':
+                    requested = stream.read_value() is True
+                else:
+                    stream.skip_value()
+
+            if not isinstance(name, str) or not isinstance(version, str):
+                continue
+            name = canonicalize_name(name)
+            dependencies[name] = f"=={version}"
+            requires[name] = requires_dist
+            if requested:
+                graph.add_root(name)
+
+    # Edges only to distributions pip actually installs (skips unused extras)
+    for parent, requires_dist in requires.items():
+        for line in requires_dist:
+            req = parse_requirement(line) if isinstance(line, str) else None
+            if req and req.key in dependencies:
+                graph.add_edge(parent, req.key)
+
+    return PipReport(dependencies, graph)
+
+
+def parse_pip_report(file_path: Path) -> PipReport:
+    """Read a pip installation report file."""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return read_pip_report(f)
@@ -0,0 +1,172 @@
+"""
+Project model.
+Loads every manifest of a project lazily and merges them with per-source provenance.
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .discovery import MANIFEST_DIRS, is_manifest
+from .graph import DependencyGraph, graph_from_via
+from .lockfiles import LOCKFILE_NAMES
+from .scanner import DependencyScanner, ScanResult
+from .setupfiles import SETUP_FILES
+
+
+def source_rank(file_path: Path) -> int:
+    """
+    Merge precedence of a manifest; higher ranks win.
+    Lockfiles hold what is installed, requirements files pin tighter than
+    the ranges declared in pyproject.toml / setup.py / setup.cfg.
+    """
+    if file_path.name in LOCKFILE_NAMES:
+        return 2
+    if file_path.name.endswith('.toml') or file_path.name in SETUP_FILES:
+        return 0
+    return 1
+
+
+def project_root(manifest: Path) -> Path:
+    """The project directory a manifest belongs to (requirements/base.txt -> parent of requirements/)."""
+    parent = manifest.parent
+    if parent.name in MANIFEST_DIRS:
+        return parent.parent
+    return parent
+
+
+class Project:
+    """
+    All dependency manifests of one project directory, merged.
+
+    Each source is parsed at most once per Project (through the scanner,
+    and so through its parse cache), and the merged view is memoized until
+    a source is invalidated.
+    """
+
+    def __init__(self, path, scanner: Optional[DependencyScanner] = None,
+                 sources: Optional[Iterable[Path]] = None):
+        self.path = Path(path)
+        self.scanner = scanner or DependencyScanner(path)
+        self._sources: Optional[List[Path]] = None
+        self._results: Dict[Path, ScanResult] = {}
+        self._merged: Optional[Tuple[Dict[str, str], Dict[str, str], Dict[str, List[Tuple[Path, str]]]]] = None
+        self._graph: Optional[DependencyGraph] = None
+
+        if sources is not None:
+            self._sources = sorted(sources, key=lambda p: (source_rank(p), str(p)))
+
+    @classmethod
+    def from_results(cls, path, results: Iterable[ScanResult],
+                     scanner: Optional[DependencyScanner] = None) -> "Project":
+        """Build a project from manifests that were already parsed."""
+        results = list(results)
+        project = cls(path, scanner, sources=[r.path for r in results])
+        for result in results:
+            project._results[result.path] = result
+        return project
+
+    @property
+    def sources(self) -> List[Path]:
+        """Manifests in the project directory, lowest merge precedence first."""
+        if self._sources is None:
+            self._sources = sorted(self._find_sources(), key=lambda p: (source_rank(p), str(p)))
+        return self._sources
+
+    def _find_sources(self) -> Iterator[Path]:
+        try:
+            entries = list(os.scandir(self.path))
+        except OSError:
+            return
+
+        for entry in entries:
+            if entry.is_file() and is_manifest(entry.name):
+                yield Path(entry.path)
+            elif entry.is_dir() and entry.name in MANIFEST_DIRS:
+                for sub in os.scandir(entry.path):
+                    if sub.is_file() and is_manifest(sub.name, entry.name):
+                        yield Path(sub.path)
+
+    def load(self, source: Path) -> ScanResult:
+        """Parse one source (memoized)."""
+        result = self._results.get(source)
+        if result is None:
+            result = self.scanner.scan_file(source)
+            self._results[source] = result
+        return result
+
+    def invalidate(self, source: Optional[Path] = None):
+        """Forget a parsed source (or all of them) so the next access re-reads it."""
+        if source is None:
+            self._results.clear()
+        else:
+            self._results.pop(Path(source), None)
+        self._merged = None
+        self._graph = None
+
+    def _merge(self):
+        if self._merged is not None:
+            return self._merged
+
+        dependencies: Dict[str, str] = {}
+        constraints: Dict[str, str] = {}
+        provenance: Dict[str, List[Tuple[Path, str]]] = {}
+
+        for source in self.sources:
+            result = self.load(source)
+            for name, spec in result.dependencies.items():
+                provenance.setdefault(name, []).append((source, spec))
+                # An unpinned mention never hides a pin from another source
+                if spec or name not in dependencies:
+                    dependencies[name] = spec
+            constraints.update(result.constraints)
+
+        self._merged = (dependencies, constraints, provenance)
+        return self._merged
+
+    @property
+    def dependencies(self) -> Dict[str, str]:
+        """Merged dependencies across all sources."""
+        return self._merge()[0]
+
+    @property
+    def constraints(self) -> Dict[str, str]:
+        """Merged -c constraints across all sources."""
+        return self._merge()[1]
+
+    @property
+    def provenance(self) -> Dict[str, List[Tuple[Path, str]]]:
+        """For each dependency, every (source, spec) that declared it."""
+        return self._merge()[2]
+
+    @property
+    def graph(self) -> Optional[DependencyGraph]:
+        """
+        Reverse-dependency graph from the "# via" annotations of compiled
+        requirements files, or None if no source has any.
+        """
+        if self._graph is None:
+            via: Dict[str, List[str]] = {}
+            for source in self.sources:
+                via.update(self.load(source).via or {})
+            if via:
+                self._graph = graph_from_via(self.dependencies, via)
+        return self._graph
+
+
+def group_projects(results: Iterable[ScanResult],
+                   scanner: Optional[DependencyScanner] = None) -> Iterator[Project]:
+    """Group parsed manifests into projects, preserving discovery order."""
+    current_root = None
+    batch: List[ScanResult] = []
+
+    for result in results:
+        root = project_root(result.path)
+        if batch and root != current_root:
+            yield Project.from_results(current_root, batch, scanner)
+            batch = []
+        current_root = root
+        batch.append(result)
+
+    if batch:
+        yield Project.from_results(current_root, batch, scanner)
@@ -0,0 +1,108 @@
+"""
+Requirement line parser.
+Parses PEP 508 requirement strings (name, extras, specifier, marker, URL),
+memoized on the raw line text.
+"""
+
+import re
+from functools import lru_cache
+from typing import NamedTuple, Optional, Tuple
+
+from packaging.utils import canonicalize_name
+
+# Same line text shows up across thousands of manifests in a monorepo
+PARSE_CACHE_SIZE = 4096
+
+_VERSION_CLAUSE = r"(?:~=|===|==|!=|<=|>=|<|>)\s*[A-Za-z0-9_.*+!-]+"
+
+_REQUIREMENT_RE = re.compile(
+    r"""
+    ^\s*
+    (?P<name>[A-Za-z0-9](?:[A-Za-z0-9._-]*[A-Za-z0-9])?)
+    \s*
+    (?:\[\s*(?P<extras>[A-Za-z0-9._,\s-]*)\])?
+    \s*
+    (?:
+        @\s*(?P<url>\S+)
+      |
+        \(?\s*(?P<spec>CLAUSE(?:\s*,\s*CLAUSE)*)\s*\)?
+    )?
+    \s*
+    (?:;\s*(?P<marker>.*?))?
+    \s*$
+    """.replace("CLAUSE", _VERSION_CLAUSE),
+    re.VERBOSE,
+)
+
+# pip treats '#' as a comment only at line start or after whitespace
+_COMMENT_RE = re.compile(r"(?:^|\s)#.*$")
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Per-requirement pip options (pip-compile --generate-hashes output and friends)
+_REQUIREMENT_OPTION_RE = re.compile(
+    r"\s+--(?:hash|config-settings|global-option|install-option)(?:\s*=\s*|\s+)\S+"
+)
+
+# A bare archive file name (torch-2.1.0-cp311-...whl) is a path, not a project name
+ARCHIVE_SUFFIXES = ('.whl', '.tar.gz', '.tgz', '.tar.bz2', '.tar.xz', '.zip', '.egg')
+
+
+class Requirement(NamedTuple):
+    """A parsed PEP 508 requirement."""
+
+    name: str
+    extras: Tuple[str, ...] = ()
+    specifier: str = ""
+    marker: str = ""
+    url: str = ""
+
+    @property
+    def key(self) -> str:
+        """Canonical project name (PEP 503) used as the dependency map key."""
+        return canonicalize_name(self.name)
+
+
+def strip_comment(line: str) -> str:
+    """Remove a trailing pip-style comment from a requirement line."""
+    if '#' not in line:
+        return line.strip()
+    return _COMMENT_RE.sub('', line).strip()
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_requirement(line: str) -> Optional[Requirement]:
+    """
+    Parse a single requirement line.
+
+    Per-requirement options such as --hash are dropped. Returns None for
+    blank lines, comments, pip options, bare archive file names and anything
+    that is not a valid PEP 508 requirement.
+    """
+    line = strip_comment(line)
+    if not line:
+        return None
+    if '--' in line:
+        line = _REQUIREMENT_OPTION_RE.sub('', line)
+
+    match = _REQUIREMENT_RE.match(line)
+    if not match or match.group('name').lower().endswith(ARCHIVE_SUFFIXES):
+        return None
+
+    extras = match.group('extras')
+    if extras:
+        extras = tuple(sorted({e.strip().lower() for e in extras.split(',') if e.strip()}))
+    else:
+        extras = ()
+
+    spec = match.group('spec') or ""
+    if spec:
+        spec = _WHITESPACE_RE.sub('', spec)
+
+    return Requirement(
+        name=match.group('name'),
+        extras=extras,
+        specifier=spec,
+        marker=(match.group('marker') or "").strip(),
+        url=match.group('url') or "",
+    )
@@ -0,0 +1,97 @@
+"""
+SBOM source.
+Streams CycloneDX and SPDX JSON documents and keeps only the PyPI
+packages (pkg:pypi/... purls) with their versions; file-level entries
+and everything else are skipped without being built.
+"""
+
+import fnmatch
+import json
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+from urllib.parse import unquote
+
+from packaging.utils import canonicalize_name
+
+from .jsonstream import JSONStream
+
+SBOM_PATTERNS = ["*.cdx.json", "*.spdx.json"]
+
+PYPI_PURL_PREFIX = "pkg:pypi/"
+
+
+def is_sbom(name: str) -> bool:
+    """Check if a file name looks like a CycloneDX / SPDX JSON SBOM."""
+    return any(fnmatch.fnmatchcase(name, pattern) for pattern in SBOM_PATTERNS)
+
+
+def parse_purl(purl: str) -> Optional[Tuple[str, str]]:
+    """pkg:pypi/Flash-Attn@2.3.3?x=y -> ("flash-attn", "2.3.3"); None for other ecosystems."""
+    if not isinstance(purl, str) or not purl.lower().startswith(PYPI_PURL_PREFIX):
+        return None
+
+    rest = purl[len(PYPI_PURL_PREFIX):].split('#', 1)[0].split('?', 1)[0]
+    name, _, version = rest.partition('@')
+    if not name:
+        return None
+    return canonicalize_name(unquote(name)), unquote(version)
+
+
+def _add_package(dependencies: Dict[str, str], purl, version):
+    parsed = parse_purl(purl)
+    if not parsed:
+        return
+    name, purl_version = parsed
+    version = purl_version or (version if isinstance(version, str) else '')
+    dependencies[name] = f"=={version}" if version else ""
+
+
+def _iter_pypi_entries(stream: JSONStream) -> Iterator[Dict]:
+    """
+    Yield the array elements that mention a PyPI purl, decoded.
+    Every other element is only scanned as raw text, never built.
+    """
+    for _ in stream.iter_array():
+        raw = stream.read_raw()
+        if PYPI_PURL_PREFIX in raw.lower():
+            entry = json.loads(raw)
+            if isinstance(entry, dict):
+                yield entry
+
+
+def _add_cyclonedx_component(dependencies: Dict[str, str], component: Dict):
+    """Add a CycloneDX component and its nested components."""
+    _add_package(dependencies, component.get('purl'), component.get('version'))
+    for child in component.get('components') or []:
+        if isinstance(child, dict):
+            _add_cyclonedx_component(dependencies, child)
+
+
+def _add_spdx_package(dependencies: Dict[str, str], package: Dict):
+    """Add an SPDX package; its purl lives in externalRefs."""
+    for ref in package.get('externalRefs') or []:
+        if isinstance(ref, dict) and ref.get('referenceType') == 'purl':
+            _add_package(dependencies, ref.get('referenceLocator'), package.get('versionInfo'))
+
+
+def parse_sbom(file_path: Path) -> Dict[str, str]:
+    """
+    Read the PyPI packages of a CycloneDX or SPDX JSON SBOM as {name: "==version"}.
+    The format is recognized by its top-level keys, whatever the file is called.
+    """
+    dependencies: Dict[str, str] = {}
+
+    with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+        stream = JSONStream(f)
+        for key in stream.iter_object():
+            if key == 'components':
+                for component in _iter_pypi_entries(stream):
+                    _add_cyclonedx_component(dependencies, component)
+            elif key == 'packages':
+                for package in _iter_pypi_entries(stream):
+                    _add_spdx_package(dependencies, package)
+            else:
+                # metadata, files, relationships, vulnerabilities, ...
+                stream.skip_value()
+
+    return dependencies
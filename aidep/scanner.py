@@ -1,13 +1,41 @@
 """
 Scanner module to read and parse Python dependency files.
-Supports requirements.txt and pyproject.toml
+Supports requirements.txt (including -r / -c references), pyproject.toml,
+setup.py / setup.cfg, wheel and sdist archives, lockfiles (poetry.lock, uv.lock, pdm.lock, Pipfile.lock),
+conda environment.yml, CycloneDX / SPDX SBOMs and pip install commands in
+Jupyter notebooks, Dockerfiles and shell scripts
 """
 
-import re
+import hashlib
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
 from packaging.version import parse as parse_version
 from packaging.specifiers import SpecifierSet
+from packaging.utils import canonicalize_name
+
+from .cache import ParseCache
+from .conda import CondaEnvironment, is_environment_file, parse_environment_yml
+from .conflicts import CONFLICTS
+from .discovery import iter_manifests
+from .distributions import install_requires, is_distribution, read_distribution
+from .dockerfiles import is_dockerfile, is_shell_script, parse_dockerfile, parse_shell_script
+from .includes import IncludeResolver
+from .lockfiles import LOCKFILE_NAMES, parse_lockfile
+from .notebooks import parse_notebook
+from .pipcmd import PipInstall
+from .requirement import parse_requirement
+from .sbom import is_sbom, parse_sbom
+from .setupfiles import SETUP_FILES, read_setup_file
+
+
+class ScanResult(NamedTuple):
+    """Everything parsed from one manifest."""
+
+    path: Path
+    dependencies: Dict[str, str]
+    constraints: Dict[str, str]
+    # pip-compile "# via" annotations, for compiled requirements files
+    via: Optional[Dict[str, List[str]]] = None
 
 
 class DependencyScanner:
@@ -47,16 +75,41 @@ class DependencyScanner:
         "weaviate-client",
     ]
     
-    def __init__(self, project_path: str = "."):
+    def __init__(self, project_path: str = ".", resolver: Optional[IncludeResolver] = None,
+                 cache: Optional[ParseCache] = None, rules_only: bool = False):
         self.project_path = Path(project_path)
+        self.resolver = resolver or IncludeResolver()
+        self.cache = cache
+        # Only read lockfile entries that a conflict rule or framework filter can use
+        self.rules_only = rules_only
+
+    @classmethod
+    def rule_packages(cls) -> List[str]:
+        """Every package name a conflict rule or the AI framework filter looks at."""
+        names = set(cls.AI_FRAMEWORKS)
+        for conflict in CONFLICTS:
+            names.update(pkg.lower() for pkg in conflict['packages'])
+        return sorted(names)
         
+    @classmethod
+    def rules_namespace(cls) -> str:
+        """
+        Cache namespace for rules_only results, keyed on rule_packages() so an
+        upgrade that adds a framework or rule never reuses filtered payloads.
+        """
+        digest = hashlib.sha256('\n'.join(cls.rule_packages()).encode('utf-8')).hexdigest()
+        return f"rules-{digest[:16]}"
+
     def find_requirements_file(self) -> Optional[Path]:
-        """Find requirements.txt or pyproject.toml in project."""
+        """Find requirements.txt, pyproject.toml, setup.cfg/setup.py or a lockfile in project."""
         req_files = [
             "requirements.txt",
             "requirements-dev.txt",
             "requirements/base.txt",
             "pyproject.toml",
+            "setup.cfg",
+            "setup.py",
+            *sorted(LOCKFILE_NAMES),
         ]
         
         for req_file in req_files:
@@ -65,50 +118,104 @@ class DependencyScanner:
                 return file_path
         
         return None
+
+    def iter_requirements_files(self, respect_gitignore: bool = True) -> Iterator[Path]:
+        """Lazily yield every manifest below the project path (recursive mode)."""
+        return iter_manifests(self.project_path, respect_gitignore=respect_gitignore)
+
+    def scan_file(self, file_path: Path) -> ScanResult:
+        """Parse any supported dependency file, including its constraints."""
+        file_path = Path(file_path)
+
+        namespace = self.rules_namespace() if self.rules_only else "scan"
+
+        if self.cache:
+            payload = self.cache.get(file_path, namespace)
+            if payload is not None:
+                return ScanResult(file_path, payload['dependencies'], payload['constraints'], payload.get('via'))
+
+        result, files = self.parse_manifest(file_path)
+
+        if self.cache:
+            self.cache.put(file_path, files, {
+                'dependencies': result.dependencies,
+                'constraints': result.constraints,
+                'via': result.via,
+            }, namespace)
+
+        return result
+
+    def parse_manifest(self, file_path: Path, origin: Optional[Path] = None) -> Tuple[ScanResult, Tuple[Path, ...]]:
+        """
+        Parse a manifest by type, bypassing the cache; also returns every file that was read.
+        When file_path is a copy of a manifest, origin is where the original
+        lives: pip install -r / -c targets are looked up next to it.
+        """
+        origin = origin or file_path
+        if file_path.name.endswith('.toml'):
+            result = ScanResult(file_path, self.parse_pyproject_toml(file_path), {})
+            files = (file_path,)
+        elif file_path.name in LOCKFILE_NAMES:
+            result = ScanResult(file_path, self.parse_lockfile(file_path), {})
+            files = (file_path,)
+        elif file_path.name in SETUP_FILES:
+            result = ScanResult(file_path, self.parse_setup_file(file_path), {})
+            files = (file_path,)
+        elif file_path.suffix == '.ipynb':
+            result, files = self.scan_pip_install(origin, self.parse_notebook(file_path))
+        elif is_dockerfile(file_path.name) or is_shell_script(file_path.name):
+            result, files = self.scan_pip_install(origin, self.parse_pip_script(file_path))
+        elif is_environment_file(file_path.name):
+            result, files = self.scan_conda_environment(file_path, origin)
+        elif is_sbom(file_path.name):
+            result = ScanResult(file_path, self.parse_sbom(file_path), {})
+            files = (file_path,)
+        elif is_distribution(file_path.name):
+            result = ScanResult(file_path, self.parse_distribution(file_path), {})
+            files = (file_path,)
+        else:
+            resolved = self.resolver.resolve(file_path)
+            via = {name: list(parents) for name, parents in resolved.via.items()}
+            result = ScanResult(file_path, resolved.dependencies, resolved.constraints, via or None)
+            files = resolved.files
+        return result, tuple(files)
     
-    def parse_requirements_txt(self, file_path: Path) -> Dict[str, str]:
-        """Parse requirements.txt file."""
+    def read_files(self, file_path: Path) -> Tuple[Path, ...]:
+        """Every file a manifest's scan reads: itself plus its -r / -c includes."""
+        return self.parse_manifest(Path(file_path))[1]
+    
+    def scan_lines(self, lines: Iterable[str], path: Path = Path('-')) -> ScanResult:
+        """
+        Parse requirement lines as they arrive (pip freeze output on stdin).
+        Only AI framework dependencies are kept, so memory stays flat no
+        matter how many lines the stream has.
+        """
         dependencies = {}
-        
-        with open(file_path, 'r') as f:
-            for line in f:
-                line = line.strip()
-                
-                # Skip comments and empty lines
-                if not line or line.startswith('#'):
-                    continue
-                    
-                # Skip -e editable installs and git URLs
-                if line.startswith('-e') or line.startswith('git+'):
-                    continue
-                
-                # Parse package name and version
-                parsed = self._parse_requirement_line(line)
-                if parsed:
-                    name, version = parsed
-                    dependencies[name.lower()] = version
-        
-        return dependencies
+        for line in lines:
+            req = parse_requirement(line.strip())
+            if req and self.is_ai_framework(req.key):
+                dependencies[req.key] = req.specifier
+        return ScanResult(path, dependencies, {})
+
+    def parse_file(self, file_path: Path) -> Dict[str, str]:
+        """Parse any supported dependency file based on its name."""
+        return self.scan_file(file_path).dependencies
+    
+    def parse_requirements_txt(self, file_path: Path) -> Dict[str, str]:
+        """Parse requirements.txt file, following -r includes."""
+        return self.resolver.resolve(file_path).dependencies
     
     def _parse_requirement_line(self, line: str) -> Optional[Tuple[str, str]]:
-        """Parse a single requirement line."""
-        # Remove inline comments
-        line = line.split('#')[0].strip()
+        """Parse a single requirement line into (name, version spec)."""
+        req = parse_requirement(line)
         
-        # Match patterns like: package==1.0.0, package>=1.0.0, package<2.0.0
-        match = re.match(r'^([a-zA-Z0-9\-_]+)([>=<~!]+.*)?$', line)
-        
-        if match:
-            package_name = match.group(1)
-            version_spec = match.group(2) if match.group(2) else ""
-            return (package_name, version_spec.strip())
+        if req:
+            return (req.name, req.specifier)
         
         return None
     
-    def parse_pyproject_toml(self, file_path: Path) -> Dict[str, str]:
-        """Parse pyproject.toml file."""
-        dependencies = {}
-        
+    def _load_pyproject(self, file_path: Path) -> Dict:
+        """Load pyproject.toml, or {} if it can't be read."""
         try:
             import tomllib
         except ImportError:
@@ -116,8 +223,37 @@ class DependencyScanner:
         
         try:
             with open(file_path, 'rb') as f:
-                data = tomllib.load(f)
-            
+                return tomllib.load(f)
+        except Exception:
+            return {}
+    
+    def _add_dependencies(self, deps, dependencies: Dict[str, str]):
+        """Add a PEP 508 string list or a Poetry/PDM name: version table to dependencies."""
+        if isinstance(deps, list):
+            # PEP 621/PDM format: list of strings
+            for dep in deps:
+                if isinstance(dep, str):
+                    req = parse_requirement(dep)
+                    if req:
+                        dependencies[req.key] = req.specifier
+        
+        elif isinstance(deps, dict):
+            # Poetry format: dict of name: version
+            for name, version in deps.items():
+                if name.lower() == 'python':
+                    continue
+                if isinstance(version, str):
+                    dependencies[canonicalize_name(name)] = version
+                elif isinstance(version, dict):
+                    version_str = version.get('version', '')
+                    dependencies[canonicalize_name(name)] = version_str
+    
+    def parse_pyproject_toml(self, file_path: Path) -> Dict[str, str]:
+        """Parse pyproject.toml file."""
+        dependencies = {}
+        data = self._load_pyproject(file_path)
+        
+        try:
             # Try different locations for dependencies
             dep_locations = [
                 ('project', 'dependencies'),
@@ -132,49 +268,204 @@ class DependencyScanner:
                     if not deps:
                         break
                 
-                if isinstance(deps, list):
-                    # Poetry/PDM format: list of strings
-                    for dep in deps:
-                        if isinstance(dep, str):
-                            parsed = self._parse_requirement_line(dep)
-                            if parsed:
-                                name, version = parsed
-                                dependencies[name.lower()] = version
-                
-                elif isinstance(deps, dict):
-                    # Alternative format: dict of name: version
-                    for name, version in deps.items():
-                        if name.lower() == 'python':
-                            continue
-                        if isinstance(version, str):
-                            dependencies[name.lower()] = version
-                        elif isinstance(version, dict):
-                            version_str = version.get('version', '')
-                            dependencies[name.lower()] = version_str
+                self._add_dependencies(deps, dependencies)
         
         except Exception:
             pass
         
         return dependencies
     
-    def scan_project(self) -> Dict[str, str]:
-        """Scan project for dependencies."""
-        req_file = self.find_requirements_file()
+    def parse_pyproject_groups(self, file_path: Path) -> Dict[str, Dict[str, str]]:
+        """
+        Parse the installable groups of a pyproject.toml.
+        Covers project.optional-dependencies (extras), PEP 735 dependency-groups,
+        Poetry groups / dev-dependencies and PDM dev-dependencies.
+        """
+        groups: Dict[str, Dict[str, str]] = {}
+        data = self._load_pyproject(file_path)
         
-        if not req_file:
-            return {}
+        try:
+            project = data.get('project', {})
+            own_name = canonicalize_name(project.get('name', '') or '')
+            extras = project.get('optional-dependencies') or {}
+            for extra in extras:
+                deps = groups.setdefault(canonicalize_name(extra), {})
+                for dep in self._expand_group(extras, extra, own_name, set()):
+                    self._add_dependencies([dep], deps)
+            
+            # PEP 735: entries are strings or {include-group = "name"}
+            dependency_groups = data.get('dependency-groups') or {}
+            for group in dependency_groups:
+                deps = groups.setdefault(canonicalize_name(group), {})
+                for dep in self._expand_group(dependency_groups, group, None, set()):
+                    self._add_dependencies([dep], deps)
+            
+            tool = data.get('tool', {})
+            poetry = tool.get('poetry', {})
+            for group, table in (poetry.get('group') or {}).items():
+                self._add_dependencies(table.get('dependencies', {}), groups.setdefault(canonicalize_name(group), {}))
+            if poetry.get('dev-dependencies'):
+                self._add_dependencies(poetry['dev-dependencies'], groups.setdefault('dev', {}))
+            
+            for group, deps in (tool.get('pdm', {}).get('dev-dependencies') or {}).items():
+                self._add_dependencies(deps, groups.setdefault(canonicalize_name(group), {}))
         
-        if req_file.name == 'pyproject.toml':
-            return self.parse_pyproject_toml(req_file)
-        else:
-            return self.parse_requirements_txt(req_file)
+        except Exception:
+            pass
+        
+        return {name: deps for name, deps in groups.items() if deps}
+    
+    def _expand_group(self, table: Dict, name: str, own_name: Optional[str], seen: set) -> List[str]:
+        """Flatten a group, following include-group and self-referencing extras (myapp[gpu])."""
+        if name in seen:
+            return []
+        seen.add(name)
+        
+        entries = []
+        for dep in table.get(name) or []:
+            if isinstance(dep, dict) and 'include-group' in dep:
+                entries.extend(self._expand_group(table, dep['include-group'], own_name, seen))
+            elif isinstance(dep, str):
+                req = parse_requirement(dep)
+                if own_name and req and req.key == own_name:
+                    for extra in req.extras:
+                        entries.extend(self._expand_group(table, extra, own_name, seen))
+                else:
+                    entries.append(dep)
+        return entries
+    
+    def parse_setup_file(self, file_path: Path) -> Dict[str, str]:
+        """Parse install_requires of a setup.py / setup.cfg without executing it."""
+        dependencies = {}
+        setup = read_setup_file(file_path)
+        if setup:
+            self._add_dependencies(setup.install_requires, dependencies)
+        return dependencies
+    
+    def parse_distribution(self, file_path: Path) -> Dict[str, str]:
+        """Parse the Requires-Dist of a wheel or sdist archive (extras excluded)."""
+        dependencies = {}
+        dist = read_distribution(file_path)
+        if dist:
+            self._add_dependencies(install_requires(dist), dependencies)
+        return dependencies
+    
+    def parse_setup_groups(self, file_path: Path) -> Dict[str, Dict[str, str]]:
+        """Parse extras_require of a setup.py / setup.cfg into groups."""
+        groups: Dict[str, Dict[str, str]] = {}
+        setup = read_setup_file(file_path)
+        if setup:
+            for extra, requirements in setup.extras_require.items():
+                # setuptools allows "extra:marker" keys
+                name = canonicalize_name(extra.split(':', 1)[0])
+                self._add_dependencies(requirements, groups.setdefault(name, {}))
+        return {name: deps for name, deps in groups.items() if deps}
+    
+    def parse_groups(self, file_path: Path) -> Dict[str, Dict[str, str]]:
+        """Parse the installable groups of any manifest that declares them."""
+        file_path = Path(file_path)
+        if file_path.name == 'pyproject.toml':
+            return self.parse_pyproject_groups(file_path)
+        if file_path.name in SETUP_FILES:
+            return self.parse_setup_groups(file_path)
+        return {}
+    
+    def parse_notebook(self, file_path: Path) -> PipInstall:
+        """Collect the pip install commands of a notebook's code cells."""
+        try:
+            return parse_notebook(file_path)
+        except (OSError, ValueError):
+            return PipInstall([], [], [])
+    
+    def parse_pip_script(self, file_path: Path) -> PipInstall:
+        """Collect the pip install commands of a Dockerfile or shell script."""
+        parse = parse_dockerfile if is_dockerfile(file_path.name) else parse_shell_script
+        try:
+            return parse(file_path)
+        except OSError:
+            return PipInstall([], [], [])
+    
+    def _locate_referenced_file(self, file_path: Path, name: str) -> Path:
+        """
+        Find a -r / -c target named by a command in file_path.
+        Paths inside a container (/app/requirements.txt) fall back to the
+        same file name next to file_path, i.e. in the build context.
+        """
+        candidate = file_path.parent / name
+        if not self.resolver.exists(candidate):
+            fallback = file_path.parent / Path(name).name
+            if self.resolver.exists(fallback):
+                return fallback
+        return candidate
+    
+    def scan_pip_install(self, file_path: Path, install: PipInstall) -> Tuple[ScanResult, Tuple[Path, ...]]:
+        """
+        Turn pip install commands found in file_path into a ScanResult.
+        -r / -c files are looked up relative to file_path's directory; named
+        requirements win over pins from those files. Also returns every file read.
+        """
+        dependencies: Dict[str, str] = {}
+        constraints: Dict[str, str] = {}
+        files = [file_path]
+        
+        for name in install.requirement_files:
+            resolved = self.resolver.resolve(self._locate_referenced_file(file_path, name))
+            dependencies.update(resolved.dependencies)
+            constraints.update(resolved.constraints)
+            files.extend(resolved.files)
+        for name in install.constraint_files:
+            resolved = self.resolver.resolve(self._locate_referenced_file(file_path, name))
+            constraints.update(resolved.dependencies)
+            constraints.update(resolved.constraints)
+            files.extend(resolved.files)
+        
+        self._add_dependencies(install.requirements, dependencies)
+        return ScanResult(file_path, dependencies, constraints), tuple(files)
+    
+    def scan_conda_environment(self, file_path: Path,
+                               origin: Optional[Path] = None) -> Tuple[ScanResult, Tuple[Path, ...]]:
+        """Merge an environment.yml's conda specs with its pip: subsection (pip wins)."""
+        origin = origin or file_path
+        try:
+            environment = parse_environment_yml(file_path)
+        except OSError:
+            environment = CondaEnvironment({}, PipInstall([], [], []))
+        
+        pip_result, files = self.scan_pip_install(origin, environment.pip)
+        dependencies = dict(environment.dependencies)
+        dependencies.update(pip_result.dependencies)
+        return ScanResult(origin, dependencies, pip_result.constraints), files
+    
+    def parse_sbom(self, file_path: Path) -> Dict[str, str]:
+        """Parse the pkg:pypi components of a CycloneDX / SPDX JSON SBOM."""
+        try:
+            return parse_sbom(file_path)
+        except (OSError, ValueError):
+            return {}
+    
+    def parse_lockfile(self, file_path: Path) -> Dict[str, str]:
+        """Parse a lockfile into exact pins ({name: "==version"})."""
+        if self.rules_only:
+            return parse_lockfile(file_path, self.rule_packages())
+        return parse_lockfile(file_path)
+    
+    def scan_project(self) -> Dict[str, str]:
+        """Scan project for dependencies, merging every manifest it has."""
+        from .project import Project
+
+        return Project(self.project_path, self).dependencies
+    
+    def is_ai_framework(self, name: str) -> bool:
+        """Check if a package name belongs to an AI framework."""
+        name = name.lower()
+        return any(framework in name for framework in self.AI_FRAMEWORKS)
     
     def filter_ai_frameworks(self, dependencies: Dict[str, str]) -> Dict[str, str]:
         """Filter to only AI framework dependencies."""
         return {
             name: version
             for name, version in dependencies.items()
-            if any(framework in name.lower() for framework in self.AI_FRAMEWORKS)
+            if self.is_ai_framework(name)
         }
     
     def check_version_in_range(self, version: str, spec: str) -> bool:
@@ -0,0 +1,166 @@
+"""
+Static setup.py / setup.cfg dependency extraction.
+Reads install_requires and extras_require without executing any project code.
+"""
+
+import ast
+import configparser
+import hashlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+SETUP_FILES = {"setup.py", "setup.cfg"}
+
+# Keyed by (file name, content hash): identical boilerplate setup.py files
+# are parsed once. Bounded LRU, so long --watch sessions don't grow it forever.
+SETUP_MEMO_SIZE = 1024
+_DIGEST_MEMO: "OrderedDict[Tuple[str, str], SetupRequirements]" = OrderedDict()
+
+
+class SetupRequirements(NamedTuple):
+    """Requirement strings declared by a setup.py / setup.cfg."""
+
+    install_requires: List[str]
+    extras_require: Dict[str, List[str]]
+
+
+def _as_list(value) -> List[str]:
+    """Normalize a requirements value (str or list of str) to a list."""
+    if isinstance(value, str):
+        return [line.strip() for line in value.splitlines() if line.strip()]
+    if isinstance(value, (list, tuple)):
+        return [item for item in value if isinstance(item, str)]
+    return []
+
+
+class _LiteralResolver:
+    """Evaluates literal expressions, following simple module-level names."""
+
+    def __init__(self, tree: ast.AST):
+        self.names: Dict[str, object] = {}
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Assign) and len(node.targets) == 1 \
+                    and isinstance(node.targets[0], ast.Name):
+                value = self.evaluate(node.value)
+                if value is not None:
+                    self.names[node.targets[0].id] = value
+
+    def evaluate(self, node: ast.AST):
+        """Return the literal value of node, or None if it isn't static."""
+        if isinstance(node, ast.Name):
+            return self.names.get(node.id)
+
+        if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+            left, right = self.evaluate(node.left), self.evaluate(node.right)
+            if isinstance(left, (list, tuple)) and isinstance(right, (list, tuple)):
+                return list(left) + list(right)
+            return None
+
+        if isinstance(node, (ast.List, ast.Tuple)):
+            items = [self.evaluate(elt) for elt in node.elts]
+            return items if all(item is not None for item in items) else None
+
+        if isinstance(node, ast.Dict):
+            if any(key is None for key in node.keys):
+                return None
+            keys = [self.evaluate(key) for key in node.keys]
+            values = [self.evaluate(value) for value in node.values]
+            if any(k is None for k in keys) or any(v is None for v in values):
+                return None
+            return dict(zip(keys, values))
+
+        try:
+            return ast.literal_eval(node)
+        except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+            return None
+
+
+def _is_setup_call(node: ast.AST) -> bool:
+    if not isinstance(node, ast.Call):
+        return False
+    func = node.func
+    if isinstance(func, ast.Name):
+        return func.id == 'setup'
+    return isinstance(func, ast.Attribute) and func.attr == 'setup'
+
+
+def parse_setup_py_source(source: str) -> SetupRequirements:
+    """Extract literal install_requires / extras_require from setup.py source."""
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return SetupRequirements([], {})
+
+    resolver = _LiteralResolver(tree)
+    install_requires: List[str] = []
+    extras_require: Dict[str, List[str]] = {}
+
+    for node in ast.walk(tree):
+        if not _is_setup_call(node):
+            continue
+
+        options = {}
+        for keyword in node.keywords:
+            if keyword.arg is None:
+                # setup(**config) with a literal config dict
+                expanded = resolver.evaluate(keyword.value)
+                if isinstance(expanded, dict):
+                    options.update(expanded)
+            elif keyword.arg in ('install_requires', 'extras_require'):
+                options[keyword.arg] = resolver.evaluate(keyword.value)
+
+        install_requires.extend(_as_list(options.get('install_requires')))
+        extras = options.get('extras_require')
+        if isinstance(extras, dict):
+            for extra, requirements in extras.items():
+                if isinstance(extra, str):
+                    extras_require.setdefault(extra, []).extend(_as_list(requirements))
+
+    return SetupRequirements(install_requires, extras_require)
+
+
+def parse_setup_cfg_source(source: str) -> SetupRequirements:
+    """Extract [options] install_requires and [options.extras_require] from setup.cfg."""
+    parser = configparser.ConfigParser(interpolation=None)
+    try:
+        parser.read_string(source)
+    except configparser.Error:
+        return SetupRequirements([], {})
+
+    install_requires = []
+    if parser.has_option('options', 'install_requires'):
+        install_requires = _as_list(parser.get('options', 'install_requires'))
+
+    extras_require = {}
+    if parser.has_section('options.extras_require'):
+        for extra, value in parser.items('options.extras_require'):
+            extras_require[extra] = _as_list(value)
+
+    return SetupRequirements(install_requires, extras_require)
+
+
+def read_setup_file(file_path: Path) -> Optional[SetupRequirements]:
+    """Read a setup.py / setup.cfg statically, memoized by file kind and content hash."""
+    file_path = Path(file_path)
+    try:
+        data = file_path.read_bytes()
+    except OSError:
+        return None
+
+    key = (file_path.name, hashlib.sha256(data).hexdigest())
+    cached = _DIGEST_MEMO.get(key)
+    if cached is not None:
+        _DIGEST_MEMO.move_to_end(key)
+        return cached
+
+    source = data.decode('utf-8', errors='replace')
+    if file_path.name == 'setup.cfg':
+        result = parse_setup_cfg_source(source)
+    else:
+        result = parse_setup_py_source(source)
+
+    _DIGEST_MEMO[key] = result
+    while len(_DIGEST_MEMO) > SETUP_MEMO_SIZE:
+        _DIGEST_MEMO.popitem(last=False)
+    return result
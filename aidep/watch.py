@@ -0,0 +1,230 @@
+"""
+Watch mode.
+Keeps a project's parsed manifests and rule results in memory and re-checks
+it when one of its files changes: only the changed files are re-parsed and
+only the rules for packages whose specs changed are re-evaluated.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .checker import ConflictChecker
+from .discovery import MANIFEST_DIRS
+from .project import Project
+from .scanner import DependencyScanner, ScanResult
+
+# Editors save in bursts (write, rename, chmod); events this close together are one save
+DEBOUNCE_SECONDS = 0.02
+
+POLL_INTERVAL = 0.25
+
+# <sys/inotify.h>
+IN_MODIFY = 0x002
+IN_ATTRIB = 0x004
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+class PollingWatcher:
+    """Detects changes by comparing stat() results of the watched files."""
+
+    def __init__(self, interval: float = POLL_INTERVAL):
+        self.interval = interval
+        self._stats: Dict[Path, Optional[Tuple[int, int]]] = {}
+
+    @staticmethod
+    def _stat(path: Path) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def watch(self, files: Iterable[Path], directories: Iterable[Path] = ()):
+        """Replace the watched set; directories are watched for added / removed entries."""
+        # A directory's mtime changes whenever an entry is added or removed.
+        # Already-watched paths keep their last stat, so no change is lost.
+        paths = {Path(p) for p in [*files, *directories]}
+        self._stats = {p: self._stats[p] if p in self._stats else self._stat(p) for p in paths}
+
+    def poll(self) -> Set[Path]:
+        """Paths that changed since the last poll (a directory stands for its new entries)."""
+        changed = set()
+        for path, previous in self._stats.items():
+            current = self._stat(path)
+            if current != previous:
+                self._stats[path] = current
+                changed.add(path)
+        return changed
+
+    def wait(self, timeout: Optional[float] = None) -> Set[Path]:
+        """Block until something changed (or timeout) and return what did."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            changed = self.poll()
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+            time.sleep(self.interval)
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """
+    Linux inotify through libc, without extra dependencies.
+
+    Directories are watched rather than files, since editors often save by
+    writing a temporary file and renaming it over the original.
+    """
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or None, use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._rm_watch = libc.inotify_rm_watch
+        self._rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._watches: Dict[int, Path] = {}
+        self._files: Set[Path] = set()
+        self._dirs: Set[Path] = set()
+
+    def watch(self, files: Iterable[Path], directories: Iterable[Path] = ()):
+        """Replace the watched set; directories are watched for added / removed entries."""
+        self._files = {Path(f) for f in files}
+        self._dirs = {Path(d) for d in directories}
+        wanted = {f.parent for f in self._files} | self._dirs
+
+        for wd, directory in list(self._watches.items()):
+            if directory not in wanted:
+                self._rm_watch(self._fd, wd)
+                del self._watches[wd]
+        watched = set(self._watches.values())
+        for directory in wanted - watched:
+            wd = self._add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+            if wd >= 0:
+                self._watches[wd] = directory
+
+    def _read_events(self) -> Set[Path]:
+        changed = set()
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return changed
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b'\0')
+                offset += length
+                directory = self._watches.get(wd)
+                if directory is None or not name:
+                    continue
+                path = directory / os.fsdecode(name)
+                if path in self._files:
+                    changed.add(path)
+                elif directory in self._dirs and mask & (IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO):
+                    changed.add(directory)
+
+    def wait(self, timeout: Optional[float] = None) -> Set[Path]:
+        """Block until something changed (or timeout) and return what did."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        changed: Set[Path] = set()
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if changed:
+                remaining = DEBOUNCE_SECONDS
+            ready, _, _ = select.select([self._fd], [], [], remaining)
+            if not ready:
+                return changed
+            changed |= self._read_events()
+
+    def close(self):
+        os.close(self._fd)
+
+
+def make_watcher():
+    """inotify where the platform has it, stat polling everywhere else."""
+    try:
+        return InotifyWatcher()
+    except (OSError, AttributeError):
+        return PollingWatcher()
+
+
+class WatchSession:
+    """
+    A project's manifests and conflict results, kept warm between changes.
+
+    refresh() re-parses only the sources that are new, changed, or include
+    a changed file, rebuilds the merged view from the results in memory and
+    lets the checker re-evaluate only the rules for packages that changed.
+    """
+
+    def __init__(self, path, scanner: Optional[DependencyScanner] = None):
+        self.path = Path(path).resolve()
+        self.scanner = scanner or DependencyScanner(str(self.path))
+        self.checker = ConflictChecker({})
+        self.sources: List[Path] = []
+        self._results: Dict[Path, ScanResult] = {}
+        self._reads: Dict[Path, Set[Path]] = {}
+        self.conflicts: List[Dict] = []
+        self.ai_dependencies: Dict[str, str] = {}
+        self._checked = False
+
+    def watched_files(self) -> Set[Path]:
+        """Every file the current results were parsed from."""
+        return set(self.sources).union(*self._reads.values())
+
+    def watched_directories(self) -> Set[Path]:
+        """Directories where a new manifest would join the project."""
+        directories = {self.path} | {source.parent for source in self.sources}
+        return directories | {self.path / name for name in MANIFEST_DIRS if (self.path / name).is_dir()}
+
+    def _load(self, source: Path):
+        result, files = self.scanner.parse_manifest(source)
+        self._results[source] = result
+        self._reads[source] = {Path(f).resolve() for f in files} | {source}
+
+    def refresh(self, changed: Iterable[Path] = ()) -> bool:
+        """Bring the results up to date with changed paths; False if nothing relevant changed."""
+        changed = {Path(path).resolve() for path in changed}
+        for path in changed:
+            self.scanner.resolver.forget(path)
+
+        sources = [source.resolve() for source in Project(self.path, self.scanner).sources]
+        stale = [source for source in sources
+                 if source not in self._results or self._reads[source] & changed]
+        removed = set(self._results) - set(sources)
+        if not stale and not removed and sources == self.sources and self._checked:
+            return False
+
+        for source in removed:
+            del self._results[source]
+            del self._reads[source]
+        for source in stale:
+            self._load(source)
+        self.sources = sources
+
+        project = Project.from_results(self.path, [self._results[s] for s in sources], self.scanner)
+        self.ai_dependencies = self.scanner.filter_ai_frameworks(project.dependencies)
+        self.conflicts = self.checker.update(self.ai_dependencies, project.constraints, project.graph)
+        self._checked = True
+        return True
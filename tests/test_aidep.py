@@ -3,10 +3,34 @@ Comprehensive test suite for aidep package.
 Tests conflict detection, version parsing, and CLI commands.
 """
 
+import inspect
+import json
+import os
+from pathlib import Path
+
 import pytest
+from aidep.cache import ParseCache
+from aidep.changes import affected_manifests, changed_files
 from aidep.checker import ConflictChecker
+from aidep.conda import parse_conda_spec, read_conda_meta
 from aidep.conflicts import CONFLICTS, COMPATIBILITY_MATRIX
+from aidep.discovery import iter_manifests
+from aidep.distributions import parse_requires_txt, read_distribution, read_wheel_metadata
+from aidep.graph import DependencyGraph, graph_from_via
+from aidep.history import BlobReader, HistoryAudit, iter_manifest_commits
+from aidep.images import scan_image
+from aidep.imports import audit_imports, distributions_for, extract_imports
+from aidep.includes import IncludeResolver
+from aidep.jsonstream import JSONStream
+from aidep.lockfiles import parse_lockfile
+from aidep.pipcmd import parse_pip_commands
+from aidep.pipeline import parse_manifests, read_sources, scan_wheelhouse
+from aidep.pipreport import parse_pip_report
+from aidep.project import Project, group_projects
+from aidep.requirement import parse_requirement
 from aidep.scanner import DependencyScanner
+from aidep.watch import InotifyWatcher, PollingWatcher, WatchSession
+from aidep.setupfiles import parse_setup_py_source
 
 
 class TestConflictDatabase:
@@ -282,5 +306,1623 @@ class TestEdgeCases:
         assert isinstance(conflicts, list)
 
 
+class TestManifestDiscovery:
+    """Test recursive manifest discovery."""
+
+    def _touch(self, path, content="langchain==0.1.0\n"):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+
+    def test_finds_nested_manifests(self, tmp_path):
+        """Test that manifests in nested services are all found, in sorted order."""
+        self._touch(tmp_path / "requirements.txt")
+        self._touch(tmp_path / "services" / "api" / "pyproject.toml", "[project]\n")
+        self._touch(tmp_path / "services" / "worker" / "requirements-dev.txt")
+        self._touch(tmp_path / "services" / "worker" / "requirements" / "base.txt")
+        self._touch(tmp_path / "services" / "worker" / "notes.txt")
+
+        found = [p.relative_to(tmp_path).as_posix() for p in iter_manifests(tmp_path)]
+        assert found == [
+            "requirements.txt",
+            "services/api/pyproject.toml",
+            "services/worker/requirements-dev.txt",
+            "services/worker/requirements/base.txt",
+        ]
+
+    def test_prunes_vendored_and_ignored_trees(self, tmp_path):
+        """Test that .git, node_modules, virtualenvs and .gitignore'd dirs are skipped."""
+        self._touch(tmp_path / "requirements.txt")
+        self._touch(tmp_path / ".git" / "requirements.txt")
+        self._touch(tmp_path / "node_modules" / "pkg" / "requirements.txt")
+        self._touch(tmp_path / "env" / "pyvenv.cfg", "")
+        self._touch(tmp_path / "env" / "requirements.txt")
+        self._touch(tmp_path / "build" / "requirements.txt")
+        self._touch(tmp_path / "svc" / "generated" / "requirements.txt")
+        self._touch(tmp_path / ".gitignore", "build/\n")
+        self._touch(tmp_path / "svc" / ".gitignore", "/generated\n")
+
+        found = [p.relative_to(tmp_path).as_posix() for p in iter_manifests(tmp_path)]
+        assert found == ["requirements.txt"]
+
+    def test_discovery_is_lazy(self, tmp_path):
+        """Test that discovery returns a generator."""
+        scanner = DependencyScanner(str(tmp_path))
+        assert inspect.isgenerator(scanner.iter_requirements_files())
+
+
+class TestParallelPipeline:
+    """Test the process-pool parse pipeline."""
+
+    def test_parallel_matches_serial_order(self, tmp_path):
+        """Test that parallel parsing yields the same results in the same order."""
+        paths = []
+        for i in range(12):
+            path = tmp_path / f"svc{i:02d}" / "requirements.txt"
+            path.parent.mkdir()
+            path.write_text(f"langchain==0.{i}.0\nopenai>=1.0\n")
+            paths.append(path)
+
+        serial = list(parse_manifests(paths, jobs=1))
+        parallel = list(parse_manifests(paths, jobs=3, chunk_size=2))
+        assert parallel == serial
+        assert [r.path for r in parallel] == paths
+        assert parallel[5].dependencies["langchain"] == "==0.5.0"
+
+
+class TestRequirementParser:
+    """Test the PEP 508 requirement parser."""
+
+    def test_extras_and_markers(self):
+        """Test that extras, specifiers and markers are all captured."""
+        req = parse_requirement('torch[cuda, dev]>=2.0,<3 ; python_version < "3.10"')
+        assert req.name == "torch"
+        assert req.extras == ("cuda", "dev")
+        assert req.specifier == ">=2.0,<3"
+        assert req.marker == 'python_version < "3.10"'
+
+    def test_dotted_and_underscored_names(self):
+        """Test that dotted names parse and keys are canonicalized."""
+        assert parse_requirement("zope.interface==5.0").key == "zope-interface"
+        assert parse_requirement("flash_attn (>=2.0)").key == "flash-attn"
+        assert parse_requirement("flash_attn (>=2.0)").specifier == ">=2.0"
+
+    def test_url_requirement(self):
+        """Test that URL requirements keep the URL but have no specifier."""
+        req = parse_requirement("torch @ https://example.com/torch-2.1.0.whl#sha256=abc")
+        assert req.url == "https://example.com/torch-2.1.0.whl#sha256=abc"
+        assert req.specifier == ""
+
+    def test_comments_and_invalid_lines(self):
+        """Test that comments are stripped and invalid lines rejected."""
+        assert parse_requirement("openai==1.0.0  # pinned").specifier == "==1.0.0"
+        assert parse_requirement("# just a comment") is None
+        assert parse_requirement("-r base.txt") is None
+        assert parse_requirement("torch 2.0") is None
+
+    def test_per_requirement_options_and_archive_names(self):
+        """Test that --hash options are dropped and bare wheel file names rejected."""
+        req = parse_requirement("torch==1.13.0 --hash=sha256:abc --hash sha256:def")
+        assert (req.key, req.specifier) == ("torch", "==1.13.0")
+        assert parse_requirement('numpy==1.26.0 ; python_version >= "3.9" --hash=sha256:0a').marker == \
+            'python_version >= "3.9"'
+        assert parse_requirement("torch-2.1.0-cp311-cp311-linux_x86_64.whl") is None
+
+    def test_parse_is_memoized(self):
+        """Test that repeated lines are served from the LRU cache."""
+        parse_requirement.cache_clear()
+        parse_requirement("langchain==0.1.0")
+        parse_requirement("langchain==0.1.0")
+        assert parse_requirement.cache_info().hits == 1
+
+    def test_scanner_keeps_extras_lines(self, tmp_path):
+        """Test that requirements with extras and markers are no longer dropped."""
+        req_file = tmp_path / "requirements.txt"
+        req_file.write_text('torch[cuda]==2.1.0\nflash_attn>=2.3 ; sys_platform == "linux"\n')
+        deps = DependencyScanner(str(tmp_path)).parse_requirements_txt(req_file)
+        assert deps == {"torch": "==2.1.0", "flash-attn": ">=2.3"}
+
+
+class TestIncludeResolver:
+    """Test -r / -c include-graph resolution."""
+
+    def test_nested_includes_and_constraints(self, tmp_path):
+        """Test that nested -r files merge and -c files become constraints."""
+        (tmp_path / "base.txt").write_text("pydantic>=1.10\nlangchain==0.0.300\n")
+        (tmp_path / "ml.txt").write_text("-r base.txt\ntorch>=2.0\n")
+        (tmp_path / "constraints.txt").write_text("torch==2.1.0\n")
+        (tmp_path / "requirements.txt").write_text(
+            "--requirement=ml.txt\n-c constraints.txt\nlangchain==0.1.0\n"
+        )
+
+        result = IncludeResolver().resolve(tmp_path / "requirements.txt")
+        assert result.dependencies == {
+            "pydantic": ">=1.10",
+            "langchain": "==0.1.0",
+            "torch": ">=2.0",
+        }
+        assert result.constraints == {"torch": "==2.1.0"}
+        assert len(result.files) == 4
+
+    def test_hashed_pip_compile_output(self, tmp_path):
+        """Test that pip-compile --generate-hashes continuation lines keep every package."""
+        (tmp_path / "requirements.txt").write_text(
+            "torch==1.13.0 \\\n"
+            "    --hash=sha256:0a1b \\\n"
+            "    --hash=sha256:2c3d\n"
+            "    # via -r requirements.in\n"
+            "transformers==4.30.0 \\\n"
+            "    --hash=sha256:4e5f\n"
+            "    # via -r requirements.in\n"
+        )
+
+        result = IncludeResolver().resolve(tmp_path / "requirements.txt")
+        assert result.dependencies == {"torch": "==1.13.0", "transformers": "==4.30.0"}
+        assert result.via == {"torch": ("-r requirements.in",), "transformers": ("-r requirements.in",)}
+
+    def test_cycles_are_detected(self, tmp_path):
+        """Test that include cycles are recorded instead of recursing forever."""
+        (tmp_path / "a.txt").write_text("-r b.txt\nopenai==1.0.0\n")
+        (tmp_path / "b.txt").write_text("-r a.txt\nlangchain==0.1.0\n")
+
+        resolver = IncludeResolver()
+        result = resolver.resolve(tmp_path / "a.txt")
+        assert result.dependencies == {"langchain": "==0.1.0", "openai": "==1.0.0"}
+        assert len(resolver.cycles) == 1
+
+    def test_shared_files_parsed_once(self, tmp_path, monkeypatch):
+        """Test that a base file included by many services is read only once."""
+        (tmp_path / "base.txt").write_text("langchain==0.1.0\n")
+        for name in ("svc1.txt", "svc2.txt", "svc3.txt"):
+            (tmp_path / name).write_text("-r base.txt\n")
+
+        resolver = IncludeResolver()
+        opened = []
+        real_open = open
+
+        def tracking_open(path, *args, **kwargs):
+            opened.append(Path(path).name)
+            return real_open(path, *args, **kwargs)
+
+        monkeypatch.setattr("builtins.open", tracking_open)
+        for name in ("svc1.txt", "svc2.txt", "svc3.txt"):
+            resolver.resolve(tmp_path / name)
+        assert opened.count("base.txt") == 1
+
+    def test_constraints_applied_in_checker(self):
+        """Test that constraint pins are used when evaluating conflicts."""
+        checker = ConflictChecker({"torch": ""}, {"torch": "==2.1.0"})
+        assert checker._effective_spec("torch") == "==2.1.0"
+        checker = ConflictChecker({"torch": ">=2.0"}, {"torch": "==2.1.0"})
+        assert checker._effective_spec("torch") == "==2.1.0,>=2.0"
+
+
+class TestParseCache:
+    """Test the persistent on-disk parse cache."""
+
+    def test_unchanged_file_skips_parsing(self, tmp_path, monkeypatch):
+        """Test that a second scan of an unchanged file is served from cache."""
+        req_file = tmp_path / "requirements.txt"
+        req_file.write_text("langchain==0.1.0\n")
+        cache = ParseCache(tmp_path / "cache")
+
+        first = DependencyScanner(str(tmp_path), cache=cache).scan_file(req_file)
+
+        scanner = DependencyScanner(str(tmp_path), cache=cache)
+        monkeypatch.setattr(scanner.resolver, "resolve", lambda path: pytest.fail("re-parsed"))
+        assert scanner.scan_file(req_file).dependencies == first.dependencies
+
+    def test_changed_include_invalidates(self, tmp_path):
+        """Test that editing an -r included file invalidates the entry."""
+        (tmp_path / "base.txt").write_text("openai==0.28.1\n")
+        req_file = tmp_path / "requirements.txt"
+        req_file.write_text("-r base.txt\n")
+        cache = ParseCache(tmp_path / "cache")
+
+        DependencyScanner(str(tmp_path), cache=cache).scan_file(req_file)
+        (tmp_path / "base.txt").write_text("openai==1.3.0\n")
+        result = DependencyScanner(str(tmp_path), cache=cache).scan_file(req_file)
+        assert result.dependencies == {"openai": "==1.3.0"}
+
+    def test_rules_only_entries_follow_rule_packages(self, tmp_path, monkeypatch):
+        """Test that adding a framework invalidates filtered lockfile payloads."""
+        lock = tmp_path / "poetry.lock"
+        lock.write_text('[[package]]\nname = "openai"\nversion = "1.3.0"\n\n'
+                        '[[package]]\nname = "newframework"\nversion = "0.1.0"\n')
+        cache = ParseCache(tmp_path / "cache")
+        assert DependencyScanner(str(tmp_path), cache=cache, rules_only=True).parse_file(lock) == {"openai": "==1.3.0"}
+
+        monkeypatch.setattr(DependencyScanner, "AI_FRAMEWORKS", DependencyScanner.AI_FRAMEWORKS + ["newframework"])
+        result = DependencyScanner(str(tmp_path), cache=cache, rules_only=True).parse_file(lock)
+        assert result == {"openai": "==1.3.0", "newframework": "==0.1.0"}
+
+    def test_entries_from_another_release_are_ignored(self, tmp_path, monkeypatch):
+        """Test that an upgrade invalidates payloads written by an older parser."""
+        req_file = tmp_path / "requirements.txt"
+        req_file.write_text("langchain==0.1.0\n")
+        cache = ParseCache(tmp_path / "cache")
+        cache.put(req_file, [req_file], {"dependencies": {}, "constraints": {}})
+        assert cache.get(req_file) is not None
+
+        monkeypatch.setattr("aidep.cache.__version__", "99.0.0")
+        assert cache.get(req_file) is None
+
+    def test_touched_file_revalidated_by_hash(self, tmp_path):
+        """Test that an mtime-only change is accepted after a hash comparison."""
+        req_file = tmp_path / "requirements.txt"
+        req_file.write_text("langchain==0.1.0\n")
+        cache = ParseCache(tmp_path / "cache")
+        cache.put(req_file, [req_file], {"dependencies": {}, "constraints": {}})
+
+        stat = req_file.stat()
+        os.utime(req_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert cache.get(req_file) == {"dependencies": {}, "constraints": {}}
+
+    def test_lru_eviction(self, tmp_path):
+        """Test that the oldest entries are evicted past the size bound."""
+        cache = ParseCache(tmp_path / "cache", max_bytes=2000)
+        files = []
+        for i in range(20):
+            path = tmp_path / f"req{i}.txt"
+            path.write_text("x\n")
+            files.append(path)
+            cache.put(path, [path], {"dependencies": {"pkg": "==1.0"}, "constraints": {}})
+
+        assert cache._disk_usage() <= 2000
+        assert cache.get(files[-1]) is not None
+        assert cache.get(files[0]) is None
+
+
+POETRY_LOCK = """\
+[[package]]
+name = "langchain"
+version = "0.0.330"
+description = "Building applications with LLMs"
+optional = false
+files = [
+    {file = "langchain-0.0.330.tar.gz", hash = "sha256:abc"},
+]
+
+[package.dependencies]
+openai = ">=0.27"
+version = "not-a-package-version"
+
+[[package]]
+name = "Flash_Attn"
+version = "2.3.3"
+
+[metadata]
+lock-version = "2.0"
+"""
+
+UV_LOCK = """\
+version = 1
+requires-python = ">=3.10"
+
+[[package]]
+name = "myapp"
+source = { editable = "." }
+dependencies = [
+    { name = "torch" },
+]
+
+[[package]]
+name = "torch"
+version = "2.1.0"
+source = { registry = "https://pypi.org/simple" }
+dependencies = [
+    { name = "filelock" },
+]
+"""
+
+
+class TestLockfiles:
+    """Test lockfile ingestion."""
+
+    def test_poetry_lock(self, tmp_path):
+        """Test that poetry.lock yields exact pins and ignores sub-tables."""
+        lock = tmp_path / "poetry.lock"
+        lock.write_text(POETRY_LOCK)
+        assert parse_lockfile(lock) == {"langchain": "==0.0.330", "flash-attn": "==2.3.3"}
+
+    def test_uv_lock_skips_unversioned_root(self, tmp_path):
+        """Test that uv.lock's editable root package (no version) is skipped."""
+        lock = tmp_path / "uv.lock"
+        lock.write_text(UV_LOCK)
+        assert parse_lockfile(lock) == {"torch": "==2.1.0"}
+
+    def test_pipfile_lock(self, tmp_path):
+        """Test that Pipfile.lock default pins override develop pins."""
+        lock = tmp_path / "Pipfile.lock"
+        lock.write_text(json.dumps({
+            "_meta": {},
+            "default": {"openai": {"version": "==1.3.0"}},
+            "develop": {"openai": {"version": "==0.28.1"}, "pytest": {"version": "==7.4.0"}},
+        }))
+        assert parse_lockfile(lock) == {"openai": "==1.3.0", "pytest": "==7.4.0"}
+
+    def test_scanner_dispatches_lockfiles(self, tmp_path):
+        """Test that scan_file routes lockfiles to the lockfile parser."""
+        lock = tmp_path / "pdm.lock"
+        lock.write_text('[[package]]\nname = "openai"\nversion = "1.3.0"\n')
+        assert DependencyScanner(str(tmp_path)).parse_file(lock) == {"openai": "==1.3.0"}
+
+
+class TestLockfileFastPath:
+    """Test the mmap pre-filtered lockfile scan."""
+
+    def test_fast_path_matches_filtered_full_parse(self, tmp_path):
+        """Test that the fast path returns the AI-framework slice of a full parse."""
+        lock = tmp_path / "uv.lock"
+        blocks = [UV_LOCK]
+        for i in range(50):
+            blocks.append(f'[[package]]\nname = "filler{i}"\nversion = "1.{i}"\n'
+                          f'dependencies = [\n    {{ name = "torch" }},\n]\n')
+        blocks.append('[[package]]\nname = "langchain-openai"\nversion = "0.1.0"\n')
+        lock.write_text("\n".join(blocks))
+
+        scanner = DependencyScanner(str(tmp_path))
+        expected = scanner.filter_ai_frameworks(parse_lockfile(lock))
+        fast = parse_lockfile(lock, DependencyScanner.rule_packages())
+        assert fast == expected == {"torch": "==2.1.0", "langchain-openai": "==0.1.0"}
+
+    def test_fast_path_pipfile_lock(self, tmp_path):
+        """Test that the fast path reads Pipfile.lock entries."""
+        lock = tmp_path / "Pipfile.lock"
+        lock.write_text(json.dumps({
+            "default": {
+                "openai": {"hashes": ["sha256:abc"], "version": "==1.3.0"},
+                "requests": {"version": "==2.31.0"},
+            },
+        }, indent=4))
+        assert parse_lockfile(lock, ["openai"]) == {"openai": "==1.3.0"}
+
+    def test_fast_path_pipfile_lock_matches_full_parse(self, tmp_path):
+        """Test default-over-develop precedence and compact JSON on the fast path."""
+        lock = tmp_path / "Pipfile.lock"
+        data = {
+            "_meta": {"hash": {"sha256": "abc"}},
+            "default": {"torch": {"version": "==2.1.0"}, "pydantic": {"version": "==2.5.0"}},
+            "develop": {"torch": {"version": "==1.13.0"}},
+        }
+        for text in (json.dumps(data, indent=4), json.dumps(data, separators=(',', ':'))):
+            lock.write_text(text)
+            fast = parse_lockfile(lock, DependencyScanner.rule_packages())
+            assert fast == parse_lockfile(lock) == {"torch": "==2.1.0", "pydantic": "==2.5.0"}
+
+    def test_rules_only_scanner(self, tmp_path):
+        """Test that a rules_only scanner uses the fast path."""
+        lock = tmp_path / "poetry.lock"
+        lock.write_text(POETRY_LOCK)
+        scanner = DependencyScanner(str(tmp_path), rules_only=True)
+        assert scanner.parse_file(lock) == {"langchain": "==0.0.330", "flash-attn": "==2.3.3"}
+
+
+class TestProjectModel:
+    """Test the multi-source project model."""
+
+    def _make_project(self, tmp_path):
+        (tmp_path / "pyproject.toml").write_text(
+            '[project]\ndependencies = ["langchain>=0.1", "openai"]\n'
+        )
+        (tmp_path / "requirements.txt").write_text("openai==1.3.0\ntorch\n")
+        (tmp_path / "requirements").mkdir()
+        (tmp_path / "requirements" / "gpu.txt").write_text("flash-attn>=2.3\n")
+        (tmp_path / "uv.lock").write_text('[[package]]\nname = "langchain"\nversion = "0.1.7"\n')
+
+    def test_merges_all_sources(self, tmp_path):
+        """Test that every manifest is merged and lockfile pins take precedence."""
+        self._make_project(tmp_path)
+        project = Project(tmp_path)
+        assert project.dependencies == {
+            "langchain": "==0.1.7",
+            "openai": "==1.3.0",
+            "torch": "",
+            "flash-attn": ">=2.3",
+        }
+        assert [s.name for s, _ in project.provenance["langchain"]] == ["pyproject.toml", "uv.lock"]
+
+    def test_sources_parsed_once(self, tmp_path, monkeypatch):
+        """Test that repeated access does not re-parse sources."""
+        self._make_project(tmp_path)
+        scanner = DependencyScanner(str(tmp_path))
+        calls = []
+        real_scan = scanner.scan_file
+        monkeypatch.setattr(scanner, "scan_file", lambda p: calls.append(p) or real_scan(p))
+
+        project = Project(tmp_path, scanner)
+        project.dependencies
+        project.provenance
+        project.dependencies
+        assert len(calls) == 4
+
+        project.invalidate(tmp_path / "requirements.txt")
+        project.dependencies
+        assert len(calls) == 5
+
+    def test_scan_project_is_no_longer_first_file_wins(self, tmp_path):
+        """Test that scan_project sees dependencies from every manifest."""
+        self._make_project(tmp_path)
+        deps = DependencyScanner(str(tmp_path)).scan_project()
+        assert {"langchain", "openai", "torch", "flash-attn"} <= set(deps)
+
+    def test_group_projects(self, tmp_path):
+        """Test that recursive results are grouped into one project per directory."""
+        (tmp_path / "svc").mkdir()
+        self._make_project(tmp_path / "svc")
+        (tmp_path / "svc" / "api").mkdir()
+        (tmp_path / "svc" / "api" / "requirements.txt").write_text("openai==0.28.1\n")
+
+        results = parse_manifests(iter_manifests(tmp_path))
+        projects = list(group_projects(results))
+        assert [p.path.name for p in projects] == ["svc", "api"]
+        assert len(projects[0].sources) == 4
+
+
+PYPROJECT_WITH_GROUPS = """\
+[project]
+name = "myapp"
+dependencies = ["langchain==0.0.330"]
+
+[project.optional-dependencies]
+serve = ["openai==1.3.0"]
+train = ["torch==2.1.0", "transformers>=4.35"]
+all = ["myapp[serve,train]"]
+
+[dependency-groups]
+lint = ["ruff"]
+dev = [{include-group = "lint"}, "pytest"]
+
+[tool.poetry.group.gpu.dependencies]
+flash-attn = "^2.3"
+"""
+
+
+class TestGroupMatrix:
+    """Test per-group conflict checking."""
+
+    def test_parse_pyproject_groups(self, tmp_path):
+        """Test that extras, PEP 735 groups and Poetry groups are all parsed."""
+        pyproject = tmp_path / "pyproject.toml"
+        pyproject.write_text(PYPROJECT_WITH_GROUPS)
+        groups = DependencyScanner(str(tmp_path)).parse_pyproject_groups(pyproject)
+
+        assert groups["serve"] == {"openai": "==1.3.0"}
+        assert groups["all"] == {"openai": "==1.3.0", "torch": "==2.1.0", "transformers": ">=4.35"}
+        assert groups["dev"] == {"ruff": "", "pytest": ""}
+        assert groups["gpu"] == {"flash-attn": "^2.3"}
+
+    def test_matrix_matches_independent_checks(self):
+        """Test that each combination gets the same result as a fresh full check."""
+        base = {"langchain": "==0.0.330"}
+        groups = {"serve": {"openai": "==1.3.0"}, "old": {"openai": "==0.28.1"}}
+        combinations = [(), ("serve",), ("old",)]
+        matrix = ConflictChecker.check_group_matrix(base, groups, combinations)
+
+        for combination in combinations:
+            merged = dict(base)
+            for group in combination:
+                merged.update(groups[group])
+            expected = [c['id'] for c in ConflictChecker(merged).check_all()]
+            assert [c['id'] for c in matrix[combination]] == expected
+
+    def test_unaffected_rules_not_reevaluated(self, monkeypatch):
+        """Test that a group only re-evaluates rules mentioning its packages."""
+        evaluated = []
+        real_check = ConflictChecker._check_conflict
+
+        def tracking_check(self, conflict):
+            evaluated.append(conflict['id'])
+            return real_check(self, conflict)
+
+        monkeypatch.setattr(ConflictChecker, "_check_conflict", tracking_check)
+        ConflictChecker.check_group_matrix({"langchain": "==0.1.0"}, {"gpu": {"flash-attn": "==2.3.3"}}, [("gpu",)])
+
+        touching = {c['id'] for c in CONFLICTS if "flash-attn" in c['packages']}
+        assert len(evaluated) == len(CONFLICTS) + len(touching)
+
+    def test_requested_groups_match_canonically(self, tmp_path):
+        """Test that --groups names are canonicalized and unknown groups fail."""
+        from click.testing import CliRunner
+        from aidep.cli import main
+
+        (tmp_path / "pyproject.toml").write_text(
+            '[project]\nname = "myapp"\ndependencies = ["langchain==0.0.330"]\n\n'
+            '[dependency-groups]\ndev-tools = ["openai==1.3.0"]\n'
+        )
+
+        result = CliRunner().invoke(main, ["check", "--path", str(tmp_path), "--groups", "Dev_Tools", "--no-cache"])
+        assert result.exit_code == 0
+        assert "base + dev-tools" in result.output
+        assert "langchain-openai-separate-package" in result.output
+
+        result = CliRunner().invoke(main, ["check", "--path", str(tmp_path), "--groups", "gpu", "--no-cache"])
+        assert result.exit_code == 1
+        assert "Unknown group(s): gpu" in result.output
+
+
+SETUP_PY = """
+from setuptools import setup
+
+BASE = ["langchain==0.0.330", "openai>=1.0"]
+GPU = ["torch==2.1.0"]
+
+setup(
+    name="legacy",
+    install_requires=BASE + ["pydantic<2"],
+    extras_require={"gpu": GPU, "flash:sys_platform == 'linux'": ["flash-attn==2.3.3"]},
+)
+"""
+
+
+class TestSetupFiles:
+    """Test static setup.py / setup.cfg extraction."""
+
+    def test_setup_py_literals_and_names(self, tmp_path):
+        """Test that literal lists and module-level names are resolved."""
+        (tmp_path / "setup.py").write_text(SETUP_PY)
+        scanner = DependencyScanner(str(tmp_path))
+
+        assert scanner.parse_file(tmp_path / "setup.py") == {
+            "langchain": "==0.0.330", "openai": ">=1.0", "pydantic": "<2",
+        }
+        assert scanner.parse_groups(tmp_path / "setup.py") == {
+            "gpu": {"torch": "==2.1.0"}, "flash": {"flash-attn": "==2.3.3"},
+        }
+
+    def test_setup_py_is_never_executed(self):
+        """Test that dynamic values are skipped instead of evaluated."""
+        source = 'from setuptools import setup\nsetup(install_requires=open("r.txt").read().split())\n'
+        assert parse_setup_py_source(source).install_requires == []
+        assert parse_setup_py_source("setup(").install_requires == []
+
+    def test_memo_is_per_kind_and_bounded(self, tmp_path, monkeypatch):
+        """Test that identical setup.py / setup.cfg bytes parse separately and the memo stays bounded."""
+        from aidep import setupfiles
+
+        source = 'from setuptools import setup\nsetup(install_requires=["torch"])\n'
+        (tmp_path / "setup.py").write_text(source)
+        (tmp_path / "setup.cfg").write_text(source)
+        assert setupfiles.read_setup_file(tmp_path / "setup.py").install_requires == ["torch"]
+        assert setupfiles.read_setup_file(tmp_path / "setup.cfg").install_requires == []
+
+        monkeypatch.setattr(setupfiles, "SETUP_MEMO_SIZE", 2)
+        for i in range(5):
+            (tmp_path / "setup.py").write_text(source + f"# {i}\n")
+            setupfiles.read_setup_file(tmp_path / "setup.py")
+        assert len(setupfiles._DIGEST_MEMO) == 2
+
+    def test_setup_cfg(self, tmp_path):
+        """Test [options] install_requires and [options.extras_require]."""
+        (tmp_path / "setup.cfg").write_text(
+            "[metadata]\nname = legacy\n\n"
+            "[options]\ninstall_requires =\n    langchain==0.1.0\n    openai>=1.0\n\n"
+            "[options.extras_require]\ngpu =\n    torch==2.1.0\n"
+        )
+        project = Project(tmp_path)
+
+        assert project.dependencies == {"langchain": "==0.1.0", "openai": ">=1.0"}
+        assert project.scanner.parse_groups(tmp_path / "setup.cfg") == {"gpu": {"torch": "==2.1.0"}}
+
+
+def write_notebook(path, cells):
+    """Write an nbformat 4 notebook with the given cells."""
+    path.write_text(json.dumps({"cells": cells, "metadata": {}, "nbformat": 4, "nbformat_minor": 5}))
+
+
+class TestNotebooks:
+    """Test pip install extraction from Jupyter notebooks."""
+
+    def test_pip_command_forms(self):
+        """Test %pip, !pip, python -m pip and uv pip, with options that take values."""
+        install = parse_pip_commands([
+            "%pip install -q langchain==0.0.330 'openai>=1.0'",
+            "!python -m pip install --index-url https://x/simple torch==2.1.0 && echo done",
+            "!uv pip install -r requirements.txt --extra-index-url https://y peft==0.6.0",
+            "!pip install -e . ./local.whl  # editable",
+            "!pip list",
+        ])
+
+        assert install.requirements == ["langchain==0.0.330", "openai>=1.0", "torch==2.1.0", "peft==0.6.0"]
+        assert install.requirement_files == ["requirements.txt"]
+
+    def test_json_stream_skips_values(self, tmp_path):
+        """Test that skipped values (escapes, nesting, chunk boundaries) don't derail the stream."""
+        doc = {"big": ["x" * 10000, {"a": "\\\"}", "b": [1, 2.5e3, None]}], "keep": "caf\u00e9 \"ok\""}
+        path = tmp_path / "doc.json"
+        path.write_text(json.dumps(doc))
+
+        with open(path) as f:
+            stream = JSONStream(f, chunk_size=7)
+            found = {}
+            for key in stream.iter_object():
+                if key == "keep":
+                    found[key] = stream.read_value()
+                else:
+                    stream.skip_value()
+
+        assert found == {"keep": doc["keep"]}
+
+    def test_notebook_code_cells_only(self, tmp_path):
+        """Test that only code cells are read and outputs are ignored."""
+        notebook = tmp_path / "train.ipynb"
+        write_notebook(notebook, [
+            {"cell_type": "markdown", "metadata": {}, "source": ["!pip install pandas==1.0\n"]},
+            {"cell_type": "code", "metadata": {}, "execution_count": 1,
+             "outputs": [{"output_type": "display_data", "data": {"image/png": "A" * 200000}}],
+             "source": ["%pip install langchain==0.0.330 \\\n", "    openai==1.3.0\n", "import torch\n"]},
+            {"cell_type": "code", "metadata": {}, "outputs": [],
+             "source": "%%bash\npip install -r requirements.txt"},
+        ])
+        (tmp_path / "requirements.txt").write_text("torch==2.1.0\nopenai==0.28.1\n")
+
+        result = DependencyScanner(str(tmp_path)).scan_file(notebook)
+
+        assert result.dependencies == {"torch": "==2.1.0", "langchain": "==0.0.330", "openai": "==1.3.0"}
+        conflicts = ConflictChecker(result.dependencies).check_all()
+        assert [c['id'] for c in conflicts] == ['langchain-openai-separate-package']
+
+
+DOCKERFILE = """# escape=\\
+FROM python:3.11-slim
+COPY requirements.txt /app/requirements.txt
+RUN pip install --no-cache-dir \\
+    --index-url https://download.pytorch.org/whl/cu121 \\
+    # pinned for the CUDA 12.1 base image
+    torch==2.1.0 \\
+ && pip install -r /app/requirements.txt
+RUN ["pip", "install", "langchain==0.0.330"]
+ENV PIP_NO_CACHE_DIR=1
+CMD ["pip", "install", "never-run==1.0"]
+"""
+
+
+class TestDockerfiles:
+    """Test pip install extraction from Dockerfiles and shell scripts."""
+
+    def test_dockerfile_run_lines(self, tmp_path):
+        """Test continuations, comments, exec form and in-image -r paths."""
+        (tmp_path / "Dockerfile").write_text(DOCKERFILE)
+        (tmp_path / "requirements.txt").write_text("openai==1.3.0\n")
+
+        result = DependencyScanner(str(tmp_path)).scan_file(tmp_path / "Dockerfile")
+
+        assert result.dependencies == {"openai": "==1.3.0", "torch": "==2.1.0", "langchain": "==0.0.330"}
+        assert [c['id'] for c in ConflictChecker(result.dependencies).check_all()] == ['langchain-openai-separate-package']
+
+    def test_shell_script(self, tmp_path):
+        """Test that bootstrap scripts are discovered and parsed."""
+        script = tmp_path / "bootstrap.sh"
+        script.write_text(
+            "#!/bin/sh\nset -e\n"
+            "python3 -m pip install \\\n  'pydantic>=2' transformers==4.35.0; echo ok\n"
+            "uv pip install -c constraints.txt peft\n"
+        )
+        (tmp_path / "constraints.txt").write_text("peft==0.6.0\n")
+
+        assert list(iter_manifests(tmp_path)) == [script]
+        result = DependencyScanner(str(tmp_path)).scan_file(script)
+
+        assert result.dependencies == {"pydantic": ">=2", "transformers": "==4.35.0", "peft": ""}
+        assert result.constraints == {"peft": "==0.6.0"}
+
+
+ENVIRONMENT_YML = """name: train
+channels:
+  - pytorch
+  - nvidia
+dependencies:
+  - python=3.11
+  - pytorch::pytorch=2.1.0
+  - torchvision 0.16.0 py311_cu121
+  - pytorch-cuda=12.1
+  - cudnn>=8.9  # from nvidia
+  - pip
+  - pip:
+    - langchain==0.0.330
+    - --extra-index-url https://example.com/simple
+    - -r requirements.txt
+variables:
+  - not-a-package
+"""
+
+
+class TestConda:
+    """Test conda environment.yml and conda-meta ingestion."""
+
+    def test_conda_specs(self):
+        """Test conda match spec forms and the pytorch name / CUDA build mapping."""
+        assert parse_conda_spec("pytorch=2.1.0=py3.11_cuda12.1_cudnn8.9.2_0") == ("torch", "==2.1.0+cu121")
+        assert parse_conda_spec("conda-forge::numpy>=1.24,<2") == ("numpy", ">=1.24,<2")
+        assert parse_conda_spec("transformers 4.35.0 pyhd8ed1ab_0") == ("transformers", "==4.35.0")
+        assert parse_conda_spec("cudatoolkit") == ("cudatoolkit", "")
+        assert parse_conda_spec("pytorch=2.1") == ("torch", "==2.1.*")
+        assert parse_conda_spec("numpy >=1.2, <2") == ("numpy", ">=1.2,<2")
+
+    def test_environment_yml(self, tmp_path):
+        """Test conda deps, pytorch-cuda and the pip: subsection (with -r)."""
+        (tmp_path / "environment.yml").write_text(ENVIRONMENT_YML)
+        (tmp_path / "requirements.txt").write_text("openai==1.3.0\n")
+
+        assert list(iter_manifests(tmp_path)) == [tmp_path / "environment.yml", tmp_path / "requirements.txt"]
+        result = DependencyScanner(str(tmp_path)).scan_file(tmp_path / "environment.yml")
+
+        assert result.dependencies == {
+            "torch": "==2.1.0+cu121", "torchvision": "==0.16.0+cu121", "cudnn": ">=8.9", "pip": "",
+            "openai": "==1.3.0", "langchain": "==0.0.330",
+        }
+
+    def test_conda_meta(self, tmp_path):
+        """Test reading an installed env from conda-meta names and pip dist-info dirs."""
+        (tmp_path / "conda-meta").mkdir()
+        for record in ("pytorch-2.1.0-py3.11_cuda12.1_cudnn8.9.2_0.json", "python-3.11.5-h955ad1f_0.json", "history"):
+            (tmp_path / "conda-meta" / record).write_text("{}")
+        site_packages = tmp_path / "lib" / "python3.11" / "site-packages"
+        (site_packages / "langchain-0.0.330.dist-info").mkdir(parents=True)
+        (site_packages / "torch-2.1.0.dist-info").mkdir()
+
+        assert read_conda_meta(tmp_path) == {"torch": "==2.1.0+cu121", "python": "==3.11.5", "langchain": "==0.0.330"}
+
+    def test_conda_meta_variant_selectors(self, tmp_path):
+        """Test that pytorch-cuda / pytorch-mutex are dropped and pytorch-cuda tags an untagged torch build."""
+        (tmp_path / "conda-meta").mkdir()
+        for record in ("pytorch-2.1.0-py3.11_0.json", "torchvision-0.16.0-py311_cu118.json",
+                       "pytorch-cuda-12.1-ha16c6d3_5.json", "pytorch-mutex-1.0-cuda.json"):
+            (tmp_path / "conda-meta" / record).write_text("{}")
+
+        assert read_conda_meta(tmp_path) == {"torch": "==2.1.0+cu121", "torchvision": "==0.16.0+cu118"}
+
+
+class TestStdinValidation:
+    """Test streaming requirement lines from stdin."""
+
+    def test_scan_lines_streams(self):
+        """Test that lines are consumed lazily and only AI frameworks are kept."""
+        def freeze():
+            yield "langchain==0.0.330\n"
+            for i in range(10000):
+                yield f"filler-package-{i}==1.0.{i}\n"
+            yield "openai==1.3.0\n"
+            yield "-e git+https://example.com/repo.git#egg=local\n"
+
+        result = DependencyScanner().scan_lines(freeze())
+
+        assert result.dependencies == {"langchain": "==0.0.330", "openai": "==1.3.0"}
+
+    def test_validate_dash_reads_stdin(self):
+        """Test that `validate -` checks stdin and fails on conflicts."""
+        from click.testing import CliRunner
+        from aidep.cli import main
+
+        result = CliRunner().invoke(main, ["validate", "-", "--json", "--no-cache"],
+                                    input="langchain==0.0.330\nopenai==1.3.0\n")
+
+        assert result.exit_code == 1
+        assert json.loads(result.output)["conflicts"][0]["id"] == "langchain-openai-separate-package"
+
+    def test_validate_dash_without_ai_frameworks(self):
+        """Test that a freeze with no AI frameworks isn't reported as empty."""
+        from click.testing import CliRunner
+        from aidep.cli import main
+
+        freeze = "".join(f"filler-package-{i}==1.0.{i}\n" for i in range(300))
+        result = CliRunner().invoke(main, ["validate", "-", "--json", "--no-cache"], input=freeze)
+        assert result.exit_code == 0
+        assert json.loads(result.output)["message"] == "No AI framework dependencies found"
+
+        result = CliRunner().invoke(main, ["validate", "-", "--no-cache"], input=freeze)
+        assert "No AI framework dependencies found" in result.output
+        assert "No dependencies found" not in result.output
+
+        result = CliRunner().invoke(main, ["validate", "-", "--json", "--no-cache"], input="# empty\n")
+        assert json.loads(result.output)["message"] == "No dependencies found"
+
+
+class TestBatchMode:
+    """Test checking many dependency sets with one warm checker."""
+
+    def test_warm_checker_matches_fresh_checks(self, monkeypatch):
+        """Test that check() agrees with check_all() and reuses decided rules."""
+        sets = [
+            {"langchain": "==0.0.330", "openai": "==1.3.0"},
+            {"torch": "==2.1.0", "transformers": "==4.35.0"},
+            {"langchain": "==0.0.330", "openai": "==1.3.0"},
+        ]
+        expected = [[c['id'] for c in ConflictChecker(deps).check_all()] for deps in sets]
+
+        evaluated = []
+        real_evaluate = ConflictChecker._evaluate_conflict
+        monkeypatch.setattr(ConflictChecker, "_evaluate_conflict",
+                            lambda self, conflict: evaluated.append(conflict['id']) or real_evaluate(self, conflict))
+
+        checker = ConflictChecker({})
+        results = [[c['id'] for c in checker.check(deps)] for deps in sets]
+        first_two = len(evaluated)
+        assert results == expected
+        assert checker.check(sets[0]) and len(evaluated) == first_two
+
+    def test_batch_command(self, tmp_path):
+        """Test one NDJSON result line per input line, including bad input."""
+        from click.testing import CliRunner
+        from aidep.cli import main
+
+        lines = [
+            json.dumps({"id": "svc-a", "dependencies": {"LangChain": "==0.0.330", "openai": "==1.3.0"}}),
+            json.dumps({"id": "svc-b", "dependencies": ["torch==2.1.0"]}),
+            "{broken",
+            json.dumps({"id": "svc-c", "dependencies": {"torch": 2}}),
+            json.dumps({"id": "svc-d", "dependencies": {"torch": {"version": "==2.1.0"}}}),
+            json.dumps({"id": "svc-e", "dependencies": {"torch": "==2.1.0"}}),
+        ]
+        result = CliRunner().invoke(main, ["batch", "-"], input="\n".join(lines) + "\n")
+        output = [json.loads(line) for line in result.output.splitlines()]
+
+        assert result.exit_code == 1
+        assert [(o["id"], o.get("valid")) for o in output] == [
+            ("svc-a", False), ("svc-b", True), (None, None), ("svc-c", None), ("svc-d", None), ("svc-e", True),
+        ]
+        assert output[2]["line"] == 3 and "error" in output[2]
+        assert output[3]["line"] == 4 and "must be a string" in output[3]["error"]
+
+
+class TestSbom:
+    """Test CycloneDX / SPDX SBOM ingestion."""
+
+    def test_cyclonedx(self, tmp_path):
+        """Test pkg:pypi components (nested too) are kept and everything else skipped."""
+        sbom = tmp_path / "image.cdx.json"
+        sbom.write_text(json.dumps({
+            "bomFormat": "CycloneDX",
+            "metadata": {"component": {"purl": "pkg:pypi/not-a-dependency@0.1"}},
+            "components": [
+                {"type": "library", "name": "LangChain", "version": "0.0.330", "purl": "pkg:pypi/LangChain@0.0.330"},
+                {"type": "library", "name": "lodash", "purl": "pkg:npm/lodash@4.17.21"},
+                {"type": "file", "name": "/usr/lib/x.so", "hashes": [{"content": "ab" * 5000}]},
+                {"type": "application", "name": "app", "components": [
+                    {"type": "library", "version": "1.3.0", "purl": "pkg:pypi/openai"},
+                ]},
+            ],
+        }))
+
+        result = DependencyScanner(str(tmp_path)).scan_file(sbom)
+
+        assert result.dependencies == {"langchain": "==0.0.330", "openai": "==1.3.0"}
+
+    def test_spdx(self, tmp_path):
+        """Test SPDX packages with purls in externalRefs."""
+        sbom = tmp_path / "image.spdx.json"
+        sbom.write_text(json.dumps({
+            "spdxVersion": "SPDX-2.3",
+            "files": [{"fileName": f"/f{i}", "checksums": []} for i in range(100)],
+            "packages": [
+                {"name": "flash-attn", "versionInfo": "2.3.3", "externalRefs": [
+                    {"referenceCategory": "PACKAGE-MANAGER", "referenceType": "purl",
+                     "referenceLocator": "pkg:pypi/flash_attn@2.3.3"},
+                ]},
+                {"name": "musl", "versionInfo": "1.2", "externalRefs": [
+                    {"referenceType": "purl", "referenceLocator": "pkg:apk/alpine/musl@1.2"},
+                ]},
+            ],
+        }))
+
+        assert DependencyScanner(str(tmp_path)).parse_sbom(sbom) == {"flash-attn": "==2.3.3"}
+
+    def test_read_raw_across_chunks(self, tmp_path):
+        """Test that raw element text survives buffer refills mid-element."""
+        elements = [{"purl": "pkg:pypi/a@1", "s": "x\\\"y" * 7}, [1, {"b": None}], "z" * 23]
+        path = tmp_path / "array.json"
+        path.write_text(json.dumps(elements))
+
+        with open(path) as f:
+            stream = JSONStream(f, chunk_size=5)
+            raws = [stream.read_raw() for _ in stream.iter_array()]
+
+        assert [json.loads(raw) for raw in raws] == elements
+
+
+PIP_REPORT = {
+    "version": "1",
+    "install": [
+        {"requested": True, "metadata": {"name": "MyAgent", "version": "1.0", "description": "x" * 5000,
+                                         "requires_dist": ["langchain==0.0.330", "openai>=1", "rich; extra == 'cli'"]}},
+        {"requested": True, "metadata": {"name": "tools", "version": "2.0", "requires_dist": ["openai"]}},
+        {"requested": False, "metadata": {"name": "langchain", "version": "0.0.330", "requires_dist": ["pydantic<3"]}},
+        {"requested": False, "metadata": {"name": "openai", "version": "1.3.0"}},
+    ],
+    "environment": {"python_version": "3.11"},
+}
+
+
+class TestPipReport:
+    """Test pip --report ingestion and the reverse-dependency graph."""
+
+    def test_report_versions_and_edges(self, tmp_path):
+        """Test exact versions, requested roots and edges to installed distributions only."""
+        path = tmp_path / "report.json"
+        path.write_text(json.dumps(PIP_REPORT))
+        report = parse_pip_report(path)
+
+        assert report.dependencies == {"myagent": "==1.0", "tools": "==2.0", "langchain": "==0.0.330", "openai": "==1.3.0"}
+        assert report.graph.roots == {"myagent", "tools"}
+        assert report.graph.parents("openai") == {"myagent", "tools"}
+        assert "rich" not in report.graph
+
+    def test_introduced_by(self):
+        """Test transitive root lookup through reverse edges, cycles included."""
+        graph = DependencyGraph()
+        graph.add_root("app")
+        graph.add_edge("app", "langchain")
+        graph.add_edge("langchain", "pydantic")
+        graph.add_edge("pydantic", "langchain")
+
+        assert graph.introduced_by("pydantic") == ["app"]
+        assert graph.introduced_by("app") == ["app"]
+        assert graph.introduced_by("unknown") == []
+
+    def test_checker_reports_introduced_by(self, tmp_path):
+        """Test that conflicts name the top-level requirements behind each package."""
+        path = tmp_path / "report.json"
+        path.write_text(json.dumps(PIP_REPORT))
+        report = parse_pip_report(path)
+
+        conflicts = ConflictChecker(report.dependencies, graph=report.graph).check_all()
+
+        assert conflicts[0]['introduced_by'] == {"langchain": ["myagent"], "openai": ["myagent", "tools"]}
+
+    def test_malformed_report_fails_cleanly(self, tmp_path):
+        """Test that unparsable or truncated reports exit 1 with a message instead of a traceback."""
+        from click.testing import CliRunner
+        from aidep.cli import main
+
+        truncated = tmp_path / "report.json"
+        truncated.write_text(json.dumps(PIP_REPORT)[:40])
+        for args, stdin in ((["--pip-report", "-"], "not json\n"), (["--pip-report", str(truncated)], None)):
+            result = CliRunner().invoke(main, ["check", "--no-cache", *args], input=stdin)
+            assert result.exit_code == 1
+            assert result.exception is None or isinstance(result.exception, SystemExit)
+            assert "Unreadable pip report" in result.output
+
+
+COMPILED_REQUIREMENTS = """#
+# This file is autogenerated by pip-compile with Python 3.11
+#    pip-compile requirements.in
+#
+fastapi==0.95.2
+    # via myapp (pyproject.toml)
+langchain==0.0.330
+    # via -r requirements.in
+openai==1.3.0
+    # via langchain
+pydantic==2.5.0
+    # via
+    #   fastapi
+    #   langchain
+sqlalchemy==2.0.23  # via langchain
+"""
+
+
+class TestViaAnnotations:
+    """Test the reverse-dependency graph built from "# via" comments."""
+
+    def test_via_block_and_line_styles(self, tmp_path):
+        """Test both annotation styles are read in the same parse pass."""
+        path = tmp_path / "requirements.txt"
+        path.write_text(COMPILED_REQUIREMENTS)
+        resolved = IncludeResolver().resolve(path)
+
+        assert resolved.dependencies["pydantic"] == "==2.5.0"
+        assert resolved.via == {
+            "fastapi": ("myapp (pyproject.toml)",),
+            "langchain": ("-r requirements.in",),
+            "openai": ("langchain",),
+            "pydantic": ("fastapi", "langchain"),
+            "sqlalchemy": ("langchain",),
+        }
+
+    def test_project_graph_names_top_level_requirement(self, tmp_path):
+        """Test that conflicts say which top-level requirement dragged a package in."""
+        (tmp_path / "requirements.txt").write_text(COMPILED_REQUIREMENTS)
+        project = Project(tmp_path)
+
+        assert project.graph.introduced_by("pydantic") == ["fastapi", "langchain"]
+        conflicts = ConflictChecker(project.dependencies, graph=project.graph).check_all()
+        assert conflicts[0]['introduced_by'] == {"langchain": ["langchain"], "openai": ["langchain"]}
+
+    def test_via_survives_parse_cache(self, tmp_path):
+        """Test that cached scans keep the annotations."""
+        (tmp_path / "requirements.txt").write_text(COMPILED_REQUIREMENTS)
+        cache = ParseCache(tmp_path / "cache")
+        DependencyScanner(str(tmp_path), cache=cache).scan_file(tmp_path / "requirements.txt")
+
+        cached = DependencyScanner(str(tmp_path), cache=cache).scan_file(tmp_path / "requirements.txt")
+
+        assert cached.via["pydantic"] == ["fastapi", "langchain"]
+
+
+def write_wheel(directory, name, version, requires=(), payload=b""):
+    """Write a minimal wheel with a METADATA file and an optional payload."""
+    import zipfile
+    path = directory / f"{name}-{version}-py3-none-any.whl"
+    metadata = f"Metadata-Version: 2.1\nName: {name}\nVersion: {version}\n"
+    metadata += "".join(f"Requires-Dist: {req}\n" for req in requires)
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr(f"{name}/__init__.py", payload)
+        archive.writestr(f"{name}-{version}.dist-info/METADATA", metadata + "\nLong description\n")
+    return path
+
+
+class TestWheelhouse:
+    """Test wheelhouse scanning from wheel METADATA."""
+
+    def test_read_wheel_metadata(self, tmp_path):
+        """Test name, version and Requires-Dist come from the dist-info METADATA."""
+        path = write_wheel(tmp_path, "LangChain", "0.0.330", ["openai>=1.0", 'pytest; extra == "test"'])
+        meta = read_wheel_metadata(path)
+
+        assert meta.name == "langchain"
+        assert meta.version == "0.0.330"
+        assert meta.requires_dist == ["openai>=1.0", 'pytest; extra == "test"']
+        assert read_wheel_metadata(tmp_path / "missing.whl") is None
+
+    def test_newest_version_and_graph(self, tmp_path):
+        """Test duplicates keep the newest version and unrequired packages become roots."""
+        write_wheel(tmp_path, "langchain", "0.0.330", ["openai>=1.0"])
+        write_wheel(tmp_path, "openai", "0.28.0")
+        write_wheel(tmp_path, "openai", "1.3.0")
+        write_wheel(tmp_path, "rich", "13.0.0")
+
+        dependencies, graph = scan_wheelhouse(tmp_path)
+
+        assert dependencies == {"langchain": "==0.0.330", "openai": "==1.3.0", "rich": "==13.0.0"}
+        assert graph.roots == {"langchain", "rich"}
+        assert graph.introduced_by("openai") == ["langchain"]
+
+    def test_parallel_matches_serial(self, tmp_path):
+        """Test that --jobs reads the same inventory in worker processes."""
+        for index in range(6):
+            write_wheel(tmp_path, f"pkg{index}", "1.0")
+
+        parallel, parallel_graph = scan_wheelhouse(tmp_path, jobs=2)
+        serial, serial_graph = scan_wheelhouse(tmp_path, jobs=1)
+
+        assert parallel == serial
+        assert parallel_graph.roots == serial_graph.roots == set(serial)
+
+    def test_check_wheelhouse_cli(self, tmp_path):
+        """Test that conflicts are reported for the wheelhouse contents."""
+        from click.testing import CliRunner
+        from aidep.cli import main
+
+        write_wheel(tmp_path, "langchain", "0.0.330", ["openai>=1.0"])
+        write_wheel(tmp_path, "openai", "1.3.0")
+        result = CliRunner().invoke(main, ["check", "--wheelhouse", str(tmp_path), "--no-cache"])
+
+        assert "Read metadata of 2 distributions" in result.output
+        assert "langchain-openai-separate-package" in result.output
+
+
+def write_sdist(directory, name, version, pkg_info_requires=(), requires_txt=None, payload_files=0):
+    """Write a setuptools-style .tar.gz sdist; requires.txt is placed after the payload."""
+    import io
+    import tarfile
+    path = directory / f"{name}-{version}.tar.gz"
+    base = f"{name}-{version}"
+    pkg_info = f"Metadata-Version: 2.1\nName: {name}\nVersion: {version}\n"
+    pkg_info += "".join(f"Requires-Dist: {req}\n" for req in pkg_info_requires)
+    members = [(f"{base}/PKG-INFO", pkg_info)]
+    members += [(f"{base}/{name}/module{index}.py", "x = 1\n" * 100) for index in range(payload_files)]
+    if requires_txt is not None:
+        members.append((f"{base}/{name}.egg-info/requires.txt", requires_txt))
+    with tarfile.open(path, "w:gz") as archive:
+        for member_name, text in members:
+            data = text.encode()
+            info = tarfile.TarInfo(member_name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    return path
+
+
+class TestSdists:
+    """Test sdist metadata read while streaming the archive."""
+
+    def test_requires_txt_sections(self):
+        """Test that [extra] and [:marker] sections become Requires-Dist markers."""
+        text = "openai>=1.0\n\n[:python_version < \"3.9\"]\ntyping-extensions\n\n[test]\npytest\n"
+
+        assert parse_requires_txt(text) == [
+            "openai>=1.0",
+            'typing-extensions; python_version < "3.9"',
+            'pytest; extra == "test"',
+        ]
+
+    def test_pkg_info_requires_stop_the_stream(self, tmp_path, monkeypatch):
+        """Test that a PKG-INFO with Requires-Dist ends the read before any other member."""
+        import tarfile
+        path = write_sdist(tmp_path, "myagent", "1.0", ["langchain==0.0.330"], payload_files=50)
+        seen = []
+        original = tarfile.TarFile.next
+
+        def recording_next(self):
+            member = original(self)
+            if member is not None:
+                seen.append(member.name)
+            return member
+
+        monkeypatch.setattr(tarfile.TarFile, "next", recording_next)
+        meta = read_distribution(path)
+
+        assert meta.requires_dist == ["langchain==0.0.330"]
+        assert set(seen) == {"myagent-1.0/PKG-INFO"}
+
+    def test_legacy_sdist_falls_back_to_requires_txt(self, tmp_path):
+        """Test an sdist whose PKG-INFO lacks Requires-Dist reads egg-info requires.txt."""
+        path = write_sdist(tmp_path, "myagent", "1.0", requires_txt="langchain==0.0.330\n[openai]\nopenai>=1.0\n",
+                           payload_files=3)
+        scanner = DependencyScanner(str(tmp_path))
+
+        assert read_distribution(path).requires_dist == ["langchain==0.0.330", 'openai>=1.0; extra == "openai"']
+        assert scanner.scan_file(path).dependencies == {"langchain": "==0.0.330"}
+
+    def test_zip_sdist_in_wheelhouse(self, tmp_path):
+        """Test that .zip sdists join wheels in the wheelhouse inventory."""
+        import zipfile
+        with zipfile.ZipFile(tmp_path / "internal-2.0.zip", "w") as archive:
+            archive.writestr("internal-2.0/setup.py", "")
+            archive.writestr("internal-2.0/PKG-INFO", "Metadata-Version: 2.1\nName: internal\nVersion: 2.0\n"
+                                                      "Requires-Dist: openai\n")
+        write_wheel(tmp_path, "openai", "1.3.0")
+
+        dependencies, graph = scan_wheelhouse(tmp_path)
+
+        assert dependencies == {"internal": "==2.0", "openai": "==1.3.0"}
+        assert graph.introduced_by("openai") == ["internal"]
+
+
+def metadata_text(name, version, requires=()):
+    return f"Name: {name}\nVersion: {version}\n" + "".join(f"Requires-Dist: {req}\n" for req in requires)
+
+
+def layer_bytes(files, compress=False):
+    """Build a layer tar from {path: text}; None marks a whiteout-style empty file."""
+    import gzip
+    import io
+    import tarfile
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w") as layer:
+        for path, text in files.items():
+            data = (text or "").encode()
+            info = tarfile.TarInfo(path)
+            info.size = len(data)
+            layer.addfile(info, io.BytesIO(data))
+    return gzip.compress(buffer.getvalue()) if compress else buffer.getvalue()
+
+
+def write_image(path, layers, oci=False):
+    """Write a docker save (or OCI layout) tarball from layer byte strings, bottom first."""
+    import hashlib
+    import io
+    import tarfile
+    members = {}
+    if oci:
+        digests = []
+        for data in layers:
+            digest = hashlib.sha256(data).hexdigest()
+            members[f"blobs/sha256/{digest}"] = data
+            digests.append({"digest": f"sha256:{digest}"})
+        manifest = json.dumps({"layers": digests}).encode()
+        manifest_digest = hashlib.sha256(manifest).hexdigest()
+        members[f"blobs/sha256/{manifest_digest}"] = manifest
+        members["index.json"] = json.dumps({"manifests": [{"digest": f"sha256:{manifest_digest}"}]}).encode()
+    else:
+        names = [f"layer{index}/layer.tar" for index in range(len(layers))]
+        members.update(zip(names, layers))
+        members["manifest.json"] = json.dumps([{"Config": "config.json", "Layers": names}]).encode()
+    with tarfile.open(path, "w") as image:
+        for name, data in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            image.addfile(info, io.BytesIO(data))
+    return path
+
+
+SITE = "usr/lib/python3.11/site-packages"
+
+
+class TestImageTarballs:
+    """Test container image inventory from streamed layers."""
+
+    def test_layers_stack_with_whiteouts(self, tmp_path):
+        """Test upgrades, file whiteouts and opaque directories across layers."""
+        base = layer_bytes({
+            f"{SITE}/openai-0.28.0.dist-info/METADATA": metadata_text("openai", "0.28.0"),
+            f"{SITE}/rich-13.0.0.dist-info/METADATA": metadata_text("rich", "13.0.0"),
+            "opt/venv/lib/python3.11/site-packages/old-1.0.dist-info/METADATA": metadata_text("old", "1.0"),
+        }, compress=True)
+        upgrade = layer_bytes({
+            f"{SITE}/.wh.openai-0.28.0.dist-info": None,
+            f"{SITE}/openai-1.3.0.dist-info/METADATA": metadata_text("openai", "1.3.0"),
+            f"{SITE}/langchain-0.0.330.dist-info/METADATA": metadata_text("langchain", "0.0.330", ["openai>=1.0"]),
+            "opt/venv/.wh..wh..opq": None,
+        })
+        image = write_image(tmp_path / "image.tar", [base, upgrade])
+
+        dependencies, graph = scan_image(image)
+
+        assert dependencies == {"openai": "==1.3.0", "rich": "==13.0.0", "langchain": "==0.0.330"}
+        assert graph.introduced_by("openai") == ["langchain"]
+
+    def test_oci_layout(self, tmp_path):
+        """Test that OCI index.json images are read through their manifest blob."""
+        layer = layer_bytes({f"{SITE}/torch-2.1.0.dist-info/METADATA": metadata_text("torch", "2.1.0")}, compress=True)
+        image = write_image(tmp_path / "image.tar", [layer], oci=True)
+
+        assert scan_image(image)[0] == {"torch": "==2.1.0"}
+
+    def test_check_image_tar_cli(self, tmp_path):
+        """Test the CLI reports conflicts inside the image and rejects non-images."""
+        from click.testing import CliRunner
+        from aidep.cli import main
+
+        layer = layer_bytes({
+            f"{SITE}/openai-1.3.0.dist-info/METADATA": metadata_text("openai", "1.3.0"),
+            f"{SITE}/langchain-0.0.330.dist-info/METADATA": metadata_text("langchain", "0.0.330"),
+        })
+        image = write_image(tmp_path / "image.tar", [layer])
+        result = CliRunner().invoke(main, ["check", "--image-tar", str(image), "--no-cache"])
+
+        assert "Found 2 installed distributions" in result.output
+        assert "langchain-openai-separate-package" in result.output
+
+        bogus = tmp_path / "bogus.tar"
+        bogus.write_bytes(layer)
+        result = CliRunner().invoke(main, ["check", "--image-tar", str(bogus), "--no-cache"])
+        assert result.exit_code == 1
+        assert "Not a docker save / OCI image tarball" in result.output
+
+
+def git(repo, *args):
+    """Run git in a test repository with a fixed identity."""
+    import subprocess
+    subprocess.run(["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+                   cwd=repo, check=True, capture_output=True)
+
+
+@pytest.fixture
+def monorepo(tmp_path):
+    """A committed monorepo: two services sharing a constraints file, one standalone service."""
+    (tmp_path / "shared").mkdir()
+    (tmp_path / "shared" / "ai.in").write_text("langchain==0.0.330\n")
+    for service in ("api", "worker", "billing"):
+        (tmp_path / service).mkdir()
+    (tmp_path / "api" / "requirements.txt").write_text("-r ../shared/ai.in\nfastapi\n")
+    (tmp_path / "worker" / "requirements.txt").write_text("-r ../api/requirements.txt\n")
+    (tmp_path / "billing" / "requirements.txt").write_text("stripe\n")
+    git(tmp_path, "init", "-q")
+    git(tmp_path, "add", ".")
+    git(tmp_path, "commit", "-q", "-m", "base")
+    return tmp_path
+
+
+class TestChangedSince:
+    """Test the git-driven changed-projects scan."""
+
+    def test_changed_and_untracked_files(self, monorepo):
+        """Test that committed, unstaged and untracked changes are all reported."""
+        (monorepo / "billing" / "requirements.txt").write_text("stripe\nopenai\n")
+        (monorepo / "billing" / "notes.md").write_text("new\n")
+
+        changed = changed_files(monorepo, "HEAD")
+
+        assert changed == {(monorepo / "billing" / "requirements.txt").resolve(),
+                           (monorepo / "billing" / "notes.md").resolve()}
+
+    def test_include_chain_reaches_projects(self, monorepo):
+        """Test that a changed shared include selects every project including it, transitively."""
+        (monorepo / "shared" / "ai.in").write_text("langchain==0.0.330\nopenai==1.3.0\n")
+        scanner = DependencyScanner(str(monorepo))
+
+        manifests = affected_manifests(scanner, changed_files(monorepo, "HEAD"))
+
+        assert [path.parent.name for path in manifests] == ["api", "worker"]
+
+    def test_no_changes_selects_nothing(self, monorepo):
+        """Test that a clean tree re-checks nothing."""
+        assert affected_manifests(DependencyScanner(str(monorepo)), changed_files(monorepo, "HEAD")) == []
+
+    def test_check_changed_since_cli(self, monorepo):
+        """Test that only the affected project is checked and bad revisions fail."""
+        from click.testing import CliRunner
+        from aidep.cli import main
+
+        (monorepo / "billing" / "requirements.txt").write_text("langchain==0.0.330\nopenai==1.3.0\n")
+        result = CliRunner().invoke(main, ["check", "--path", str(monorepo), "--changed-since", "HEAD", "--no-cache"])
+
+        assert "billing" in result.output
+        assert "api" not in result.output
+        assert "1 project(s)" in result.output
+
+        result = CliRunner().invoke(main, ["check", "--path", str(monorepo), "--changed-since", "no-such-rev", "--no-cache"])
+        assert result.exit_code == 1
+
+    def test_git_grep_failures_are_not_no_matches(self, monorepo, monkeypatch):
+        """Test that only git grep's exit status 1 means no matches; other failures reach the CLI."""
+        import subprocess
+        from click.testing import CliRunner
+        from aidep import changes
+        from aidep.cli import main
+
+        assert changes._files_mentioning(monorepo, {"nothing-includes-this.in"}) == set()
+
+        real_run = subprocess.run
+
+        def failing_grep(args, **kwargs):
+            if 'grep' in args:
+                return subprocess.CompletedProcess(args, 128, b"", b"fatal: grep broke")
+            return real_run(args, **kwargs)
+
+        monkeypatch.setattr(changes.subprocess, "run", failing_grep)
+        (monorepo / "shared" / "ai.in").write_text("langchain==0.0.330\nopenai==1.3.0\n")
+
+        with pytest.raises(ValueError, match="grep broke"):
+            affected_manifests(DependencyScanner(str(monorepo)), changed_files(monorepo, "HEAD"))
+
+        result = CliRunner().invoke(main, ["check", "--path", str(monorepo), "--changed-since", "HEAD", "--no-cache"])
+        assert result.exit_code == 1
+        assert "grep broke" in result.output
+
+
+def commit_files(repo, message, files):
+    """Write (or delete, for None) files and commit them."""
+    for name, text in files.items():
+        path = repo / name
+        if text is None:
+            path.unlink()
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(text)
+    git(repo, "add", "-A")
+    git(repo, "commit", "-q", "--allow-empty", "-m", message)
+
+
+class TestHistory:
+    """Test the git history audit."""
+
+    @pytest.fixture
+    def history_repo(self, tmp_path):
+        git(tmp_path, "init", "-q")
+        commit_files(tmp_path, "start api", {"api/requirements.txt": "-r ../shared/ai.in\nfastapi\n",
+                                             "shared/ai.in": "langchain==0.0.330\n"})
+        commit_files(tmp_path, "docs only", {"README.md": "hello\n"})
+        commit_files(tmp_path, "add openai", {"shared/ai.in": "langchain==0.0.330\nopenai==1.3.0\n"})
+        commit_files(tmp_path, "add bot", {"bot/pyproject.toml": '[project]\nname = "bot"\n'
+                                           'dependencies = ["langchain==0.0.330", "openai==1.3.0"]\n'})
+        commit_files(tmp_path, "drop openai", {"shared/ai.in": "langchain==0.0.330\n"})
+        return tmp_path
+
+    def test_only_manifest_commits_are_replayed(self, history_repo):
+        """Test that commits touching no manifest never reach the audit."""
+        subjects = [commit.subject for commit, _ in iter_manifest_commits(history_repo)]
+
+        assert subjects == ["start api", "add openai", "add bot", "drop openai"]
+
+    def test_conflict_spans_follow_includes(self, history_repo):
+        """Test introduction and fix through a shared include, and a still-open span."""
+        spans = HistoryAudit(history_repo).run()
+
+        summary = [(span.project.as_posix(), span.conflict['id'], span.introduced.subject,
+                    span.fixed.subject if span.fixed else None) for span in spans]
+        assert summary == [
+            ("api", "langchain-openai-separate-package", "add openai", "drop openai"),
+            ("bot", "langchain-openai-separate-package", "add bot", None),
+        ]
+
+    def test_dockerfile_includes_follow_history(self, tmp_path):
+        """Test that a Dockerfile's pip install -r target is read from history and re-checked on edits."""
+        git(tmp_path, "init", "-q")
+        commit_files(tmp_path, "add image", {"svc/Dockerfile": "FROM python:3.11\nRUN pip install -r ml.txt\n",
+                                             "svc/ml.txt": "langchain==0.0.330\n"})
+        commit_files(tmp_path, "add openai", {"svc/ml.txt": "langchain==0.0.330\nopenai>=1.0.0\n"})
+        commit_files(tmp_path, "drop openai", {"svc/ml.txt": "langchain==0.0.330\n"})
+
+        spans = HistoryAudit(tmp_path).run()
+
+        assert [(span.project.as_posix(), span.conflict['id'], span.introduced.subject, span.fixed.subject)
+                for span in spans] == [("svc", "langchain-openai-separate-package", "add openai", "drop openai")]
+
+    def test_blob_reader_batches_one_process(self, history_repo):
+        """Test that blobs are read by sha through the long-lived cat-file process."""
+        import subprocess
+        sha = subprocess.run(["git", "rev-parse", "HEAD:shared/ai.in"], cwd=history_repo,
+                             capture_output=True, text=True, check=True).stdout.strip()
+
+        with BlobReader(history_repo) as blobs:
+            assert blobs.read(sha) == b"langchain==0.0.330\n"
+            assert blobs.read("0" * 40) == b""
+            assert blobs.read(sha) == b"langchain==0.0.330\n"
+
+    def test_history_cli_json(self, history_repo):
+        """Test the JSON output of aidep history, scoped to a subdirectory."""
+        from click.testing import CliRunner
+        from aidep.cli import main
+
+        result = CliRunner().invoke(main, ["history", "--path", str(history_repo / "bot"), "--json"])
+
+        spans = json.loads(result.output)
+        assert [(span["project"], span["fixed"]) for span in spans] == [("bot", None)]
+        assert spans[0]["introduced"]["subject"] == "add bot"
+
+
+class TestWatchMode:
+    """Test incremental re-checks for check --watch."""
+
+    def test_update_reevaluates_only_affected_rules(self, monkeypatch):
+        """Test that a spec change re-evaluates only the rules mentioning that package."""
+        checker = ConflictChecker({})
+        checker.update({"langchain": "==0.0.330", "openai": "==1.3.0"})
+        evaluated = []
+        original = ConflictChecker._check_conflict
+        monkeypatch.setattr(ConflictChecker, "_check_conflict",
+                            lambda self, conflict: evaluated.append(conflict['id']) or original(self, conflict))
+
+        conflicts = checker.update({"langchain": "==0.0.330", "openai": "==1.3.0", "rich": "==13.0.0"})
+        assert evaluated == []
+        assert [c['id'] for c in conflicts] == ["langchain-openai-separate-package"]
+
+        checker.update({"langchain": "==0.0.330"})
+        assert evaluated and all("openai" in c['packages'] for c in CONFLICTS if c['id'] in evaluated)
+
+    def test_new_graph_only_refreshes_introduced_by(self, monkeypatch):
+        """Test that a rebuilt graph (every watch refresh of a pip-compile project) re-evaluates no rule."""
+        deps = {"langchain": "==0.0.330", "openai": "==1.3.0"}
+        checker = ConflictChecker({})
+        checker.update(deps, graph=graph_from_via(deps, {"openai": ["-r requirements.in"]}))
+        evaluated = []
+        original = ConflictChecker._check_conflict
+        monkeypatch.setattr(ConflictChecker, "_check_conflict",
+                            lambda self, conflict: evaluated.append(conflict['id']) or original(self, conflict))
+
+        conflicts = checker.update(dict(deps), graph=graph_from_via(deps, {"langchain": ["agents"]}))
+        assert evaluated == []
+        assert conflicts[0]['introduced_by'] == {"langchain": [], "openai": ["openai"]}
+
+    def test_session_reparses_only_affected_sources(self, tmp_path):
+        """Test include changes, unrelated saves and newly created manifests."""
+        (tmp_path / "base.txt").write_text("langchain==0.0.330\n")
+        (tmp_path / "requirements.txt").write_text("-r base.txt\n")
+        session = WatchSession(tmp_path)
+        assert session.refresh()
+        assert session.conflicts == []
+
+        (tmp_path / "base.txt").write_text("langchain==0.0.330\nopenai==1.3.0\n")
+        assert session.refresh({tmp_path / "base.txt"})
+        assert [c['id'] for c in session.conflicts] == ["langchain-openai-separate-package"]
+
+        assert not session.refresh({tmp_path / "notes.md"})
+
+        (tmp_path / "pyproject.toml").write_text('[project]\nname = "app"\ndependencies = ["openai==0.28.0"]\n')
+        assert session.refresh({tmp_path})
+        assert (tmp_path / "pyproject.toml").resolve() in session.watched_files()
+
+    def test_polling_watcher_detects_changes(self, tmp_path):
+        """Test the stat-polling fallback."""
+        path = tmp_path / "requirements.txt"
+        path.write_text("openai\n")
+        watcher = PollingWatcher(interval=0.01)
+        watcher.watch([path], [tmp_path])
+        assert watcher.wait(timeout=0.05) == set()
+
+        path.write_text("openai==1.3.0\n")
+        os.utime(path, ns=(0, 10 ** 9))
+        assert path in watcher.wait(timeout=1)
+
+    @pytest.mark.skipif(not os.path.exists("/proc/sys/fs/inotify"), reason="inotify is Linux-only")
+    def test_inotify_watcher_detects_save(self, tmp_path):
+        """Test that a save through rename is reported as a change of the watched file."""
+        path = tmp_path / "requirements.txt"
+        path.write_text("openai\n")
+        watcher = InotifyWatcher()
+        try:
+            watcher.watch([path], [tmp_path])
+            assert watcher.wait(timeout=0.05) == set()
+
+            (tmp_path / "requirements.txt.tmp").write_text("openai==1.3.0\n")
+            os.replace(tmp_path / "requirements.txt.tmp", path)
+            assert path in watcher.wait(timeout=1)
+        finally:
+            watcher.close()
+
+
+class TestImportScanner:
+    """Test the source import scanner."""
+
+    def test_extracts_only_real_import_statements(self):
+        """Test aliases, parenthesized and nested imports, and that strings / comments / relative imports are skipped."""
+        source = (
+            '"""Usage:\n\n    import tensorflow\n"""\n'
+            'from __future__ import annotations\n'
+            'import os.path as osp, torch\n'
+            'from langchain.chains import (\n    LLMChain,\n    SequentialChain,\n)\n'
+            'from . import local\n'
+            '# import crewai\n'
+            'banner = "import anthropic"\n'
+            'def load():\n    import transformers\n'
+            'import google.generativeai as genai\n'
+        )
+
+        assert extract_imports(source) == {"os", "torch", "langchain", "transformers", "google.generativeai"}
+
+    def test_imports_after_colon_and_semicolon(self):
+        """Test one-line compound statements such as try: import x."""
+        source = (
+            'try: import anthropic\n'
+            'except ImportError: anthropic = None\n'
+            'if HAS_GPU: from torch import cuda\n'
+            'x = 1; import openai as oa\n'
+            'labels = {"a": from_json, "b": important}\n'
+        )
+
+        assert extract_imports(source) == {"anthropic", "torch", "openai"}
+
+    def test_import_names_map_to_distributions(self):
+        """Test that import names resolve to the distribution providing them."""
+        assert distributions_for("sklearn") == ("scikit-learn",)
+        assert distributions_for("llama_index")[0] == "llama-index"
+        assert distributions_for("sentence_transformers") == ("sentence-transformers",)
+
+    def test_reports_undeclared_frameworks_per_project(self, tmp_path):
+        """Test that each source is checked against its own project's manifests, ignoring first-party modules."""
+        (tmp_path / "api").mkdir()
+        (tmp_path / "api" / "requirements.txt").write_text("langchain==0.1.0\n")
+        (tmp_path / "api" / "app.py").write_text("import langchain\nimport openai\nimport openai_helpers\n")
+        (tmp_path / "api" / "openai_helpers.py").write_text("import sklearn\n")
+        (tmp_path / "bot" / "src").mkdir(parents=True)
+        (tmp_path / "bot" / "pyproject.toml").write_text('[project]\nname = "bot"\ndependencies = ["openai"]\n')
+        (tmp_path / "bot" / "src" / "main.py").write_text("from openai import OpenAI\nimport llama_index.core\n")
+
+        undeclared = audit_imports(tmp_path)
+
+        assert [(item.project.name, item.module, item.distribution) for item in undeclared] == [
+            ("api", "openai", "openai"),
+            ("bot", "llama_index", "llama-index"),
+        ]
+        assert undeclared[1].files == [(tmp_path / "bot" / "src" / "main.py").resolve()]
+
+    def test_only_top_level_modules_are_first_party(self, tmp_path):
+        """Test that a nested directory named like a framework doesn't hide the real import."""
+        (tmp_path / "requirements.txt").write_text("fastapi\n")
+        (tmp_path / "services" / "openai").mkdir(parents=True)
+        (tmp_path / "services" / "openai" / "handlers.py").write_text("import openai\n")
+        (tmp_path / "src" / "crewai_tools_local").mkdir(parents=True)
+        (tmp_path / "src" / "crewai_tools_local" / "__init__.py").write_text("import crewai_tools_local.run\n")
+
+        undeclared = audit_imports(tmp_path)
+
+        assert [(item.module, item.distribution) for item in undeclared] == [("openai", "openai")]
+
+    def test_parallel_reads_match_serial(self, tmp_path):
+        """Test that the process pool returns the same imports in input order."""
+        paths = []
+        for i in range(12):
+            path = tmp_path / f"mod{i}.py"
+            path.write_text(f"import torch\nimport pkg{i}\n")
+            paths.append(path)
+
+        assert read_sources(paths, jobs=3) == read_sources(paths, jobs=1)
+
+    def test_cli_exits_nonzero_on_undeclared(self, tmp_path):
+        """Test the imports command's JSON output and exit code."""
+        from click.testing import CliRunner
+        from aidep.cli import main
+
+        (tmp_path / "requirements.txt").write_text("fastapi\n")
+        (tmp_path / "agent.py").write_text("import crewai\n")
+
+        result = CliRunner().invoke(main, ["imports", "--path", str(tmp_path), "--json", "--no-cache"])
+
+        assert result.exit_code == 1
+        assert json.loads(result.output) == [
+            {"project": ".", "module": "crewai", "distribution": "crewai", "files": ["agent.py"]}
+        ]
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])